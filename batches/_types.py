@@ -82,6 +82,10 @@ class BatchResponseError(TypedDict):
     external_shipment_id: str
 
 
+class BatchError(BatchResponseError):
+    batch_id: str
+
+
 class BatchProcessErrorResponse(PaginationLink):
     errors: list[BatchResponseError]  # default is []
     links: PaginationLink
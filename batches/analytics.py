@@ -0,0 +1,173 @@
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Iterable, TypedDict, cast
+
+from ..common._types import Error  # type: ignore[import-not-found]
+from ..common.analytics import GroupedTotals  # type: ignore[import-not-found]
+from ..common.base import APIError, cache_dir, to_utc  # type: ignore[import-not-found]
+from ..common.paging import default_page_sizes  # type: ignore[import-not-found]
+from ._types import Batch, BatchListResponse
+from .batches import LIST_BATCHES, BatchPortal
+
+FIELDS = ("batches", "labels", "completed", "errors", "warnings")
+
+
+class BatchSummary(TypedDict):
+    batches: int
+    labels: int
+    completed: int
+    errors: int
+    warnings: int
+    error_ratio: float
+    warning_ratio: float
+
+
+def _summary(totals: dict[str, float]) -> BatchSummary:
+    labels = int(totals["labels"])
+    return {
+        "batches": int(totals["batches"]),
+        "labels": labels,
+        "completed": int(totals["completed"]),
+        "errors": int(totals["errors"]),
+        "warnings": int(totals["warnings"]),
+        "error_ratio": round(totals["errors"] / labels, 4) if labels else 0.0,
+        "warning_ratio": round(totals["warnings"] / labels, 4) if labels else 0.0,
+    }
+
+
+class BatchAnalytics:
+    """
+    Label and error totals per batch status, updated a page at a time and kept in
+    NumPy arrays rather than Batch dicts. A batch seen again replaces its earlier
+    figures, so a refresh only has to read the batches that are new or may have
+    changed. Requires the optional `numpy` package.
+
+        analytics = BatchAnalytics.load()
+        await refresh_batches(analytics)
+        print(analytics.by_status()["completed"]["error_ratio"])
+        analytics.save()
+    """
+
+    __slots__ = ("path", "totals")
+
+    def __init__(self, path: Path | None = None) -> None:
+        """
+        Args:
+            path (Path | None): The file of `save` and `load`. Defaults to batch_analytics.npz in the cache directory.
+        """
+        self.path = path if path is not None else cache_dir() / "batch_analytics.npz"
+        self.totals = GroupedTotals(FIELDS)
+
+    @property
+    def since(self) -> str | None:
+        """
+        The latest created_at added, in UTC, where the next refresh picks up.
+        """
+        return self.totals.meta.get("since")
+
+    def add(self, batches: Iterable[Batch]) -> int:
+        """
+        Adds or replaces batches, e.g. one page of BatchPortal.list.
+        Returns:
+            int: How many were added.
+        """
+        page = list(batches)
+        self.totals.upsert(
+            [batch["batch_id"] for batch in page],
+            [batch["status"] for batch in page],
+            [(1, b["count"], b["completed"], b["errors"], b["warnings"]) for b in page],
+        )
+        latest = max(
+            (to_utc(batch["created_at"]).isoformat() for batch in page), default=None
+        )
+        if latest is not None and (self.since is None or latest > self.since):
+            self.totals.meta["since"] = latest
+        return len(page)
+
+    def by_status(self) -> dict[str, BatchSummary]:
+        """
+        Returns:
+            dict[str, BatchSummary]: Batch, label and error counts and ratios per status.
+        """
+        return {
+            cast(str, status): _summary(totals)
+            for status, totals in self.totals.totals().items()
+        }
+
+    def summary(self) -> BatchSummary:
+        """
+        Returns:
+            BatchSummary: Batch, label and error counts and ratios over every status.
+        """
+        return _summary(self.totals.total())
+
+    def save(self) -> bool:
+        """
+        Writes the figures and `since` to `path`.
+        Returns:
+            bool: True if the file was written.
+        """
+        return self.totals.save(self.path)
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> "BatchAnalytics":
+        """
+        Reads figures written by `save`, or starts empty.
+        Returns:
+            BatchAnalytics: The analytics.
+        """
+        analytics = cls(path)
+        analytics.totals = GroupedTotals.load(analytics.path, FIELDS)
+        return analytics
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+
+async def refresh_batches(
+    analytics: BatchAnalytics,
+    lookback: timedelta = timedelta(days=2),
+    page_size: int | None = None,
+) -> int:
+    """
+    Adds the batches created since the last refresh, newest first, and the ones
+    created within `lookback` before it, whose status or error counts may have
+    changed since. Stops at the first page reaching past that. The first refresh
+    reads every batch.
+    Args:
+        analytics (BatchAnalytics): The analytics to update.
+        lookback (timedelta): How long a batch may keep changing. Defaults to 2 days.
+        page_size (int | None): Batches per page. Defaults to the largest size the endpoint accepts.
+    Returns:
+        int: How many batches were read.
+    Raises:
+        APIError: If a page could not be fetched.
+    """
+    cutoff = None
+    if analytics.since is not None:
+        cutoff = to_utc(analytics.since) - lookback
+
+    async def call(page: int, size: int) -> tuple[int, Any]:
+        return await BatchPortal.list(
+            sort_by="created_at", page=page, page_size=size, sort_dir="desc"
+        )
+
+    read = 0
+    page = 1
+    while True:
+        if page_size is None:
+            status, page_size, body = await default_page_sizes().fetch(
+                LIST_BATCHES.name, call
+            )
+        else:
+            status, body = await call(page, page_size)
+        if status != 200:
+            raise APIError(status, cast(Error, body))
+        listing = cast(BatchListResponse, body)
+        batches = listing["batches"]
+        if cutoff is not None:
+            batches = [b for b in batches if to_utc(b["created_at"]) >= cutoff]
+        read += analytics.add(batches)
+        if page >= listing["pages"] or len(batches) < len(listing["batches"]):
+            return read
+        page += 1
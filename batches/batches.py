@@ -1,17 +1,13 @@
 from typing import List, Literal, cast
 
-from httpx._types import QueryParamTypes
-
 from ..common._types import (  # type: ignore[import-not-found]
     Endpoints,
     Error,
     LabelFormats,
     LabelLayouts,
 )
-from ..common.base import (  # type: ignore[import-not-found]
-    API_ENDPOINT,
-    ShipStationClient,
-)
+from ..common.base import ShipStationClient  # type: ignore[import-not-found]
+from ..common.endpoints import EndpointSpec  # type: ignore[import-not-found]
 from ._types import (
     Batch,
     BatchListResponse,
@@ -21,6 +17,63 @@ from ._types import (
     ProcessLabel,
 )
 
+LIST_BATCHES = EndpointSpec("batches.list", "GET", Endpoints.BATCHES)
+CREATE_BATCH = EndpointSpec(
+    "batches.create", "POST", Endpoints.BATCHES, expected=(200, 207)
+)
+GET_BATCH_BY_EXTERNAL_ID = EndpointSpec(
+    "batches.get_by_external_id",
+    "GET",
+    Endpoints.BATCHES,
+    "/external_batch_id/{external_batch_id}",
+)
+GET_BATCH = EndpointSpec(
+    "batches.get_by_id", "GET", Endpoints.BATCHES, "/{batch_id}", hedge=True
+)
+DELETE_BATCH = EndpointSpec(
+    "batches.delete_by_id",
+    "DELETE",
+    Endpoints.BATCHES,
+    "/{batch_id}",
+    expected=(204,),
+    body="none",
+)
+ARCHIVE_BATCH = EndpointSpec(
+    "batches.archive_by_id",
+    "PUT",
+    Endpoints.BATCHES,
+    "/{batch_id}",
+    expected=(204,),
+    body="none",
+)
+ADD_TO_BATCH = EndpointSpec(
+    "batches.add_to_batch",
+    "POST",
+    Endpoints.BATCHES,
+    "/{batch_id}/add",
+    expected=(204,),
+    body="none",
+)
+GET_BATCH_ERRORS = EndpointSpec(
+    "batches.get_batch_errors", "GET", Endpoints.BATCHES, "/{batch_id}/errors"
+)
+PROCESS_BATCH_LABELS = EndpointSpec(
+    "batches.process_batch_id_labels",
+    "POST",
+    Endpoints.BATCHES,
+    "/{batch_id}/process/labels",
+    expected=(204,),
+    body="none",
+)
+REMOVE_FROM_BATCH = EndpointSpec(
+    "batches.remove_from_batch",
+    "POST",
+    Endpoints.BATCHES,
+    "/{batch_id}/remove",
+    expected=(204,),
+    body="none",
+)
+
 
 class BatchPortal(ShipStationClient):
     @classmethod
@@ -57,37 +110,10 @@ class BatchPortal(ShipStationClient):
             "sort_dir": sort_dir,
         }
 
-        params = {k: v for k, v in params.items() if v is not None}
-
-        endpoint = f"{API_ENDPOINT}/{Endpoints.BATCHES.value}"
-
-        try:
-            res = await cls.request(
-                "GET",
-                endpoint,
-                params=params,
-            )
-            json = res.json()
-            if res.status_code != 200:
-                if "error_code" in json:
-                    return (res.status_code, cast(Error, json))
-
-                raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, cast(BatchListResponse, json))
+        return cast(
+            tuple[int, BatchListResponse | Error],
+            await cls.call(LIST_BATCHES, params=params),
+        )
 
     @classmethod
     async def create(
@@ -121,35 +147,10 @@ class BatchPortal(ShipStationClient):
 
         payload = {k: v for k, v in payload.items() if v is not None}
 
-        endpoint = f"{API_ENDPOINT}/{Endpoints.BATCHES.value}"
-
-        try:
-            res = await cls.request(
-                "POST",
-                endpoint,
-                json=payload,
-            )
-            json = res.json()
-            if res.status_code not in (200, 207):
-                if "error_code" in json:
-                    return (res.status_code, cast(Error, json))
-
-                raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, cast(Batch, json))
+        return cast(
+            tuple[int, Batch | Error],
+            await cls.call(CREATE_BATCH, json=payload),
+        )
 
     @classmethod
     async def get_by_external_id(
@@ -165,34 +166,13 @@ class BatchPortal(ShipStationClient):
         Returns:
             tuple[int, Batch | Error]: A tuple containing the status code and either a Batch or an Error.
         """
-        endpoint = f"{API_ENDPOINT}/{Endpoints.BATCHES.value}/external_batch_id/{external_batch_id}"
-
-        try:
-            res = await cls.request(
-                "GET",
-                endpoint,
-            )
-            json = res.json()
-            if res.status_code != 200:
-                if "error_code" in json:
-                    return (res.status_code, cast(Error, json))
-
-                raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, cast(Batch, json))
+        return cast(
+            tuple[int, Batch | Error],
+            await cls.call(
+                GET_BATCH_BY_EXTERNAL_ID,
+                path={"external_batch_id": external_batch_id},
+            ),
+        )
 
     @classmethod
     async def get_by_id(
@@ -209,33 +189,10 @@ class BatchPortal(ShipStationClient):
         Returns:
             tuple[int, Batch | Error]: A tuple containing the status code and either a Batch or an Error.
         """
-        endpoint = f"{API_ENDPOINT}/{Endpoints.BATCHES.value}/{batch_id}"
-
-        try:
-            res = await cls.request(
-                "GET",
-                endpoint,
-            )
-            json = res.json()
-            if res.status_code != 200:
-                if "error_code" in json:
-                    return (res.status_code, cast(Error, json))
-                raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, cast(Batch, json))
+        return cast(
+            tuple[int, Batch | Error],
+            await cls.call(GET_BATCH, path={"batch_id": batch_id}),
+        )
 
     @classmethod
     async def delete_by_id(
@@ -252,33 +209,10 @@ class BatchPortal(ShipStationClient):
         Returns:
             tuple[int, None | Error]: A tuple containing the status code and either None or an Error.
         """
-        endpoint = f"{API_ENDPOINT}/{Endpoints.BATCHES.value}/{batch_id}"
-
-        try:
-            res = await cls.request(
-                "DELETE",
-                endpoint,
-            )
-            if res.status_code != 204:
-                json = res.json()
-                if "error_code" in json:
-                    return (res.status_code, cast(Error, json))
-                raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, None)
+        return cast(
+            tuple[int, None | Error],
+            await cls.call(DELETE_BATCH, path={"batch_id": batch_id}),
+        )
 
     @classmethod
     async def archive_by_id(
@@ -295,33 +229,10 @@ class BatchPortal(ShipStationClient):
         Returns:
             tuple[int, None | Error]: A tuple containing the status code and either None or an Error.
         """
-        endpoint = f"{API_ENDPOINT}/{Endpoints.BATCHES.value}/{batch_id}"
-
-        try:
-            res = await cls.request(
-                "PUT",
-                endpoint,
-            )
-            if res.status_code != 204:
-                json = res.json()
-                if "error_code" in json:
-                    return (res.status_code, cast(Error, json))
-                raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, None)
+        return cast(
+            tuple[int, None | Error],
+            await cls.call(ARCHIVE_BATCH, path={"batch_id": batch_id}),
+        )
 
     @classmethod
     async def add_to_batch(
@@ -358,34 +269,10 @@ class BatchPortal(ShipStationClient):
 
         payload = {k: v for k, v in payload.items() if v is not None}
 
-        endpoint = f"{API_ENDPOINT}/{Endpoints.BATCHES.value}/{batch_id}/add"
-
-        try:
-            res = await cls.request(
-                "POST",
-                endpoint,
-                json=payload,
-            )
-            if res.status_code != 204:
-                json = res.json()
-                if "error_code" in json:
-                    return (res.status_code, cast(Error, json))
-                raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, None)
+        return cast(
+            tuple[int, None | Error],
+            await cls.call(ADD_TO_BATCH, path={"batch_id": batch_id}, json=payload),
+        )
 
     @classmethod
     async def get_batch_errors(
@@ -399,35 +286,12 @@ class BatchPortal(ShipStationClient):
             "page_size": page_size,
         }
 
-        endpoint = f"{API_ENDPOINT}/{Endpoints.BATCHES.value}/{batch_id}/errors"
-
-        try:
-            res = await cls.request(
-                "GET",
-                endpoint,
-                params=params,
-            )
-            json = res.json()
-            if res.status_code != 200:
-                if "error_code" in json:
-                    return (res.status_code, cast(Error, json))
-                else:
-                    raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, cast(BatchProcessErrorResponse, json))
+        return cast(
+            tuple[int, BatchProcessErrorResponse | Error],
+            await cls.call(
+                GET_BATCH_ERRORS, path={"batch_id": batch_id}, params=params
+            ),
+        )
 
     @classmethod
     async def process_batch_id_labels(
@@ -458,35 +322,12 @@ class BatchPortal(ShipStationClient):
         if ship_date is not None:
             payload["ship_date"] = ship_date
 
-        endpoint = f"{API_ENDPOINT}/{Endpoints.BATCHES.value}/{batch_id}/process/labels"
-
-        try:
-            res = await cls.request(
-                "POST",
-                endpoint,
-                json=payload,
-            )
-            if res.status_code != 204:
-                json = res.json()
-                if "error_code" in json:
-                    return (res.status_code, cast(Error, json))
-                else:
-                    raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, None)
+        return cast(
+            tuple[int, None | Error],
+            await cls.call(
+                PROCESS_BATCH_LABELS, path={"batch_id": batch_id}, json=payload
+            ),
+        )
 
     @classmethod
     async def remove_from_batch(
@@ -515,32 +356,7 @@ class BatchPortal(ShipStationClient):
                 ),
             )
 
-        endpoint = f"{API_ENDPOINT}/{Endpoints.BATCHES.value}/{batch_id}/remove"
-
-        try:
-            res = await cls.request(
-                "POST",
-                endpoint,
-                json=params,
-            )
-            if res.status_code != 204:
-                json = res.json()
-                if "error_code" in json:
-                    return (res.status_code, cast(Error, json))
-                else:
-                    raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, None)
+        return cast(
+            tuple[int, None | Error],
+            await cls.call(REMOVE_FROM_BATCH, path={"batch_id": batch_id}, json=params),
+        )
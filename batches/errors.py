@@ -0,0 +1,197 @@
+from collections import Counter
+from typing import AsyncIterator, Collection, Iterable, cast
+
+from ..common._types import Error  # type: ignore[import-not-found]
+from ..common.base import LOGGER  # type: ignore[import-not-found]
+from ..common.concurrency import as_completed  # type: ignore[import-not-found]
+from ..common.paging import default_page_sizes  # type: ignore[import-not-found]
+from ..common.ratelimit import RateLimiter  # type: ignore[import-not-found]
+from ._types import BatchError, BatchProcessErrorResponse
+from .batches import GET_BATCH_ERRORS, BatchPortal
+
+
+class BatchErrorReport:
+    """
+    Errors of many batches, grouped by error message and by shipment.
+
+    Shipments are kept in the order their first error was seen, so `resubmit`
+    is stable between runs over the same batches.
+    """
+
+    __slots__ = ("by_message", "by_shipment", "failed", "total")
+
+    def __init__(self) -> None:
+        self.by_message: dict[str, list[BatchError]] = {}
+        self.by_shipment: dict[str, list[BatchError]] = {}
+        self.failed: dict[str, tuple[int, Error]] = {}
+        self.total = 0
+
+    def add(self, error: BatchError) -> None:
+        """
+        Adds one error to the report.
+        Args:
+            error (BatchError): The error, tagged with the batch it came from.
+        """
+        self.total += 1
+        self.by_message.setdefault(error["error"], []).append(error)
+        self.by_shipment.setdefault(error["shipment_id"], []).append(error)
+
+    def most_common(self, n: int | None = None) -> list[tuple[str, int]]:
+        """
+        Lists the error messages by how many shipments they affected.
+        Args:
+            n (int | None): Number of messages to return. Defaults to all of them.
+        Returns:
+            list[tuple[str, int]]: Each message with its number of errors, most frequent first.
+        """
+        return Counter(
+            {message: len(errors) for message, errors in self.by_message.items()}
+        ).most_common(n)
+
+    def resubmit(self, exclude: Collection[str] = ()) -> list[str]:
+        """
+        Lists the shipments to put into a follow-up batch.
+        Args:
+            exclude (Collection[str]): Error messages whose shipments must be fixed before
+                being retried, e.g. invalid addresses.
+        Returns:
+            list[str]: The shipment IDs, each once, in the order they were first reported.
+        """
+        if not exclude:
+            return list(self.by_shipment)
+        return [
+            shipment_id
+            for shipment_id, errors in self.by_shipment.items()
+            if not any(error["error"] in exclude for error in errors)
+        ]
+
+    def __repr__(self) -> str:
+        return (
+            f"BatchErrorReport(errors={self.total}, shipments={len(self.by_shipment)}, "
+            f"messages={len(self.by_message)}, failed_batches={len(self.failed)})"
+        )
+
+
+async def stream_batch_errors(
+    batch_ids: Iterable[str],
+    page_size: int | None = None,
+    concurrency: int = 10,
+    limiter: RateLimiter | None = None,
+    failed: dict[str, tuple[int, Error]] | None = None,
+) -> AsyncIterator[BatchError]:
+    """
+    Streams the errors of many batches, paging every batch concurrently under the rate limit.
+
+    The first page of every batch is fetched in one round. The remaining pages of
+    all batches are then fetched together in the next round, so a batch with many
+    errors does not hold up the others.
+
+    Args:
+        batch_ids (Iterable[str]): The batches to read errors from, e.g. every batch
+            with status "completed_with_errors".
+        page_size (int | None): Errors requested per call. Defaults to the largest size
+            the endpoint accepts, found on its first call and remembered.
+        concurrency (int): The most calls in flight at once. Defaults to 10.
+        limiter (RateLimiter | None): Limiter to take backpressure from. Defaults to the client's limiter.
+        failed (dict[str, tuple[int, Error]] | None): If given, filled with the batches
+            whose errors could not be read, keyed by batch ID.
+
+    Yields:
+        BatchError: Each error, tagged with its batch ID, in completion order.
+
+    Raises:
+        APIError: If a call was rejected with 401 or 403.
+    """
+
+    sizes = default_page_sizes()
+    # The page size of each batch's first page, which its later pages must reuse.
+    used: dict[str, int] = {}
+
+    async def call(
+        batch_id: str, page: int, size: int
+    ) -> tuple[int, BatchProcessErrorResponse | Error]:
+        return await BatchPortal.get_batch_errors(batch_id, page=page, page_size=size)
+
+    async def fetch(
+        key: tuple[str, int],
+    ) -> tuple[int, BatchProcessErrorResponse | Error]:
+        batch_id, page = key
+        if batch_id in used:
+            return await call(batch_id, page, used[batch_id])
+        if page_size is not None:
+            used[batch_id] = page_size
+            return await call(batch_id, page, page_size)
+        status, used[batch_id], body = await sizes.fetch(
+            GET_BATCH_ERRORS.name,
+            lambda page, size: call(batch_id, page, size),
+            page,
+        )
+        return (status, body)
+
+    pages: list[tuple[str, int]] = [(batch_id, 1) for batch_id in batch_ids]
+    while pages:
+        follow_up: list[tuple[str, int]] = []
+        async for (batch_id, page), (status, body) in as_completed(
+            fetch, pages, concurrency=concurrency, limiter=limiter
+        ):
+            if status != 200:
+                LOGGER.error(
+                    f"stream_batch_errors:::Batch {batch_id} page {page} failed with {status}"
+                )
+                if failed is not None:
+                    failed[batch_id] = (status, cast(Error, body))
+                continue
+
+            response = cast(BatchProcessErrorResponse, body)
+            if page == 1:
+                # Every remaining page is known after the first one, so they are fetched together.
+                total_pages = cast(dict, response).get("pages")
+                if isinstance(total_pages, int):
+                    follow_up.extend((batch_id, n) for n in range(2, total_pages + 1))
+                elif response.get("links", {}).get("next"):
+                    follow_up.append((batch_id, 2))
+            elif "pages" not in response and response.get("links", {}).get("next"):
+                follow_up.append((batch_id, page + 1))
+
+            for error in response.get("errors", []):
+                yield cast(BatchError, {**error, "batch_id": batch_id})
+        pages = follow_up
+
+
+async def collect_batch_errors(
+    batch_ids: Iterable[str],
+    page_size: int | None = None,
+    concurrency: int = 10,
+    limiter: RateLimiter | None = None,
+) -> BatchErrorReport:
+    """
+    Reads the errors of many batches and groups them by message and shipment.
+
+        report = await collect_batch_errors(batch_ids)
+        await BatchPortal.create(None, report.resubmit(), None)
+
+    Args:
+        batch_ids (Iterable[str]): The batches to read errors from.
+        page_size (int | None): Errors requested per call. Defaults to the largest size
+            the endpoint accepts, found on its first call and remembered.
+        concurrency (int): The most calls in flight at once. Defaults to 10.
+        limiter (RateLimiter | None): Limiter to take backpressure from. Defaults to the client's limiter.
+
+    Returns:
+        BatchErrorReport: The grouped errors, plus the batches whose errors could not be read.
+
+    Raises:
+        APIError: If a call was rejected with 401 or 403.
+    """
+    report = BatchErrorReport()
+    async for error in stream_batch_errors(
+        batch_ids,
+        page_size=page_size,
+        concurrency=concurrency,
+        limiter=limiter,
+        failed=report.failed,
+    ):
+        report.add(error)
+
+    LOGGER.info(f"collect_batch_errors:::{report}")
+    return report
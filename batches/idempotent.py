@@ -0,0 +1,196 @@
+from asyncio import Lock as AsyncLock
+from pathlib import Path
+from threading import Lock
+from typing import List, cast
+
+from ..common._types import Error  # type: ignore[import-not-found]
+from ..common.base import (  # type: ignore[import-not-found]
+    LOGGER,
+    cache_dir,
+    read_json,
+    write_json,
+)
+from ._types import Batch, ProcessLabel
+from .batches import BatchPortal
+
+# Statuses after which the batch may or may not have been created on ShipStation.
+AMBIGUOUS_STATUSES: frozenset[int] = frozenset({408, 500, 502, 503, 504})
+
+
+class BatchIndex:
+    """
+    Local index of the batches created through `create_idempotent`, keyed by
+    external_batch_id and persisted as JSON in the cache directory.
+
+    The batch stored for an ID is the one returned when it was created, so fields
+    that change afterwards, such as its status, must be read with BatchPortal.get_by_id.
+    """
+
+    __slots__ = ("path", "autosave", "_batches", "_lock")
+
+    def __init__(self, path: Path | None = None, autosave: bool = True) -> None:
+        """
+        Args:
+            path (Path | None): The JSON file of the index. Defaults to batch_index.json in the cache directory.
+            autosave (bool): Write the file after every change. Defaults to True.
+        """
+        self.path = path if path is not None else cache_dir() / "batch_index.json"
+        self.autosave = autosave
+        self._lock = Lock()
+        self._batches: dict[str, Batch] = (
+            cast(
+                dict[str, Batch],
+                read_json(self.path) if self.path.exists() else None,
+            )
+            or {}
+        )
+
+    def get(self, external_batch_id: str) -> Batch | None:
+        with self._lock:
+            return self._batches.get(external_batch_id)
+
+    def put(self, external_batch_id: str, batch: Batch) -> None:
+        with self._lock:
+            self._batches[external_batch_id] = batch
+            if self.autosave:
+                write_json(self.path, cast(dict, self._batches))
+
+    def discard(self, external_batch_id: str) -> None:
+        with self._lock:
+            if self._batches.pop(external_batch_id, None) is not None and self.autosave:
+                write_json(self.path, cast(dict, self._batches))
+
+    def save(self) -> bool:
+        """
+        Writes the index to its file.
+        Returns:
+            bool: True if the file was written.
+        """
+        with self._lock:
+            return write_json(self.path, cast(dict, self._batches))
+
+    def __contains__(self, external_batch_id: object) -> bool:
+        return external_batch_id in self._batches
+
+    def __len__(self) -> int:
+        return len(self._batches)
+
+
+_default_index: BatchIndex | None = None
+_default_lock = Lock()
+# One create at a time per external ID, so concurrent callers wait for the first.
+_creating: dict[str, AsyncLock] = {}
+# Callers holding or waiting on each lock; it is dropped once none are left.
+_users: dict[str, int] = {}
+
+
+def default_index() -> BatchIndex:
+    """
+    Returns the process-wide index, loading it from the cache directory on first use.
+    Returns:
+        BatchIndex: The shared index.
+    """
+    global _default_index
+
+    with _default_lock:
+        if _default_index is None:
+            _default_index = BatchIndex()
+        return _default_index
+
+
+async def create_idempotent(
+    external_batch_id: str,
+    shipment_ids: List[str] | None,
+    rate_ids: List[str] | None,
+    batch_notes: str | None = None,
+    process_labels: ProcessLabel | None = None,
+    index: BatchIndex | None = None,
+    attempts: int = 3,
+) -> tuple[int, Batch | Error]:
+    """
+    Creates a batch at most once per external_batch_id, however often it is retried.
+
+    A batch already in the local index is returned without calling ShipStation.
+    When a create fails in a way that does not say whether the batch exists, such as
+    a timeout or a 5xx, the batch is looked up by its external ID before creating it
+    again, so a retry never produces a duplicate batch or duplicate labels.
+
+    Args:
+        external_batch_id (str): The identifier the batch is deduplicated by.
+        shipment_ids (list[str] | None): A list of shipment IDs to include in the batch.
+        rate_ids (list[str] | None): A list of rate IDs to use for the shipments in the batch.
+        batch_notes (str | None): Notes for the batch.
+        process_labels (ProcessLabel | None): Instructions for processing the labels on creation.
+        index (BatchIndex | None): The index to use. Defaults to the process-wide index.
+        attempts (int): Most create calls made. Defaults to 3.
+
+    Returns:
+        tuple[int, Batch | Error]: A tuple containing the status code and either the Batch or an Error.
+    """
+    index = index if index is not None else default_index()
+    known = index.get(external_batch_id)
+    if known is not None:
+        return (200, known)
+
+    lock = _creating.setdefault(external_batch_id, AsyncLock())
+    _users[external_batch_id] = _users.get(external_batch_id, 0) + 1
+    try:
+        async with lock:
+            return await _create(
+                external_batch_id,
+                shipment_ids,
+                rate_ids,
+                batch_notes,
+                process_labels,
+                index,
+                attempts,
+            )
+    finally:
+        _users[external_batch_id] -= 1
+        if not _users[external_batch_id]:
+            del _users[external_batch_id]
+            if _creating.get(external_batch_id) is lock:
+                del _creating[external_batch_id]
+
+
+async def _create(
+    external_batch_id: str,
+    shipment_ids: List[str] | None,
+    rate_ids: List[str] | None,
+    batch_notes: str | None,
+    process_labels: ProcessLabel | None,
+    index: BatchIndex,
+    attempts: int,
+) -> tuple[int, Batch | Error]:
+    known = index.get(external_batch_id)
+    if known is not None:
+        return (200, known)
+
+    status: int = 500
+    body: Batch | Error = cast(Error, {})
+    for attempt in range(1, attempts + 1):
+        status, body = await BatchPortal.create(
+            external_batch_id,
+            shipment_ids,
+            rate_ids,
+            batch_notes=batch_notes,
+            process_labels=process_labels,
+        )
+        if status in (200, 207):
+            index.put(external_batch_id, cast(Batch, body))
+            return (status, body)
+        if status not in AMBIGUOUS_STATUSES:
+            return (status, body)
+
+        LOGGER.warning(
+            f"create_idempotent:::Create of {external_batch_id} failed with {status} on attempt {attempt}, checking whether it exists"
+        )
+        found_status, found = await BatchPortal.get_by_external_id(external_batch_id)
+        if found_status == 200:
+            index.put(external_batch_id, cast(Batch, found))
+            return (found_status, found)
+        if found_status != 404:
+            # Without a definite "not found", creating again could duplicate the batch.
+            return (found_status, found)
+
+    return (status, body)
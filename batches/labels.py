@@ -0,0 +1,167 @@
+from pathlib import Path
+from typing import AsyncIterator, Iterable, TypedDict, cast
+from urllib.parse import urlsplit
+
+from ..common._types import Error, LabelFormats, LabelLayouts  # type: ignore[import-not-found]
+from ..common.base import LOGGER, APIError  # type: ignore[import-not-found]
+from ..common.concurrency import as_completed  # type: ignore[import-not-found]
+from ..downloads.downloads import DownloadPortal  # type: ignore[import-not-found]
+from ._types import Batch, BatchStatus, DisplayFormatScheme
+from .batches import BatchPortal
+from .recovery import wait_for_batch
+
+
+class LabelFiles(TypedDict):
+    batch_id: str
+    status: str
+    label: Path | None
+    form: Path | None
+    errors: list[tuple[int, Error]]
+
+
+class LabelPipeline:
+    """
+    Processes the labels of many batches and streams every finished batch's labels
+    and forms to disk.
+
+    Each batch moves through processing, waiting and downloading on its own, so the
+    downloads of a batch that finished early overlap with the processing of the
+    others, and the whole run takes about as long as its slowest batch.
+
+        pipeline = LabelPipeline(Path("labels"), label_format="zpl")
+        async for files in pipeline.stream(batch_ids):
+            print(files["batch_id"], files["label"])
+    """
+
+    __slots__ = (
+        "output_dir",
+        "label_format",
+        "label_layout",
+        "display_scheme",
+        "forms",
+        "concurrency",
+        "poll_interval",
+        "timeout",
+    )
+
+    def __init__(
+        self,
+        output_dir: Path,
+        label_format: LabelFormats = "pdf",
+        label_layout: LabelLayouts = "4x6",
+        display_scheme: DisplayFormatScheme = "label",
+        forms: bool = True,
+        concurrency: int = 10,
+        poll_interval: float = 2.0,
+        timeout: float = 600.0,
+    ) -> None:
+        """
+        Args:
+            output_dir (Path): Directory the files are written to, one subdirectory per batch.
+            label_format (LabelFormats): The format of the labels: "pdf", "zpl" or "png". Defaults to "pdf".
+            label_layout (LabelLayouts): The layout of the labels. Defaults to "4x6".
+            display_scheme (DisplayFormatScheme): The display scheme of the labels. Defaults to "label".
+            forms (bool): Also download the customs forms of each batch. Defaults to True.
+            concurrency (int): The most batches in the pipeline at once. Defaults to 10.
+            poll_interval (float): Seconds between two polls of a processing batch. Defaults to 2.
+            timeout (float): Seconds to wait for one batch to finish. Defaults to 600.
+        """
+        self.output_dir = output_dir
+        self.label_format: LabelFormats = label_format
+        self.label_layout: LabelLayouts = label_layout
+        self.display_scheme: DisplayFormatScheme = display_scheme
+        self.forms = forms
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def _target(self, batch_id: str, url: str, fallback: str) -> Path:
+        name = Path(urlsplit(url).path).name or f"{fallback}.{self.label_format}"
+        return self.output_dir / batch_id / name
+
+    async def _save(
+        self, files: LabelFiles, url: str | None, fallback: str
+    ) -> Path | None:
+        if not url:
+            return None
+        status, result = await DownloadPortal.save_file(
+            url, self._target(files["batch_id"], url, fallback)
+        )
+        if status != 200:
+            files["errors"].append((status, cast(Error, result)))
+            return None
+        return cast(Path, result)
+
+    async def run_one(self, batch_id: str) -> tuple[int, LabelFiles]:
+        """
+        Processes the labels of one batch, waits for it and downloads its files.
+        Args:
+            batch_id (str): The batch to process.
+        Returns:
+            tuple[int, LabelFiles]: 200 if every file was written, otherwise the status of
+                the first failure, with the files written so far.
+        """
+        files: LabelFiles = {
+            "batch_id": batch_id,
+            "status": "",
+            "label": None,
+            "form": None,
+            "errors": [],
+        }
+        status, body = await BatchPortal.process_batch_id_labels(
+            batch_id,
+            label_layout=self.label_layout,
+            label_format=self.label_format,
+            display_scheme=self.display_scheme,
+        )
+        if status != 204:
+            files["errors"].append((status, cast(Error, body)))
+            return (status, files)
+
+        try:
+            batch: Batch = await wait_for_batch(
+                batch_id, self.poll_interval, self.timeout
+            )
+        except APIError as err:
+            files["errors"].append((err.status_code, cast(Error, err.details)))
+            return (err.status_code, files)
+
+        files["status"] = batch["status"]
+        if batch["status"] not in (
+            BatchStatus.COMPLETED.value,
+            BatchStatus.COMPLETED_WITH_ERRORS.value,
+        ):
+            return (409, files)
+
+        download = batch.get("label_download") or {}
+        url = download.get(self.label_format) or download.get("href")
+        files["label"] = await self._save(files, url, "labels")
+        if self.forms:
+            form = batch.get("form_download") or {}
+            files["form"] = await self._save(files, form.get("href"), "forms")
+
+        LOGGER.info(f"LabelPipeline:::Batch {batch_id} written to {files['label']}")
+        return (files["errors"][0][0] if files["errors"] else 200, files)
+
+    async def stream(self, batch_ids: Iterable[str]) -> AsyncIterator[LabelFiles]:
+        """
+        Runs every batch through the pipeline.
+        Args:
+            batch_ids (Iterable[str]): The batches to process, e.g. freshly created ones.
+        Yields:
+            LabelFiles: The files of each batch, as soon as they are on disk.
+        """
+        async for _, (_, files) in as_completed(
+            self.run_one, batch_ids, concurrency=self.concurrency
+        ):
+            yield files
+
+    async def run(self, batch_ids: Iterable[str]) -> list[LabelFiles]:
+        """
+        Runs every batch through the pipeline and collects the results.
+        Args:
+            batch_ids (Iterable[str]): The batches to process.
+        Returns:
+            list[LabelFiles]: The files of each batch, in the order they finished.
+        """
+        return [files async for files in self.stream(batch_ids)]
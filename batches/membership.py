@@ -0,0 +1,333 @@
+from asyncio import Lock, Task, TimerHandle, current_task, gather, get_running_loop
+from typing import Iterable, TypedDict, cast
+
+from ..common._types import Error  # type: ignore[import-not-found]
+from ..common.base import LOGGER  # type: ignore[import-not-found]
+from .batches import BatchPortal
+
+# Statuses after which a failed flush is retried with backoff.
+RETRY_STATUSES: frozenset[int] = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class Delta(TypedDict):
+    add_shipments: list[str]
+    remove_shipments: list[str]
+    add_rates: list[str]
+    remove_rates: list[str]
+
+
+class _Members:
+    __slots__ = (
+        "external_batch_id",
+        "shipments",
+        "rates",
+        "applied_shipments",
+        "applied_rates",
+        "lock",
+        "timer",
+        "task",
+        "error",
+        "failures",
+    )
+
+    def __init__(
+        self,
+        external_batch_id: str,
+        shipments: Iterable[str],
+        rates: Iterable[str],
+    ) -> None:
+        self.external_batch_id = external_batch_id
+        self.shipments = set(shipments)
+        self.rates = set(rates)
+        self.applied_shipments = set(self.shipments)
+        self.applied_rates = set(self.rates)
+        self.lock = Lock()
+        self.timer: TimerHandle | None = None
+        self.task: Task[Delta] | None = None
+        self.error: tuple[int, Error] | None = None
+        self.failures = 0
+
+    def delta(self) -> Delta:
+        return {
+            "add_shipments": sorted(self.shipments - self.applied_shipments),
+            "remove_shipments": sorted(self.applied_shipments - self.shipments),
+            "add_rates": sorted(self.rates - self.applied_rates),
+            "remove_rates": sorted(self.applied_rates - self.rates),
+        }
+
+    def pending(self) -> int:
+        return len(self.shipments ^ self.applied_shipments) + len(
+            self.rates ^ self.applied_rates
+        )
+
+
+class BatchMembership:
+    """
+    Tracks which shipments and rates each open batch should hold, and sends only
+    the difference to ShipStation.
+
+    Changes are recorded locally and applied after `window` seconds, so many small
+    changes to a batch in quick succession become one `add_to_batch` and one
+    `remove_from_batch` call. A shipment added and removed again inside the window
+    is never sent at all. A batch is flushed early once `max_pending` changes are waiting.
+    A flush that fails with a timeout, a 429 or a 5xx is retried after `window`
+    seconds, doubling up to `max_backoff`. After any other failure the changes stay
+    pending until the batch changes again or is flushed.
+
+        async with BatchMembership(window=2.0) as members:
+            members.track(batch_id, external_batch_id)
+            members.add(batch_id, shipment_ids=[shipment_id])
+    """
+
+    __slots__ = ("window", "max_pending", "max_backoff", "_batches", "_tasks")
+
+    def __init__(
+        self, window: float = 1.0, max_pending: int = 500, max_backoff: float = 60.0
+    ) -> None:
+        """
+        Args:
+            window (float): Seconds changes to a batch are collected before being sent. Defaults to 1.
+            max_pending (int): Changes waiting on one batch that trigger an immediate flush. Defaults to 500.
+            max_backoff (float): Longest wait before retrying a failed flush. Defaults to 60.
+        """
+        self.window = window
+        self.max_pending = max_pending
+        self.max_backoff = max_backoff
+        self._batches: dict[str, _Members] = {}
+        self._tasks: set[Task[Delta]] = set()
+
+    def track(
+        self,
+        batch_id: str,
+        external_batch_id: str,
+        shipment_ids: Iterable[str] = (),
+        rate_ids: Iterable[str] = (),
+    ) -> None:
+        """
+        Starts tracking a batch, with the shipments and rates it currently holds.
+        Args:
+            batch_id (str): The open batch.
+            external_batch_id (str): Its external ID, sent along with every add.
+            shipment_ids (Iterable[str]): Shipments already in the batch.
+            rate_ids (Iterable[str]): Rates already in the batch.
+        """
+        self._batches[batch_id] = _Members(external_batch_id, shipment_ids, rate_ids)
+
+    def _members(self, batch_id: str) -> _Members:
+        if batch_id not in self._batches:
+            raise KeyError(f"Batch {batch_id} is not tracked.")
+        return self._batches[batch_id]
+
+    def add(
+        self,
+        batch_id: str,
+        shipment_ids: Iterable[str] = (),
+        rate_ids: Iterable[str] = (),
+    ) -> None:
+        """
+        Records shipments and rates to add to a batch.
+        Args:
+            batch_id (str): The tracked batch.
+            shipment_ids (Iterable[str]): Shipments to add.
+            rate_ids (Iterable[str]): Rates to add.
+        """
+        members = self._members(batch_id)
+        members.shipments.update(shipment_ids)
+        members.rates.update(rate_ids)
+        self._schedule(batch_id, members)
+
+    def remove(
+        self,
+        batch_id: str,
+        shipment_ids: Iterable[str] = (),
+        rate_ids: Iterable[str] = (),
+    ) -> None:
+        """
+        Records shipments and rates to remove from a batch.
+        Args:
+            batch_id (str): The tracked batch.
+            shipment_ids (Iterable[str]): Shipments to remove.
+            rate_ids (Iterable[str]): Rates to remove.
+        """
+        members = self._members(batch_id)
+        members.shipments.difference_update(shipment_ids)
+        members.rates.difference_update(rate_ids)
+        self._schedule(batch_id, members)
+
+    def replace(
+        self,
+        batch_id: str,
+        shipment_ids: Iterable[str] = (),
+        rate_ids: Iterable[str] = (),
+    ) -> None:
+        """
+        Records the complete set of shipments and rates a batch should hold.
+        Args:
+            batch_id (str): The tracked batch.
+            shipment_ids (Iterable[str]): Every shipment the batch should hold.
+            rate_ids (Iterable[str]): Every rate the batch should hold.
+        """
+        members = self._members(batch_id)
+        members.shipments = set(shipment_ids)
+        members.rates = set(rate_ids)
+        self._schedule(batch_id, members)
+
+    def pending(self, batch_id: str) -> Delta:
+        """
+        Returns the changes to a batch not yet sent to ShipStation.
+        Args:
+            batch_id (str): The tracked batch.
+        Returns:
+            Delta: The shipments and rates that would be added and removed.
+        """
+        return self._members(batch_id).delta()
+
+    def last_error(self, batch_id: str) -> tuple[int, Error] | None:
+        """
+        Returns the error of the last failed flush of a batch, if it has not succeeded since.
+        """
+        return self._members(batch_id).error
+
+    def _schedule(
+        self, batch_id: str, members: _Members, delay: float | None = None
+    ) -> None:
+        pending = members.pending()
+        if not pending:
+            if members.timer is not None:
+                members.timer.cancel()
+                members.timer = None
+            return
+
+        # A retry waits out its backoff even when many changes are pending.
+        if delay is None and pending >= self.max_pending:
+            if members.timer is not None:
+                members.timer.cancel()
+                members.timer = None
+            self._spawn(batch_id)
+        elif members.timer is None:
+            members.timer = get_running_loop().call_later(
+                self.window if delay is None else delay, self._spawn, batch_id
+            )
+
+    def _spawn(self, batch_id: str) -> None:
+        members = self._batches[batch_id]
+        # Called by the timer, or after it was cancelled.
+        members.timer = None
+        # A flush already running or queued sends these changes, or schedules them
+        # once it is done; only that flush itself may queue the next one.
+        if (
+            members.task is not None
+            and not members.task.done()
+            and members.task is not current_task()
+        ):
+            return
+        task = get_running_loop().create_task(self.flush(batch_id))
+        members.task = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self, batch_id: str) -> Delta:
+        """
+        Sends the pending changes of a batch now.
+        Args:
+            batch_id (str): The tracked batch.
+        Returns:
+            Delta: The changes that were applied.
+        """
+        members = self._members(batch_id)
+        applied: Delta = {
+            "add_shipments": [],
+            "remove_shipments": [],
+            "add_rates": [],
+            "remove_rates": [],
+        }
+        async with members.lock:
+            if members.timer is not None:
+                members.timer.cancel()
+                members.timer = None
+
+            delta = members.delta()
+            if delta["add_shipments"] or delta["add_rates"]:
+                status, body = await BatchPortal.add_to_batch(
+                    batch_id,
+                    members.external_batch_id,
+                    shipment_ids=delta["add_shipments"] or None,
+                    rate_ids=delta["add_rates"] or None,
+                )
+                if status != 204:
+                    return self._failed(batch_id, members, status, body, applied)
+                members.applied_shipments.update(delta["add_shipments"])
+                members.applied_rates.update(delta["add_rates"])
+                applied["add_shipments"] = delta["add_shipments"]
+                applied["add_rates"] = delta["add_rates"]
+
+            if delta["remove_shipments"] or delta["remove_rates"]:
+                status, body = await BatchPortal.remove_from_batch(
+                    batch_id,
+                    shipment_ids=delta["remove_shipments"] or None,
+                    rate_ids=delta["remove_rates"] or None,
+                )
+                if status != 204:
+                    return self._failed(batch_id, members, status, body, applied)
+                members.applied_shipments.difference_update(delta["remove_shipments"])
+                members.applied_rates.difference_update(delta["remove_rates"])
+                applied["remove_shipments"] = delta["remove_shipments"]
+                applied["remove_rates"] = delta["remove_rates"]
+
+            members.error = None
+            members.failures = 0
+
+        # Changes made while the calls were in flight get their own window.
+        self._schedule(batch_id, members)
+        return applied
+
+    def _failed(
+        self,
+        batch_id: str,
+        members: _Members,
+        status: int,
+        body: object,
+        applied: Delta,
+    ) -> Delta:
+        # The changes that failed stay pending for the next flush.
+        members.error = (status, cast(Error, body))
+        members.failures += 1
+        LOGGER.error(
+            f"BatchMembership:::Flush of batch {batch_id} failed with {status}: {body}"
+        )
+        if status in RETRY_STATUSES:
+            self._schedule(
+                batch_id,
+                members,
+                min(self.window * 2 ** (members.failures - 1), self.max_backoff),
+            )
+        return applied
+
+    async def flush_all(self) -> dict[str, Delta]:
+        """
+        Sends the pending changes of every tracked batch now.
+        Returns:
+            dict[str, Delta]: The changes applied to each batch.
+        """
+        batch_ids = list(self._batches)
+        results = await gather(*(self.flush(batch_id) for batch_id in batch_ids))
+        return dict(zip(batch_ids, results))
+
+    async def close(self) -> None:
+        """
+        Sends every pending change and waits for scheduled flushes to finish.
+        Retries still waiting are cancelled; their batches keep `last_error`.
+        """
+        await self.flush_all()
+        if self._tasks:
+            await gather(*self._tasks, return_exceptions=True)
+        for members in self._batches.values():
+            if members.timer is not None:
+                members.timer.cancel()
+                members.timer = None
+
+    async def __aenter__(self) -> "BatchMembership":
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.close()
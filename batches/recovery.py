@@ -0,0 +1,266 @@
+from asyncio import sleep
+from time import monotonic, time
+from typing import Callable, Literal, TypedDict, cast
+
+from ..common._types import Error, LabelFormats, LabelLayouts  # type: ignore[import-not-found]
+from ..common.base import LOGGER, APIError  # type: ignore[import-not-found]
+from ..common.events import event_bus  # type: ignore[import-not-found]
+from ._types import Batch, BatchError, BatchStatus
+from .batches import BatchPortal
+from .errors import collect_batch_errors
+
+Failure = Literal["transient", "permanent"]
+Classifier = Callable[[BatchError], Failure]
+
+# Fragments of error messages that are worth retrying as-is in a new batch.
+# Anything else, such as an invalid address, needs the shipment fixed first.
+TRANSIENT_ERRORS: tuple[str, ...] = (
+    "rate is no longer valid",
+    "timed out",
+    "timeout",
+    "temporarily unavailable",
+    "service unavailable",
+    "try again",
+    "rate limit",
+    "internal error",
+    "carrier is not responding",
+)
+
+# Statuses after which a batch no longer changes by itself.
+FINISHED_STATUSES: frozenset[str] = frozenset(
+    {
+        BatchStatus.COMPLETED.value,
+        BatchStatus.COMPLETED_WITH_ERRORS.value,
+        BatchStatus.ARCHIVED.value,
+        BatchStatus.INVALID.value,
+    }
+)
+
+
+def classify(error: BatchError) -> Failure:
+    """
+    Decides whether a failed shipment can be retried unchanged.
+    Args:
+        error (BatchError): The error reported for the shipment.
+    Returns:
+        Failure: "transient" if the message matches TRANSIENT_ERRORS, otherwise "permanent".
+    """
+    message = error["error"].lower()
+    if any(fragment in message for fragment in TRANSIENT_ERRORS):
+        return "transient"
+    return "permanent"
+
+
+class RecoveryResult(TypedDict):
+    batch_ids: list[str]
+    attempts: int
+    status: str
+    retried: list[str]
+    permanent: dict[str, BatchError]
+    exhausted: dict[str, BatchError]
+
+
+async def wait_for_batch(
+    batch_id: str,
+    poll_interval: float = 2.0,
+    timeout: float = 600.0,
+    late_after: float = 60.0,
+) -> Batch:
+    """
+    Waits until a batch has finished processing.
+
+    If an EventBus is set with `set_event_bus`, the batch is read again as soon as a
+    webhook for it arrives, and only polled every `late_after` seconds in case an
+    event is late or lost. Otherwise it is polled every `poll_interval` seconds.
+
+    Args:
+        batch_id (str): The batch to wait for.
+        poll_interval (float): Seconds between two polls without webhooks. Defaults to 2.
+        timeout (float): Seconds to wait before giving up. Defaults to 600.
+        late_after (float): Seconds between two polls with webhooks. Defaults to 60.
+    Returns:
+        Batch: The finished batch.
+    Raises:
+        APIError: If the batch could not be read, or did not finish in time.
+    """
+    deadline = monotonic() + timeout
+    while True:
+        polled_at = time()
+        status, body = await BatchPortal.get_by_id(batch_id)
+        if status != 200:
+            raise APIError(status, cast(Error, body))
+        batch = cast(Batch, body)
+        if batch["status"] in FINISHED_STATUSES:
+            return batch
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            raise APIError(
+                408,
+                f"Batch {batch_id} still {batch['status']} after {timeout} seconds",
+            )
+
+        bus = event_bus()
+        if bus is None:
+            await sleep(min(poll_interval, remaining))
+        else:
+            await bus.wait_for(
+                "batch", batch_id, timeout=min(late_after, remaining), since=polled_at
+            )
+
+
+class BatchRecovery:
+    """
+    Retries the failed shipments of a batch in fresh batches, without an operator.
+
+    After a batch completes with errors, its failures are classified. Every failed
+    shipment is removed from the batch, the transient ones are put into a new batch
+    and processed again, and the permanent ones are reported for a person to fix.
+    This repeats until a batch completes cleanly or `max_attempts` batches were run.
+
+        recovery = BatchRecovery(max_attempts=3)
+        result = await recovery.run(batch_id)
+        for shipment_id, error in result["permanent"].items():
+            ...
+    """
+
+    __slots__ = (
+        "max_attempts",
+        "classify",
+        "poll_interval",
+        "timeout",
+        "label_layout",
+        "label_format",
+        "concurrency",
+    )
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        classify: Classifier = classify,
+        poll_interval: float = 2.0,
+        timeout: float = 600.0,
+        label_layout: LabelLayouts = "4x6",
+        label_format: LabelFormats = "pdf",
+        concurrency: int = 10,
+    ) -> None:
+        """
+        Args:
+            max_attempts (int): Most batches run in total, including the original one. Defaults to 3.
+            classify (Classifier): Decides whether a failure is transient or permanent.
+            poll_interval (float): Seconds between two polls of a processing batch. Defaults to 2.
+            timeout (float): Seconds to wait for one batch to finish. Defaults to 600.
+            label_layout (LabelLayouts): Layout of the labels of retry batches. Defaults to "4x6".
+            label_format (LabelFormats): Format of the labels of retry batches. Defaults to "pdf".
+            concurrency (int): The most error pages read at once. Defaults to 10.
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.classify = classify
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.label_layout: LabelLayouts = label_layout
+        self.label_format: LabelFormats = label_format
+        self.concurrency = concurrency
+
+    async def _split(
+        self, batch_id: str
+    ) -> tuple[dict[str, BatchError], dict[str, BatchError]]:
+        report = await collect_batch_errors([batch_id], concurrency=self.concurrency)
+        if report.failed:
+            status, error = report.failed[batch_id]
+            raise APIError(status, error)
+
+        transient: dict[str, BatchError] = {}
+        permanent: dict[str, BatchError] = {}
+        for shipment_id, errors in report.by_shipment.items():
+            # One permanent error is enough to make retrying the shipment pointless.
+            if any(self.classify(error) == "permanent" for error in errors):
+                permanent[shipment_id] = errors[0]
+            else:
+                transient[shipment_id] = errors[0]
+        return (transient, permanent)
+
+    async def _remove(self, batch_id: str, shipment_ids: list[str]) -> None:
+        status, body = await BatchPortal.remove_from_batch(
+            batch_id, shipment_ids=shipment_ids
+        )
+        if status != 204:
+            raise APIError(status, cast(Error, body))
+
+    async def _retry(
+        self, batch: Batch, external_id: str, shipment_ids: list[str], attempt: int
+    ) -> str:
+        status, body = await BatchPortal.create(
+            f"{external_id}-retry{attempt}",
+            shipment_ids,
+            None,
+            batch_notes=f"Retry {attempt} of failed shipments from {batch['batch_id']}",
+        )
+        if status not in (200, 207):
+            raise APIError(status, cast(Error, body))
+        new_id = cast(Batch, body)["batch_id"]
+
+        status, body = await BatchPortal.process_batch_id_labels(
+            new_id, label_layout=self.label_layout, label_format=self.label_format
+        )
+        if status != 204:
+            raise APIError(status, cast(Error, body))
+        return new_id
+
+    async def run(self, batch_id: str) -> RecoveryResult:
+        """
+        Waits for a batch to finish and retries its transient failures in new batches.
+        Args:
+            batch_id (str): The batch to recover, already submitted for processing.
+        Returns:
+            RecoveryResult: Every batch run, the shipments retried, the permanent failures,
+                and the transient failures still failing after the last attempt.
+        Raises:
+            APIError: If a call needed to recover the batch failed.
+        """
+        result: RecoveryResult = {
+            "batch_ids": [batch_id],
+            "attempts": 1,
+            "status": "",
+            "retried": [],
+            "permanent": {},
+            "exhausted": {},
+        }
+        external_id = ""
+
+        while True:
+            batch = await wait_for_batch(batch_id, self.poll_interval, self.timeout)
+            external_id = external_id or batch.get("external_batch_id") or batch_id
+            result["status"] = batch["status"]
+            if batch["status"] != BatchStatus.COMPLETED_WITH_ERRORS.value:
+                return result
+
+            transient, permanent = await self._split(batch_id)
+            result["permanent"].update(permanent)
+            failed = [*transient, *permanent]
+            if not failed:
+                return result
+
+            # Failed shipments leave the batch either way, so it can be closed out.
+            await self._remove(batch_id, failed)
+            if not transient:
+                return result
+            if result["attempts"] >= self.max_attempts:
+                result["exhausted"] = transient
+                LOGGER.error(
+                    f"BatchRecovery:::{len(transient)} shipments still failing after {result['attempts']} batches"
+                )
+                return result
+
+            retry_ids = list(transient)
+            batch_id = await self._retry(
+                batch, external_id, retry_ids, result["attempts"]
+            )
+            result["attempts"] += 1
+            result["batch_ids"].append(batch_id)
+            # Later retries only ever hold shipments from the first one.
+            result["retried"] = result["retried"] or retry_ids
+            LOGGER.info(
+                f"BatchRecovery:::Retrying {len(retry_ids)} shipments in batch {batch_id}"
+            )
@@ -0,0 +1,317 @@
+from asyncio import FIRST_COMPLETED, Task, create_task, wait
+from collections import deque
+from threading import Lock
+from typing import Iterator, Literal, Sequence, TypedDict, cast
+
+from ..common._types import Error, LabelFormats, LabelLayouts  # type: ignore[import-not-found]
+from ..common.base import LOGGER, APIError, to_utc  # type: ignore[import-not-found]
+from ._types import Batch
+from .batches import BatchPortal
+from .recovery import wait_for_batch
+
+Action = Literal["increase", "decrease", "hold"]
+
+
+class SizingDecision(TypedDict):
+    batch_id: str
+    count: int
+    latency: float
+    error_rate: float
+    action: Action
+    size: int
+    concurrency: int
+
+
+class SizingMetrics(TypedDict):
+    size: int
+    concurrency: int
+    observations: int
+    increases: int
+    decreases: int
+    latency_ewma: float
+    error_rate_ewma: float
+    shipments_per_second: float
+
+
+def batch_latency(batch: Batch) -> float | None:
+    """
+    Seconds a batch took from creation until its labels were processed.
+    Args:
+        batch (Batch): A processed batch.
+    Returns:
+        float | None: The latency, or None if the batch has not been processed.
+    """
+    created, processed = batch.get("created_at"), batch.get("processed_at")
+    if not created or not processed:
+        return None
+    delta = to_utc(processed) - to_utc(created)
+    return max(delta.total_seconds(), 0.0)
+
+
+def batch_error_rate(batch: Batch) -> float:
+    """
+    Fraction of the shipments of a batch that failed.
+    Args:
+        batch (Batch): A processed batch.
+    Returns:
+        float: errors / (errors + completed), or 0 for an empty batch.
+    """
+    errors = batch.get("errors", 0) or 0
+    done = errors + (batch.get("completed", 0) or 0)
+    return errors / done if done else 0.0
+
+
+class BatchSizer:
+    """
+    AIMD controller for how many shipments go into each batch, and how many
+    batches are processed at once.
+
+    Every finished batch is compared against a target latency and error rate.
+    While both are met, the batch size grows by a fixed step, and one more batch is
+    allowed in flight if the batch finished well inside the target or the size is at
+    its maximum. When either is missed, the size is cut by `decrease` and one batch
+    fewer is allowed in flight. The result settles just below the largest batches
+    ShipStation turns around in time.
+
+    Observations may come from any thread, so state is guarded by a threading lock.
+    """
+
+    __slots__ = (
+        "target_latency",
+        "max_error_rate",
+        "min_size",
+        "max_size",
+        "step",
+        "decrease",
+        "min_concurrency",
+        "max_concurrency",
+        "headroom",
+        "smoothing",
+        "size",
+        "concurrency",
+        "decisions",
+        "_observations",
+        "_increases",
+        "_decreases",
+        "_latency",
+        "_error_rate",
+        "_throughput",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        target_latency: float = 120.0,
+        max_error_rate: float = 0.05,
+        initial_size: int = 50,
+        min_size: int = 10,
+        max_size: int = 500,
+        step: int = 25,
+        decrease: float = 0.5,
+        initial_concurrency: int = 1,
+        min_concurrency: int = 1,
+        max_concurrency: int = 4,
+        headroom: float = 0.5,
+        smoothing: float = 0.3,
+        history: int = 100,
+    ) -> None:
+        """
+        Args:
+            target_latency (float): Seconds a batch may take from creation to processed labels. Defaults to 120.
+            max_error_rate (float): Fraction of failed shipments tolerated per batch. Defaults to 0.05.
+            initial_size (int): Shipments in the first batch. Defaults to 50.
+            min_size (int): Fewest shipments per batch. Defaults to 10.
+            max_size (int): Most shipments per batch. Defaults to 500.
+            step (int): Shipments added after a batch that met the targets. Defaults to 25.
+            decrease (float): Factor the size is multiplied by after a missed target. Defaults to 0.5.
+            initial_concurrency (int): Batches in flight at first. Defaults to 1.
+            min_concurrency (int): Fewest batches in flight. Defaults to 1.
+            max_concurrency (int): Most batches in flight. Defaults to 4.
+            headroom (float): Fraction of the target latency under which concurrency is raised. Defaults to 0.5.
+            smoothing (float): Weight of the newest observation in the reported averages. Defaults to 0.3.
+            history (int): Number of decisions kept in `decisions`. Defaults to 100.
+        """
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        if not 0 < min_size <= max_size:
+            raise ValueError("min_size must be positive and at most max_size")
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.min_size = min_size
+        self.max_size = max_size
+        self.step = step
+        self.decrease = decrease
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.size = min(max(initial_size, min_size), max_size)
+        self.concurrency = min(
+            max(initial_concurrency, min_concurrency), max_concurrency
+        )
+        self.decisions: deque[SizingDecision] = deque(maxlen=history)
+        self._observations = 0
+        self._increases = 0
+        self._decreases = 0
+        self._latency = 0.0
+        self._error_rate = 0.0
+        self._throughput = 0.0
+        self._lock = Lock()
+
+    def _smooth(self, average: float, value: float) -> float:
+        if self._observations == 1:
+            return value
+        return average + self.smoothing * (value - average)
+
+    def observe(self, batch: Batch) -> SizingDecision:
+        """
+        Adjusts the batch size and concurrency after a batch has been processed.
+        Args:
+            batch (Batch): The processed batch.
+        Returns:
+            SizingDecision: What was observed and the size and concurrency to use next.
+        """
+        latency = batch_latency(batch)
+        error_rate = batch_error_rate(batch)
+        count = batch.get("count", 0) or 0
+
+        with self._lock:
+            action: Action = "hold"
+            if latency is not None:
+                self._observations += 1
+                self._latency = self._smooth(self._latency, latency)
+                self._error_rate = self._smooth(self._error_rate, error_rate)
+                if latency > 0:
+                    self._throughput = self._smooth(self._throughput, count / latency)
+
+                if latency > self.target_latency or error_rate > self.max_error_rate:
+                    action = "decrease"
+                    self._decreases += 1
+                    self.size = max(int(self.size * self.decrease), self.min_size)
+                    self.concurrency = max(self.concurrency - 1, self.min_concurrency)
+                else:
+                    size, concurrency = self.size, self.concurrency
+                    # Room to spare on latency means another batch in flight is safe too.
+                    if (
+                        size == self.max_size
+                        or latency <= self.target_latency * self.headroom
+                    ):
+                        self.concurrency = min(concurrency + 1, self.max_concurrency)
+                    self.size = min(size + self.step, self.max_size)
+                    if (self.size, self.concurrency) != (size, concurrency):
+                        action = "increase"
+                        self._increases += 1
+
+            decision: SizingDecision = {
+                "batch_id": batch.get("batch_id", ""),
+                "count": count,
+                "latency": latency if latency is not None else -1.0,
+                "error_rate": error_rate,
+                "action": action,
+                "size": self.size,
+                "concurrency": self.concurrency,
+            }
+            self.decisions.append(decision)
+
+        LOGGER.info(
+            f"BatchSizer:::{decision['batch_id']} {action} to size {decision['size']} x {decision['concurrency']}"
+        )
+        return decision
+
+    def metrics(self) -> SizingMetrics:
+        """
+        Returns the current settings and smoothed observations.
+        Returns:
+            SizingMetrics: Size, concurrency, decision counts, and averaged latency,
+                error rate and throughput.
+        """
+        with self._lock:
+            return {
+                "size": self.size,
+                "concurrency": self.concurrency,
+                "observations": self._observations,
+                "increases": self._increases,
+                "decreases": self._decreases,
+                "latency_ewma": self._latency,
+                "error_rate_ewma": self._error_rate,
+                "shipments_per_second": self._throughput,
+            }
+
+    def chunks(self, shipment_ids: Sequence[str]) -> Iterator[list[str]]:
+        """
+        Splits shipments into batches, reading the current size before each one.
+        Args:
+            shipment_ids (Sequence[str]): The shipments to split.
+        Yields:
+            list[str]: The shipments of the next batch.
+        """
+        start = 0
+        while start < len(shipment_ids):
+            end = start + self.size
+            yield list(shipment_ids[start:end])
+            start = end
+
+
+async def run_batches(
+    shipment_ids: Sequence[str],
+    sizer: BatchSizer | None = None,
+    external_prefix: str | None = None,
+    label_layout: LabelLayouts = "4x6",
+    label_format: LabelFormats = "pdf",
+    poll_interval: float = 2.0,
+    timeout: float = 600.0,
+) -> list[Batch]:
+    """
+    Creates and processes batches for many shipments, sized and paced by a BatchSizer.
+    Args:
+        shipment_ids (Sequence[str]): The shipments to create labels for.
+        sizer (BatchSizer | None): The controller to use. Defaults to a new BatchSizer.
+        external_prefix (str | None): If given, batch N gets the external ID "<prefix>-N".
+        label_layout (LabelLayouts): The layout of the labels. Defaults to "4x6".
+        label_format (LabelFormats): The format of the labels. Defaults to "pdf".
+        poll_interval (float): Seconds between two polls of a processing batch. Defaults to 2.
+        timeout (float): Seconds to wait for one batch to finish. Defaults to 600.
+    Returns:
+        list[Batch]: Every processed batch, in the order they finished.
+    Raises:
+        APIError: If a batch could not be created, processed or read.
+    """
+    sizer = sizer if sizer is not None else BatchSizer()
+
+    async def submit(number: int, chunk: list[str]) -> Batch:
+        external_id = f"{external_prefix}-{number}" if external_prefix else None
+        status, body = await BatchPortal.create(external_id, chunk, None)
+        if status not in (200, 207):
+            raise APIError(status, cast(Error, body))
+        batch_id = cast(Batch, body)["batch_id"]
+
+        status, body = await BatchPortal.process_batch_id_labels(
+            batch_id, label_layout=label_layout, label_format=label_format
+        )
+        if status != 204:
+            raise APIError(status, cast(Error, body))
+        return await wait_for_batch(batch_id, poll_interval, timeout)
+
+    chunks = sizer.chunks(shipment_ids)
+    in_flight: set[Task[Batch]] = set()
+    finished: list[Batch] = []
+    number = 0
+    try:
+        while True:
+            while len(in_flight) < sizer.concurrency:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                number += 1
+                in_flight.add(create_task(submit(number, chunk)))
+            if not in_flight:
+                return finished
+
+            done, in_flight = await wait(in_flight, return_when=FIRST_COMPLETED)
+            for task in done:
+                batch = task.result()
+                sizer.observe(batch)
+                finished.append(batch)
+    finally:
+        for task in in_flight:
+            task.cancel()
@@ -0,0 +1,596 @@
+from argparse import ArgumentParser
+from asyncio import Semaphore, gather, run
+from functools import partial
+from json import dumps, loads
+from pathlib import Path
+from statistics import quantiles
+from sys import exit as sys_exit
+from time import perf_counter
+from tracemalloc import get_traced_memory, is_tracing, start, stop
+from typing import Any, Awaitable, Callable, TypedDict
+
+from ..batches.batches import BatchPortal  # type: ignore[import-not-found]
+from ..batches.errors import collect_batch_errors  # type: ignore[import-not-found]
+from ..carriers.carriers import CarrierPortal  # type: ignore[import-not-found]
+from ..common.base import LOGGER, ShipStationClient  # type: ignore[import-not-found]
+from ..common.concurrency import map_concurrent  # type: ignore[import-not-found]
+from ..common.ratelimit import RateLimiter  # type: ignore[import-not-found]
+from ..downloads.downloads import DownloadPortal  # type: ignore[import-not-found]
+from ..fulfillments.export import (  # type: ignore[import-not-found]
+    export_fulfillments,
+)
+from ..fulfillments.fulfillments import (  # type: ignore[import-not-found]
+    Fulfillment,
+)
+from ..inventory.inventory import InventoryPortal  # type: ignore[import-not-found]
+from .mock_server import MockShipStation
+
+Operation = Callable[[], Awaitable[tuple[int, Any]]]
+
+
+class ScenarioResult(TypedDict):
+    name: str
+    calls: int
+    requests: int
+    errors: int
+    throttled: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    peak_kib: float
+
+
+class Scenario(TypedDict):
+    name: str
+    operations: Callable[[MockShipStation], list[Operation]]
+    concurrency: int
+
+
+def _percentiles(latencies: list[float]) -> tuple[float, float, float]:
+    if not latencies:
+        return (0.0, 0.0, 0.0)
+    if len(latencies) == 1:
+        return (latencies[0], latencies[0], latencies[0])
+    cuts = quantiles(latencies, n=100, method="inclusive")
+    return (cuts[49], cuts[89], cuts[98])
+
+
+async def run_scenario(
+    mock: MockShipStation,
+    scenario: Scenario,
+) -> ScenarioResult:
+    """
+    Runs every operation of a scenario against the mock server and measures it.
+    Args:
+        mock (MockShipStation): The mock server the client is connected to.
+        scenario (Scenario): The scenario to run.
+    Returns:
+        ScenarioResult: Throughput, latency percentiles and peak traced memory of the run.
+    """
+    operations = scenario["operations"](mock)
+    semaphore = Semaphore(scenario["concurrency"])
+    latencies: list[float] = []
+    errors = 0
+
+    async def timed(operation: Operation) -> None:
+        nonlocal errors
+        async with semaphore:
+            began = perf_counter()
+            status, _ = await operation()
+            latencies.append(perf_counter() - began)
+            if status >= 400:
+                errors += 1
+
+    mock.reset_counters()
+    tracing = is_tracing()
+    if not tracing:
+        start()
+
+    began = perf_counter()
+    await gather(*(timed(operation) for operation in operations))
+    seconds = perf_counter() - began
+
+    _, peak = get_traced_memory()
+    if not tracing:
+        stop()
+
+    p50, p90, p99 = _percentiles(latencies)
+    return {
+        "name": scenario["name"],
+        "calls": len(operations),
+        "requests": mock.requests,
+        "errors": errors,
+        "throttled": mock.throttled,
+        "seconds": round(seconds, 4),
+        "throughput": round(mock.requests / seconds, 2) if seconds else 0.0,
+        "p50_ms": round(p50 * 1000, 3),
+        "p90_ms": round(p90 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def _repeat(n: int, operation: Operation) -> list[Operation]:
+    return [operation] * n
+
+
+async def _page_all(
+    fetch: Callable[[int], Awaitable[tuple[int, Any]]],
+) -> tuple[int, Any]:
+    page = 1
+    while True:
+        status, body = await fetch(page)
+        if status >= 400 or page >= body.get("pages", 1):
+            return (status, body)
+        page += 1
+
+
+def method_scenarios(iterations: int, concurrency: int) -> list[Scenario]:
+    """
+    Builds one scenario per Portal method.
+    Args:
+        iterations (int): Number of calls made per method.
+        concurrency (int): Number of calls in flight at once.
+    Returns:
+        list[Scenario]: The scenarios, in the order they should run.
+    """
+
+    def first_batch(mock: MockShipStation) -> str:
+        return next(iter(mock.batches))
+
+    def first_carrier(mock: MockShipStation) -> str:
+        return next(iter(mock.carriers))
+
+    def batch_ops(mock: MockShipStation, n: int) -> list[str]:
+        ids = list(mock.batches)
+        return [ids[i % len(ids)] for i in range(n)]
+
+    def carrier(
+        method: Callable[[str], Awaitable[tuple[int, Any]]],
+    ) -> Callable[[MockShipStation], list[Operation]]:
+        return lambda mock: _repeat(iterations, lambda: method(first_carrier(mock)))
+
+    scenarios: list[Scenario] = [
+        {
+            "name": "BatchPortal.list",
+            "operations": lambda mock: _repeat(iterations, lambda: BatchPortal.list()),
+            "concurrency": concurrency,
+        },
+        {
+            "name": "BatchPortal.create",
+            "operations": lambda mock: [
+                partial(
+                    BatchPortal.create,
+                    f"bench-{i}",
+                    [f"se-{i}-{s}" for s in range(50)],
+                    None,
+                )
+                for i in range(iterations)
+            ],
+            "concurrency": concurrency,
+        },
+        {
+            "name": "BatchPortal.get_by_external_id",
+            "operations": lambda mock: _repeat(
+                iterations, lambda: BatchPortal.get_by_external_id("ext-0")
+            ),
+            "concurrency": concurrency,
+        },
+        {
+            "name": "BatchPortal.get_by_id",
+            "operations": lambda mock: [
+                partial(BatchPortal.get_by_id, batch_id)
+                for batch_id in batch_ops(mock, iterations)
+            ],
+            "concurrency": concurrency,
+        },
+        {
+            "name": "BatchPortal.add_to_batch",
+            "operations": lambda mock: _repeat(
+                iterations,
+                lambda: BatchPortal.add_to_batch(
+                    first_batch(mock), "ext-0", shipment_ids=["se-1", "se-2"]
+                ),
+            ),
+            "concurrency": concurrency,
+        },
+        {
+            "name": "BatchPortal.remove_from_batch",
+            "operations": lambda mock: _repeat(
+                iterations,
+                lambda: BatchPortal.remove_from_batch(
+                    first_batch(mock), shipment_ids=["se-1"]
+                ),
+            ),
+            "concurrency": concurrency,
+        },
+        {
+            "name": "BatchPortal.get_batch_errors",
+            "operations": lambda mock: [
+                partial(BatchPortal.get_batch_errors, batch_id)
+                for batch_id in batch_ops(mock, iterations)
+            ],
+            "concurrency": concurrency,
+        },
+        {
+            "name": "BatchPortal.process_batch_id_labels",
+            "operations": lambda mock: [
+                partial(BatchPortal.process_batch_id_labels, batch_id)
+                for batch_id in batch_ops(mock, iterations)
+            ],
+            "concurrency": concurrency,
+        },
+        {
+            "name": "BatchPortal.archive_by_id",
+            "operations": lambda mock: [
+                partial(BatchPortal.archive_by_id, batch_id)
+                for batch_id in batch_ops(mock, iterations)
+            ],
+            "concurrency": concurrency,
+        },
+        {
+            "name": "BatchPortal.delete_by_id",
+            "operations": lambda mock: [
+                partial(BatchPortal.delete_by_id, batch_id)
+                for batch_id in list(mock.batches)[-iterations:]
+            ],
+            "concurrency": concurrency,
+        },
+        {
+            "name": "CarrierPortal.list_carriers",
+            "operations": lambda mock: _repeat(
+                iterations, lambda: CarrierPortal.list_carriers()
+            ),
+            "concurrency": concurrency,
+        },
+        {
+            "name": "CarrierPortal.get_by_id",
+            "operations": carrier(CarrierPortal.get_by_id),
+            "concurrency": concurrency,
+        },
+        {
+            "name": "CarrierPortal.get_options",
+            "operations": carrier(CarrierPortal.get_options),
+            "concurrency": concurrency,
+        },
+        {
+            "name": "CarrierPortal.get_packages",
+            "operations": carrier(CarrierPortal.get_packages),
+            "concurrency": concurrency,
+        },
+        {
+            "name": "CarrierPortal.get_services",
+            "operations": carrier(CarrierPortal.get_services),
+            "concurrency": concurrency,
+        },
+        {
+            "name": "DownloadPortal.download_file",
+            "operations": lambda mock: _repeat(
+                iterations,
+                lambda: DownloadPortal.download_file(
+                    "1", "se-1000000", "label-0.pdf", "1"
+                ),
+            ),
+            "concurrency": concurrency,
+        },
+        {
+            "name": "Fulfillment.list",
+            "operations": lambda mock: _repeat(
+                iterations,
+                lambda: Fulfillment.list(*([None] * 13)),
+            ),
+            "concurrency": concurrency,
+        },
+        {
+            "name": "Fulfillment.create",
+            "operations": lambda mock: [
+                partial(
+                    Fulfillment.create,
+                    [
+                        {
+                            "shipment_id": f"se-bench-{i}-{n}",
+                            "tracking_number": f"1ZBENCH{i:06d}{n:04d}",
+                            "carrier_code": "ups",
+                        }
+                        for n in range(20)
+                    ],
+                )
+                for i in range(iterations)
+            ],
+            "concurrency": concurrency,
+        },
+        {
+            "name": "InventoryPortal.list",
+            "operations": lambda mock: _repeat(
+                iterations,
+                lambda: InventoryPortal.list("", "se-1", "se-10", "warehouse", 100),
+            ),
+            "concurrency": concurrency,
+        },
+        {
+            "name": "InventoryPortal.update",
+            "operations": lambda mock: [
+                partial(
+                    InventoryPortal.update,
+                    "increment",
+                    item["inventory_location_id"],
+                    item["sku"],
+                    1,
+                    None,
+                )
+                for item in mock.inventory[:iterations]
+            ],
+            "concurrency": concurrency,
+        },
+    ]
+    return scenarios
+
+
+def workflow_scenarios(repeat: int, concurrency: int) -> list[Scenario]:
+    """
+    Builds one scenario per bulk workflow. Each operation runs a whole workflow.
+    Args:
+        repeat (int): Number of times each workflow is run.
+        concurrency (int): Number of requests a workflow keeps in flight at once.
+    Returns:
+        list[Scenario]: The scenarios, in the order they should run.
+    """
+
+    async def bounded(operations: list[Operation]) -> tuple[int, Any]:
+        results = await map_concurrent(
+            lambda operation: operation(), operations, concurrency=concurrency
+        )
+        return (max((status for status, _ in results), default=200), None)
+
+    def batches_get_by_id(mock: MockShipStation) -> Operation:
+        return lambda: bounded(
+            [
+                partial(BatchPortal.get_by_id, batch_id)
+                for batch_id in list(mock.batches)
+            ]
+        )
+
+    def services_all(mock: MockShipStation) -> Operation:
+        return lambda: bounded(
+            [
+                partial(CarrierPortal.get_services, carrier_id)
+                for carrier_id in list(mock.carriers)
+            ]
+        )
+
+    def inventory_update(mock: MockShipStation) -> Operation:
+        return lambda: bounded(
+            [
+                partial(
+                    InventoryPortal.update,
+                    "increment",
+                    item["inventory_location_id"],
+                    item["sku"],
+                    1,
+                    None,
+                )
+                for item in mock.inventory
+            ]
+        )
+
+    def batch_errors_all(mock: MockShipStation) -> Operation:
+        return lambda: bounded(
+            [
+                partial(_page_all, partial(BatchPortal.get_batch_errors, batch_id))
+                for batch_id, batch in list(mock.batches.items())
+                if batch["errors"]
+            ]
+        )
+
+    async def batch_errors_aggregate(mock: MockShipStation) -> tuple[int, Any]:
+        report = await collect_batch_errors(
+            [batch_id for batch_id, batch in mock.batches.items() if batch["errors"]],
+            concurrency=concurrency,
+        )
+        return (max(report.failed.values(), default=(200, None))[0], report)
+
+    async def fulfillments_range_scan() -> tuple[int, Any]:
+        fulfillments = await export_fulfillments(
+            "2025-01-01", "2025-02-01", concurrency=concurrency
+        )
+        return (200, fulfillments)
+
+    scenarios: list[Scenario] = [
+        {
+            "name": "workflow.batches.page_all",
+            "operations": lambda mock: _repeat(
+                repeat, lambda: _page_all(lambda page: BatchPortal.list(page=page))
+            ),
+            "concurrency": 1,
+        },
+        {
+            "name": "workflow.batches.get_by_id_all",
+            "operations": lambda mock: _repeat(repeat, batches_get_by_id(mock)),
+            "concurrency": 1,
+        },
+        {
+            "name": "workflow.batches.errors_all",
+            "operations": lambda mock: _repeat(repeat, batch_errors_all(mock)),
+            "concurrency": 1,
+        },
+        {
+            "name": "workflow.batches.errors_aggregate",
+            "operations": lambda mock: _repeat(
+                repeat, partial(batch_errors_aggregate, mock)
+            ),
+            "concurrency": 1,
+        },
+        {
+            "name": "workflow.carriers.services_all",
+            "operations": lambda mock: _repeat(repeat, services_all(mock)),
+            "concurrency": 1,
+        },
+        {
+            "name": "workflow.fulfillments.export",
+            "operations": lambda mock: _repeat(
+                repeat,
+                lambda: _page_all(
+                    lambda page: Fulfillment.list(*([None] * 13), page=page)
+                ),
+            ),
+            "concurrency": 1,
+        },
+        {
+            "name": "workflow.fulfillments.range_scan",
+            "operations": lambda mock: _repeat(repeat, fulfillments_range_scan),
+            "concurrency": 1,
+        },
+        {
+            "name": "workflow.inventory.update_all",
+            "operations": lambda mock: _repeat(repeat, inventory_update(mock)),
+            "concurrency": 1,
+        },
+    ]
+    return scenarios
+
+
+async def run_suite(
+    mock: MockShipStation,
+    scenarios: list[Scenario],
+    only: str | None = None,
+) -> list[ScenarioResult]:
+    """
+    Connects the client to the mock server and runs the given scenarios in order.
+    Args:
+        mock (MockShipStation): The mock server to route every request to.
+        scenarios (list[Scenario]): The scenarios to run.
+        only (str | None): If given, only scenarios whose name contains this string are run.
+    Returns:
+        list[ScenarioResult]: One result per scenario that was run.
+    """
+    await ShipStationClient.close()
+    await ShipStationClient.start(transport=mock)
+    try:
+        return [
+            await run_scenario(mock, scenario)
+            for scenario in scenarios
+            if only is None or only in scenario["name"]
+        ]
+    finally:
+        await ShipStationClient.close()
+
+
+def compare(
+    results: list[ScenarioResult],
+    baseline: list[ScenarioResult],
+    tolerance: float,
+) -> list[str]:
+    """
+    Compares results against a baseline run and lists the regressions.
+    Args:
+        results (list[ScenarioResult]): The results of the current run.
+        baseline (list[ScenarioResult]): The results of a previous run.
+        tolerance (float): Allowed relative slowdown, e.g. 0.2 for 20%.
+    Returns:
+        list[str]: A description of every scenario that regressed beyond the tolerance.
+    """
+    previous = {result["name"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result["name"])
+        if before is None:
+            continue
+        for metric in ("p50_ms", "p99_ms", "peak_kib"):
+            allowed = before[metric] * (1 + tolerance)
+            if before[metric] > 0 and result[metric] > allowed:
+                regressions.append(
+                    f"{result['name']} {metric}: {before[metric]} -> {result[metric]}"
+                )
+        if result["throughput"] < before["throughput"] / (1 + tolerance):
+            regressions.append(
+                f"{result['name']} throughput: {before['throughput']} -> {result['throughput']}"
+            )
+    return regressions
+
+
+def report(results: list[ScenarioResult]) -> str:
+    """
+    Formats results as a fixed-width table.
+    Args:
+        results (list[ScenarioResult]): The results to format.
+    Returns:
+        str: The formatted table.
+    """
+    header = (
+        f"{'scenario':<40}{'calls':>7}{'reqs':>7}{'err':>5}{'429':>5}"
+        f"{'req/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'peak KiB':>11}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['name']:<40}{r['calls']:>7}{r['requests']:>7}{r['errors']:>5}"
+            f"{r['throttled']:>5}{r['throughput']:>10}{r['p50_ms']:>10}"
+            f"{r['p90_ms']:>10}{r['p99_ms']:>10}{r['peak_kib']:>11}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        description="Benchmark every Portal method and bulk workflow against a mock ShipStation API."
+    )
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument(
+        "--page-latency",
+        type=float,
+        default=0.0,
+        help="Extra seconds per page skipped by list requests.",
+    )
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        default=0,
+        help="Requests per minute for the client rate limiter. 0 disables it.",
+    )
+    parser.add_argument("--only", type=str, default=None)
+    parser.add_argument("--json", type=Path, default=None, help="Write results here.")
+    parser.add_argument(
+        "--baseline", type=Path, default=None, help="Fail on regressions vs this file."
+    )
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    LOGGER.setLevel("WARNING")
+    ShipStationClient.set_rate_limiter(
+        RateLimiter(args.rate_limit, 60) if args.rate_limit else None
+    )
+    mock = MockShipStation(
+        latency=args.latency,
+        jitter=args.jitter,
+        page_latency=args.page_latency,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    scenarios = method_scenarios(args.iterations, args.concurrency)
+    scenarios += workflow_scenarios(args.repeat, args.concurrency)
+    results = run(run_suite(mock, scenarios, args.only))
+    print(report(results))
+
+    if args.json is not None:
+        args.json.write_text(dumps(results, indent=4))
+
+    if args.baseline is not None:
+        regressions = compare(results, loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys_exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+from argparse import ArgumentParser
+from asyncio import run
+from json import dumps
+from time import perf_counter
+from typing import Any, Awaitable, Callable, TypedDict
+
+from ..batches.batches import BatchPortal  # type: ignore[import-not-found]
+from ..common.base import (  # type: ignore[import-not-found]
+    LOGGER,
+    ShipStationClient,
+    encode_json,
+)
+from ..fulfillments.fulfillments import (  # type: ignore[import-not-found]
+    Fulfillment,
+)
+from .mock_server import MockShipStation
+
+Operation = Callable[[], Awaitable[tuple[int, Any]]]
+
+
+class CompressionResult(TypedDict):
+    name: str
+    mode: str
+    sent_kib: float
+    received_kib: float
+    seconds: float
+
+
+# Each mode: (gzip responses, smallest request body to gzip or None).
+MODES: dict[str, tuple[bool, int | None]] = {
+    "plain": (False, None),
+    "gzip responses": (True, None),
+    "gzip both": (True, 1024),
+}
+
+
+def _cases(page_size: int, ids: int) -> dict[str, Operation]:
+    gists = [
+        {
+            "shipment_id": f"se-{10_000_000 + n}",
+            "tracking_number": f"1Z999AA1{n:010d}",
+            "notify_customer": True,
+            "notify_order_source": True,
+            "carrier_code": "ups",
+            "ship_date": "2025-01-01T12:00:00Z",
+        }
+        for n in range(ids)
+    ]
+    shipment_ids = [f"se-{10_000_000 + n}" for n in range(ids)]
+    return {
+        f"fulfillments.list page_size={page_size}": lambda: Fulfillment.list(
+            *([None] * 13), page_size=page_size
+        ),
+        f"fulfillments.create {ids} gists": lambda: Fulfillment.create(gists),
+        f"batches.create {ids} ids": lambda: BatchPortal.create(
+            "compression-bench", shipment_ids, None
+        ),
+    }
+
+
+async def measure(
+    name: str,
+    operation: Operation,
+    mode: str,
+    calls: int,
+    bandwidth: float | None,
+    latency: float,
+) -> CompressionResult:
+    """
+    Runs an operation `calls` times against a fresh mock server in one mode.
+    Args:
+        name (str): The case, for the report.
+        operation (Operation): The call to measure.
+        mode (str): A key of MODES.
+        calls (int): How many times to call it, one at a time.
+        bandwidth (float | None): Bytes per second of the simulated link.
+        latency (float): Seconds the server waits before answering.
+    Returns:
+        CompressionResult: The bytes each way and the wall time of the calls.
+    """
+    compress_responses, compress_requests = MODES[mode]
+    mock = MockShipStation(
+        latency=latency, compression=compress_responses, bandwidth=bandwidth
+    )
+    ShipStationClient.set_request_compression(compress_requests)
+    await ShipStationClient.close()
+    await ShipStationClient.start(transport=mock)
+    try:
+        began = perf_counter()
+        for _ in range(calls):
+            status, _ = await operation()
+            if status != 200:
+                raise RuntimeError(f"{name} answered {status} in mode {mode!r}")
+        seconds = perf_counter() - began
+    finally:
+        await ShipStationClient.close()
+        ShipStationClient.set_request_compression(None)
+
+    return {
+        "name": name,
+        "mode": mode,
+        "sent_kib": round(mock.bytes_received / calls / 1024, 1),
+        "received_kib": round(mock.bytes_sent / calls / 1024, 1),
+        "seconds": round(seconds / calls, 4),
+    }
+
+
+def encode_times(ids: int, repeat: int = 20) -> tuple[float, float]:
+    """
+    Times serializing a bulk body of `ids` shipment IDs with the default json
+    settings and with encode_json.
+    Returns:
+        tuple[float, float]: Milliseconds per body for json.dumps and for encode_json.
+    """
+    body = {"shipment_ids": [f"se-{10_000_000 + n}" for n in range(ids)]}
+    began = perf_counter()
+    for _ in range(repeat):
+        dumps(body).encode("utf-8")
+    default = perf_counter() - began
+    began = perf_counter()
+    for _ in range(repeat):
+        encode_json(body)
+    fast = perf_counter() - began
+    return (default / repeat * 1000, fast / repeat * 1000)
+
+
+def report(results: list[CompressionResult]) -> str:
+    """
+    Formats results as a fixed-width table.
+    Args:
+        results (list[CompressionResult]): The results to format.
+    Returns:
+        str: The formatted table.
+    """
+    header = f"{'case':<36}{'mode':<16}{'sent KiB':>10}{'recv KiB':>10}{'ms/call':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['name']:<36}{r['mode']:<16}{r['sent_kib']:>10}"
+            f"{r['received_kib']:>10}{r['seconds'] * 1000:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+async def run_all(
+    calls: int, page_size: int, ids: int, bandwidth: float | None, latency: float
+) -> list[CompressionResult]:
+    results = []
+    for name, operation in _cases(page_size, ids).items():
+        for mode in MODES:
+            results.append(
+                await measure(name, operation, mode, calls, bandwidth, latency)
+            )
+    return results
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        description="Compare the bytes and latency of plain and gzip-compressed transport against the mock API."
+    )
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--ids", type=int, default=5000)
+    parser.add_argument(
+        "--bandwidth",
+        type=float,
+        default=10e6 / 8,
+        help="Bytes per second of the simulated link. 0 means unlimited.",
+    )
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    LOGGER.setLevel("WARNING")
+    ShipStationClient.set_rate_limiter(None)
+    results = run(
+        run_all(
+            args.calls, args.page_size, args.ids, args.bandwidth or None, args.latency
+        )
+    )
+    print(report(results))
+
+    default_ms, fast_ms = encode_times(args.ids * 10)
+    print(
+        f"\nencoding {args.ids * 10} shipment IDs: json.dumps {default_ms:.2f} ms, "
+        f"encode_json {fast_ms:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
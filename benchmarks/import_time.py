@@ -0,0 +1,96 @@
+from argparse import ArgumentParser
+from os import environ, pathsep
+from pathlib import Path
+from statistics import median
+from subprocess import run
+from sys import executable
+from sys import exit as sys_exit
+
+PACKAGE = (__package__ or "benchmarks").rpartition(".")[0]
+ROOT = Path(__file__).resolve().parents[2]
+
+MODULES = (
+    "batches.batches",
+    "carriers.carriers",
+    "downloads.downloads",
+    "fulfillments.fulfillments",
+    "inventory.inventory",
+)
+
+# Cumulative import time allowed per portal module, in milliseconds.
+DEFAULT_BUDGET_MS = 60.0
+
+
+def import_time(module: str | None) -> tuple[float, list[tuple[float, str]]]:
+    """
+    Imports a module in a fresh interpreter under `python -X importtime`.
+    Args:
+        module (str | None): The dotted module path to import, or None to only start the interpreter.
+    Returns:
+        tuple[float, list[tuple[float, str]]]: The cumulative import time of the module in
+            milliseconds, and the cumulative time of every module it pulled in.
+    """
+    env = {
+        **environ,
+        "PYTHONPATH": pathsep.join([str(ROOT), environ.get("PYTHONPATH", "")]),
+    }
+    result = run(
+        [
+            executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import {module}" if module else "pass",
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    timings: list[tuple[float, str]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        timings.append((int(cumulative) / 1000, name.strip()))
+
+    total = next((ms for ms, name in timings if name == module), 0.0)
+    return (total, timings)
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        description="Measure the import time of each portal module and enforce a budget."
+    )
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports to show.")
+    args = parser.parse_args()
+
+    startup = {name for _, name in import_time(None)[1]}
+    over = []
+    for module in MODULES:
+        dotted = f"{PACKAGE}.{module}" if PACKAGE else module
+        runs = [import_time(dotted) for _ in range(args.runs)]
+        total = median(ms for ms, _ in runs)
+        status = "ok" if total <= args.budget_ms else "OVER BUDGET"
+        print(f"{dotted:<45}{total:>9.2f} ms  {status}")
+
+        pulled_in = [t for t in runs[-1][1] if t[1] not in startup and t[1] != dotted]
+        slowest = sorted(pulled_in, reverse=True)[: args.top]
+        for ms, name in slowest:
+            print(f"    {name:<41}{ms:>9.2f} ms")
+
+        if total > args.budget_ms:
+            over.append(dotted)
+
+    if over:
+        print(
+            f"Import time budget of {args.budget_ms} ms exceeded by: {', '.join(over)}"
+        )
+        sys_exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,647 @@
+from asyncio import get_running_loop, sleep
+from datetime import datetime, timedelta
+from gzip import compress, decompress
+from json import dumps, loads
+from math import ceil
+from random import Random
+from typing import Any, Callable
+
+from httpx import ByteStream, MockTransport, Request, Response
+
+from ..common._types import Error  # type: ignore[import-not-found]
+
+API_PREFIX = "/v2"
+
+BATCH_ERRORS = (
+    "Invalid address: postal code does not match city",
+    "Rate is no longer valid for this shipment",
+    "Package weight exceeds the service limit",
+    "Customs information is required for this destination",
+)
+
+
+def _links(path: str, page: int, pages: int, page_size: int) -> dict[str, Any]:
+    def href(n: int) -> dict[str, Any]:
+        return {"href": f"{path}?page={n}&page_size={page_size}", "type": None}
+
+    return {
+        "first": href(1),
+        "last": href(max(pages, 1)),
+        "prev": href(page - 1) if page > 1 else None,
+        "next": href(page + 1) if page < pages else None,
+    }
+
+
+def _address(rng: Random, n: int) -> dict[str, Any]:
+    return {
+        "name": f"Customer {n}",
+        "company_name": None,
+        "email": f"customer{n}@example.com",
+        "phone": f"+1-555-{n % 10000:04d}",
+        "address_line1": f"{rng.randint(1, 9999)} Main Street",
+        "address_line2": None,
+        "address_line3": None,
+        "city_locality": "Austin",
+        "state_province": "TX",
+        "postal_code": f"{rng.randint(10000, 99999)}",
+        "country_code": "US",
+    }
+
+
+def make_batch(rng: Random, n: int) -> dict[str, Any]:
+    """
+    Builds a realistic Batch payload.
+    Args:
+        rng (Random): Seeded random source for reproducible payloads.
+        n (int): Sequence number of the batch.
+    Returns:
+        dict[str, Any]: A payload shaped like a Batch.
+    """
+    batch_id = f"se-{1000000 + n}"
+    count = rng.randint(10, 500)
+    errors = rng.choice((0, 0, 0, rng.randint(1, 10)))
+    href = f"https://api.shipstation.com/v2/downloads/1/{batch_id}/label-{n}"
+    return {
+        "label_layout": "4x6",
+        "label_format": "pdf",
+        "batch_id": batch_id,
+        "batch_number": f"{n}",
+        "external_batch_id": f"ext-{n}",
+        "batch_notes": "",
+        "created_at": "2025-01-01T12:00:00Z",
+        "processed_at": "2025-01-01T12:05:00Z",
+        "errors": errors,
+        "process_errors": [],
+        "warnings": 0,
+        "completed": count - errors,
+        "forms": 0,
+        "count": count,
+        "batch_shipments_url": {"href": f"/v2/shipments?batch_id={batch_id}"},
+        "batch_labels_url": {"href": f"/v2/labels?batch_id={batch_id}"},
+        "batch_errors_url": {"href": f"/v2/batches/{batch_id}/errors"},
+        "label_download": {
+            "href": f"{href}.pdf",
+            "pdf": f"{href}.pdf",
+            "png": f"{href}.png",
+            "zpl": f"{href}.zpl",
+        },
+        "form_download": {"href": f"{href}-form.pdf", "type": None},
+        "paperless_download": {"href": "", "instructions": None, "handoff_code": None},
+        "status": "completed_with_errors" if errors else "completed",
+    }
+
+
+def make_carrier(rng: Random, n: int, services: int, packages: int) -> dict[str, Any]:
+    """
+    Builds a realistic Carrier payload including nested services, packages and options.
+    Args:
+        rng (Random): Seeded random source for reproducible payloads.
+        n (int): Sequence number of the carrier.
+        services (int): Number of services to attach.
+        packages (int): Number of packages to attach.
+    Returns:
+        dict[str, Any]: A payload shaped like a Carrier.
+    """
+    carrier_id = f"se-{2000000 + n}"
+    carrier_code = f"carrier_{n}"
+    return {
+        "carrier_id": carrier_id,
+        "carrier_code": carrier_code,
+        "account_number": f"{rng.randint(100000, 999999)}",
+        "requires_funded_amount": False,
+        "balance": round(rng.uniform(0, 1000), 2),
+        "nickname": f"Carrier {n}",
+        "friendly_name": f"Carrier {n}",
+        "funding_source_id": None,
+        "primary": n == 0,
+        "has_multi_package_supporting_services": True,
+        "supports_label_messages": True,
+        "disabled_by_billing_plan": False,
+        "services": [
+            {
+                "carrier_id": carrier_id,
+                "carrier_code": carrier_code,
+                "service_code": f"{carrier_code}_service_{s}",
+                "name": f"Service {s}",
+                "domestic": s % 2 == 0,
+                "international": s % 2 == 1,
+                "is_multi_package_supported": s % 3 == 0,
+            }
+            for s in range(services)
+        ],
+        "packages": [
+            {
+                "package_id": f"se-{3000000 + n * 1000 + p}",
+                "package_code": f"{carrier_code}_package_{p}",
+                "name": f"Package {p}",
+                "dimensions": {
+                    "unit": "inch",
+                    "length": float(rng.randint(4, 30)),
+                    "width": float(rng.randint(4, 20)),
+                    "height": float(rng.randint(1, 20)),
+                },
+                "description": "",
+            }
+            for p in range(packages)
+        ],
+        "options": [
+            {"name": "non_machinable", "default_value": "false", "description": ""},
+            {"name": "saturday_delivery", "default_value": "false", "description": ""},
+        ],
+        "send_rates": True,
+        "supports_user_managed_rates": False,
+    }
+
+
+def make_fulfillment(rng: Random, n: int) -> dict[str, Any]:
+    """
+    Builds a realistic Fulfillment payload including the ship_to address.
+    Args:
+        rng (Random): Seeded random source for reproducible payloads.
+        n (int): Sequence number of the fulfillment.
+    Returns:
+        dict[str, Any]: A payload shaped like a Fulfillment.
+    """
+    day = 1 + n % 28
+    return {
+        "fulfillment_id": f"se-{4000000 + n}",
+        "shipment_id": f"se-{5000000 + n}",
+        "shipment_number": f"{n}",
+        "user_id": "user-1",
+        "tracking_number": f"1Z{n:016d}",
+        "created_at": f"2025-01-{day:02d}T{n % 24:02d}:{n * 7 % 60:02d}:{n * 13 % 60:02d}Z",
+        "ship_date": f"2025-01-{day:02d}T00:00:00Z",
+        "voided_at": None,
+        "delivered_at": None,
+        "fulfillment_carrier_friendly_name": "UPS",
+        "fulfillment_provider_id": None,
+        "fulfillment_provider_friendly_name": None,
+        "fulfillment_provider_code": None,
+        "fulfillment_service_code": None,
+        "fulfillment_fee": {"amount": round(rng.uniform(0, 5), 2), "currency": "usd"},
+        "void_requested": False,
+        "voided": False,
+        "order_source_notified": True,
+        "notification_error_message": None,
+        "ship_to": _address(rng, n),
+    }
+
+
+def make_inventory_item(rng: Random, n: int) -> dict[str, Any]:
+    """
+    Builds a realistic InventoryItem payload.
+    Args:
+        rng (Random): Seeded random source for reproducible payloads.
+        n (int): Sequence number of the item.
+    Returns:
+        dict[str, Any]: A payload shaped like an InventoryItem.
+    """
+    on_hand = rng.randint(0, 500)
+    allocated = rng.randint(0, on_hand)
+    return {
+        "sku": f"SKU-{n:06d}",
+        "on_hand": on_hand,
+        "allocated": allocated,
+        "available": on_hand - allocated,
+        "average_cost": {"amount": round(rng.uniform(1, 50), 2), "currency": "usd"},
+        "inventory_warehouse_id": "se-1",
+        "inventory_location_id": f"se-{10 + n % 5}",
+    }
+
+
+class MockShipStation(MockTransport):
+    """
+    An in-process stand-in for the ShipStation v2 API, served through an httpx transport.
+    Payloads follow the shapes in the *_types modules, list endpoints paginate,
+    and latency and 429 throttling can be injected to mimic production behaviour.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        tail_rate: float = 0.0,
+        tail_latency: float = 1.0,
+        page_latency: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        outages: dict[str, float] | None = None,
+        batches: int = 200,
+        fulfillments: int = 1000,
+        inventory: int = 500,
+        carriers: int = 5,
+        services: int = 20,
+        packages: int = 10,
+        batch_errors: int = 40,
+        label_seconds: float = 0.2,
+        processing_delay: float = 0.0,
+        webhooks: Callable[[dict[str, Any]], object] | None = None,
+        download_size: int = 64 * 1024,
+        max_page_size: int = 500,
+        compression: bool = False,
+        bandwidth: float | None = None,
+        seed: int = 0,
+    ) -> None:
+        """
+        Args:
+            latency (float): Base seconds to wait before answering each request.
+            jitter (float): Extra uniformly distributed seconds added to the latency.
+            tail_rate (float): Probability in [0, 1] that a request is a straggler.
+            tail_latency (float): Extra seconds a straggler waits before answering.
+            page_latency (float): Extra seconds per page skipped by a list request, as with
+                offset pagination, where deep pages get slower.
+            throttle_rate (float): Probability in [0, 1] that a request is answered with a 429.
+            retry_after (int): Value of the Retry-After header sent with injected 429s.
+            outages (dict[str, float] | None): Probability per endpoint family, e.g. {"inventory": 1.0},
+                that a request is answered with a 503. May be changed while running.
+            batches (int): Number of batches in the dataset.
+            fulfillments (int): Number of fulfillments in the dataset.
+            inventory (int): Number of inventory items in the dataset.
+            carriers (int): Number of connected carriers.
+            services (int): Number of services per carrier.
+            packages (int): Number of packages per carrier.
+            batch_errors (int): Number of errors reported for each batch with errors.
+            label_seconds (float): Simulated processing seconds per shipment, reported through
+                the processed_at of batches created against the mock.
+            processing_delay (float): Real seconds a batch stays "processing" after its labels are requested.
+            webhooks (Callable[[dict[str, Any]], object] | None): Called with a ShipStation-shaped
+                webhook payload whenever a batch finishes processing.
+            download_size (int): Size in bytes of each downloadable label file.
+            max_page_size (int): Largest page_size accepted by list endpoints.
+            compression (bool): Gzip JSON responses of 1 KiB or more when the client accepts it.
+            bandwidth (float | None): Bytes per second of the simulated link. Each request waits
+                for its body and its response to cross it. None means unlimited.
+            seed (int): Seed for payload generation, latency jitter and throttling.
+        """
+        super().__init__(self.handle)
+        self.latency = latency
+        self.jitter = jitter
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.page_latency = page_latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.outages: dict[str, float] = dict(outages or {})
+        self.batch_errors = batch_errors
+        self.label_seconds = label_seconds
+        self.processing_delay = processing_delay
+        self.webhooks = webhooks
+        self.max_page_size = max_page_size
+        self.compression = compression
+        self.bandwidth = bandwidth
+        self._rng = Random(seed)
+
+        data_rng = Random(seed)
+        self.batches: dict[str, dict[str, Any]] = {
+            b["batch_id"]: b for b in (make_batch(data_rng, n) for n in range(batches))
+        }
+        self.carriers: dict[str, dict[str, Any]] = {
+            c["carrier_id"]: c
+            for c in (
+                make_carrier(data_rng, n, services, packages) for n in range(carriers)
+            )
+        }
+        self.fulfillments: list[dict[str, Any]] = [
+            make_fulfillment(data_rng, n) for n in range(fulfillments)
+        ]
+        self.inventory: list[dict[str, Any]] = [
+            make_inventory_item(data_rng, n) for n in range(inventory)
+        ]
+        self.download = b"%PDF-1.7\n" + bytes(max(download_size - 9, 0))
+
+        self.requests = 0
+        self.throttled = 0
+        self.failed = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def reset_counters(self) -> None:
+        """
+        Resets the request, throttle, outage and byte counters.
+        """
+        self.requests = 0
+        self.throttled = 0
+        self.failed = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    @staticmethod
+    def _json(status: int, body: object) -> Response:
+        return Response(
+            status,
+            content=dumps(body).encode("utf-8"),
+            headers={"content-type": "application/json"},
+        )
+
+    @staticmethod
+    def _error(status: int, code: str, message: str) -> Response:
+        error: Error = {
+            "error_source": "ShipStation",
+            "errors_type": "validation",
+            "error_code": code,
+            "message": message,
+        }
+        return MockShipStation._json(status, error)
+
+    def _page(
+        self, request: Request, key: str, items: list[dict[str, Any]]
+    ) -> Response:
+        params = request.url.params
+        page = int(params.get("page", 1))
+        page_size = int(params.get("page_size", 25))
+        if page_size < 1 or page_size > self.max_page_size:
+            return self._error(
+                400, "invalid_field_value", f"page_size must be 1-{self.max_page_size}"
+            )
+        pages = max(ceil(len(items) / page_size), 1)
+        start = (page - 1) * page_size
+        return self._json(
+            200,
+            {
+                key: items[start : start + page_size],
+                "total": len(items),
+                "page": page,
+                "pages": pages,
+                "links": _links(request.url.path, page, pages, page_size),
+            },
+        )
+
+    async def handle(self, request: Request) -> Response:
+        """
+        Answers a single request, applying the configured latency and throttling.
+        Args:
+            request (Request): The incoming request.
+        Returns:
+            Response: The mocked ShipStation response.
+        """
+        self.requests += 1
+        self.bytes_received += len(request.content)
+
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if self.tail_rate and self._rng.random() < self.tail_rate:
+            delay += self.tail_latency
+        if self.page_latency and request.method == "GET":
+            delay += self.page_latency * (int(request.url.params.get("page", 1)) - 1)
+        if delay > 0:
+            await sleep(delay)
+
+        if self.throttle_rate and self._rng.random() < self.throttle_rate:
+            self.throttled += 1
+            response = self._error(429, "rate_limit_exceeded", "Too many requests")
+            response.headers["Retry-After"] = str(self.retry_after)
+        elif self._outage(request):
+            self.failed += 1
+            response = self._error(503, "unspecified", "Service unavailable")
+        else:
+            response = self.route(request)
+
+        response = self._encode(request, response)
+        sent = int(response.headers.get("content-length", 0))
+        self.bytes_sent += sent
+        if self.bandwidth:
+            await sleep((len(request.content) + sent) / self.bandwidth)
+        return response
+
+    def _body(self, request: Request) -> Any:
+        content = request.content
+        if request.headers.get("content-encoding") == "gzip":
+            content = decompress(content)
+        return loads(content or b"{}")
+
+    def _encode(self, request: Request, response: Response) -> Response:
+        """
+        Gzips a JSON response when compression is on and the client accepts it, so
+        the client decodes it as it would a real compressed response.
+        """
+        body = response.content
+        if (
+            not self.compression
+            or len(body) < 1024
+            or "gzip" not in request.headers.get("accept-encoding", "")
+            or response.headers.get("content-type") != "application/json"
+        ):
+            return response
+        wire = compress(body, compresslevel=5)
+        headers = {**response.headers, "content-encoding": "gzip"}
+        headers["content-length"] = str(len(wire))
+        return Response(response.status_code, headers=headers, stream=ByteStream(wire))
+
+    def _outage(self, request: Request) -> bool:
+        if not self.outages:
+            return False
+        path = request.url.path.removeprefix(API_PREFIX)
+        rate = self.outages.get(path.strip("/").partition("/")[0], 0.0)
+        return rate > 0 and self._rng.random() < rate
+
+    def route(self, request: Request) -> Response:
+        """
+        Dispatches a request to the matching mocked endpoint.
+        Args:
+            request (Request): The incoming request.
+        Returns:
+            Response: The mocked ShipStation response.
+        """
+        path = request.url.path
+        if path.startswith(API_PREFIX):
+            path = path[len(API_PREFIX) :]
+        parts = [p for p in path.split("/") if p]
+        method = request.method
+
+        if not parts:
+            return self._error(404, "unspecified", f"No route for {path}")
+
+        match parts[0]:
+            case "batches":
+                return self._batches(request, method, parts[1:])
+            case "carriers":
+                return self._carriers(method, parts[1:])
+            case "downloads" if method == "GET" and len(parts) == 4:
+                return Response(
+                    200,
+                    content=self.download,
+                    headers={"content-type": "application/pdf"},
+                )
+            case "fulfillments":
+                return self._fulfillments(request, method)
+            case "inventory":
+                return self._inventory(request, method)
+
+        return self._error(404, "unspecified", f"No route for {method} {path}")
+
+    def _batches(self, request: Request, method: str, parts: list[str]) -> Response:
+        if not parts:
+            if method == "GET":
+                status = request.url.params.get("status")
+                items = [
+                    b
+                    for b in self.batches.values()
+                    if status is None or b["status"] == status
+                ]
+                return self._page(request, "batches", items)
+            if method == "POST":
+                body = self._body(request)
+                batch = make_batch(self._rng, len(self.batches))
+                batch["status"] = "open"
+                batch["count"] = len(body.get("shipment_ids") or []) + len(
+                    body.get("rate_ids") or []
+                )
+                batch["processed_at"] = None
+                if body.get("external_batch_id"):
+                    batch["external_batch_id"] = body["external_batch_id"]
+                self.batches[batch["batch_id"]] = batch
+                return self._json(200, batch)
+
+        if len(parts) == 2 and parts[0] == "external_batch_id" and method == "GET":
+            for batch in self.batches.values():
+                if batch["external_batch_id"] == parts[1]:
+                    return self._json(200, batch)
+            return self._error(404, "invalid_identifier", "Batch not found")
+
+        if parts[0] not in self.batches:
+            return self._error(404, "invalid_identifier", "Batch not found")
+        batch = self.batches[parts[0]]
+
+        if len(parts) == 1:
+            match method:
+                case "GET":
+                    return self._json(200, batch)
+                case "DELETE":
+                    del self.batches[parts[0]]
+                    return Response(204)
+                case "PUT":
+                    batch["status"] = "archived"
+                    return Response(204)
+
+        action = "/".join(parts[1:])
+        match (method, action):
+            case ("POST", "add"):
+                body = self._body(request)
+                batch["count"] += len(body.get("shipment_ids") or [])
+                batch["count"] += len(body.get("rate_ids") or [])
+                return Response(204)
+            case ("POST", "remove"):
+                body = self._body(request)
+                batch["count"] -= len(body.get("shipment_ids") or [])
+                batch["count"] -= len(body.get("rate_ids") or [])
+                return Response(204)
+            case ("POST", "process/labels"):
+                batch["errors"] = min(batch["errors"], batch["count"])
+                batch["completed"] = batch["count"] - batch["errors"]
+                batch["processed_at"] = (
+                    datetime.fromisoformat(batch["created_at"])
+                    + timedelta(seconds=batch["count"] * self.label_seconds)
+                ).isoformat()
+                if self.processing_delay > 0:
+                    batch["status"] = "processing"
+                    get_running_loop().call_later(
+                        self.processing_delay, self._finish, batch
+                    )
+                else:
+                    self._finish(batch)
+                return Response(204)
+            case ("GET", "errors"):
+                number = int(batch["batch_number"])
+                errors = [
+                    {
+                        "error": BATCH_ERRORS[i % len(BATCH_ERRORS)],
+                        "shipment_id": f"se-{6000000 + number * 1000 + i}",
+                        "external_shipment_id": f"ext-shipment-{number}-{i}",
+                    }
+                    for i in range(self.batch_errors if batch["errors"] else 0)
+                ]
+                return self._page(request, "errors", errors)
+
+        return self._error(404, "unspecified", f"No route for {method} {action}")
+
+    def _finish(self, batch: dict[str, Any]) -> None:
+        batch["status"] = "completed_with_errors" if batch["errors"] else "completed"
+        if self.webhooks is not None:
+            self.webhooks(
+                {
+                    "resource_type": "API_BATCH",
+                    "resource_url": f"https://api.shipstation.com/v2/batches/{batch['batch_id']}",
+                }
+            )
+
+    def _carriers(self, method: str, parts: list[str]) -> Response:
+        if method != "GET":
+            return self._error(404, "unspecified", "Carriers are read-only")
+
+        if not parts:
+            return self._json(
+                200,
+                {
+                    "carriers": list(self.carriers.values()),
+                    "request_id": "mock",
+                    "errors": [],
+                },
+            )
+
+        carrier = self.carriers.get(parts[0])
+        if carrier is None:
+            return self._error(404, "invalid_identifier", "Carrier not found")
+
+        if len(parts) == 1:
+            return self._json(200, carrier)
+
+        match parts[1]:
+            case "options":
+                return self._json(200, {"options": carrier["options"]})
+            case "packages":
+                return self._json(200, {"packages": carrier["packages"]})
+            case "services":
+                return self._json(200, {"services": carrier["services"]})
+
+        return self._error(404, "unspecified", f"No route for carriers/{parts[1]}")
+
+    def _fulfillments(self, request: Request, method: str) -> Response:
+        if method == "POST":
+            body = self._body(request)
+            created = []
+            for gist in body.get("fulfillments", []):
+                n = len(self.fulfillments)
+                fulfillment = make_fulfillment(self._rng, n)
+                fulfillment["shipment_id"] = gist["shipment_id"]
+                fulfillment["tracking_number"] = gist["tracking_number"]
+                self.fulfillments.append(fulfillment)
+                created.append(
+                    {
+                        "shipment_id": gist["shipment_id"],
+                        "shipment_number": fulfillment["shipment_number"],
+                        "error_message": None,
+                    }
+                )
+            return self._json(200, {"has_errors": False, "fulfillments": created})
+
+        params = request.url.params
+        items = self.fulfillments
+        for field in ("shipment_id", "tracking_number", "fulfillment_id"):
+            if field in params:
+                items = [f for f in items if f[field] == params[field]]
+        if "create_date_start" in params:
+            items = [f for f in items if f["created_at"] >= params["create_date_start"]]
+        if "create_date_end" in params:
+            items = [f for f in items if f["created_at"] < params["create_date_end"]]
+        if "ship_date_start" in params:
+            items = [f for f in items if f["ship_date"] >= params["ship_date_start"]]
+        if "ship_date_end" in params:
+            items = [f for f in items if f["ship_date"] < params["ship_date_end"]]
+        sort_by = "ship_date" if params.get("sort_by") == "shipped_at" else "created_at"
+        items = sorted(
+            items, key=lambda f: f[sort_by], reverse=params.get("sort_dir") == "desc"
+        )
+        return self._page(request, "fulfillments", items)
+
+    def _inventory(self, request: Request, method: str) -> Response:
+        if method == "POST":
+            body = self._body(request)
+            for item in self.inventory:
+                if item["sku"] == body.get("sku"):
+                    item["on_hand"] += int(body.get("quantity", 0))
+                    item["available"] = item["on_hand"] - item["allocated"]
+                    break
+            return Response(204)
+
+        sku = request.url.params.get("sku")
+        items = [i for i in self.inventory if not sku or i["sku"] == sku]
+        return self._page(request, "inventory", items)
@@ -0,0 +1,116 @@
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from typing import Any
+
+from ..fulfillments.reconcile import (  # type: ignore[import-not-found]
+    FulfillmentColumns,
+    Order,
+    OrderColumns,
+    reconcile,
+)
+from .mock_server import make_fulfillment
+
+PAGE_SIZE = 500
+
+
+def dataset(count: int, seed: int = 0) -> tuple[list[Order], list[dict[str, Any]]]:
+    """
+    Builds `count` orders and their fulfillments, with about 1% of each issue.
+    Returns:
+        tuple[list[Order], list[dict[str, Any]]]: The orders and the Fulfillment payloads.
+    """
+    rng = Random(seed)
+    fulfillments = []
+    orders: list[Order] = []
+    for n in range(count):
+        fulfillment = make_fulfillment(rng, n)
+        order: Order = {
+            "shipment_id": fulfillment["shipment_id"],
+            "tracking_number": fulfillment["tracking_number"],
+            "fee": fulfillment["fulfillment_fee"]["amount"],
+        }
+        orders.append(order)
+        roll = rng.random()
+        if roll < 0.01:
+            continue  # missing
+        if roll < 0.02:
+            fulfillment["voided"] = True
+        elif roll < 0.03:
+            order["fee"] = fulfillment["fulfillment_fee"]["amount"] + 1
+        elif roll < 0.04:
+            fulfillment["order_source_notified"] = False
+        fulfillments.append(fulfillment)
+    return (orders, fulfillments)
+
+
+def reconcile_loop(
+    orders: list[Order], fulfillments: list[dict[str, Any]]
+) -> dict[str, int]:
+    """
+    The dict-per-record reconciliation the vectorized one replaces.
+    Returns:
+        dict[str, int]: The count of each issue.
+    """
+    by_shipment: dict[str, dict[str, Any]] = {}
+    for fulfillment in fulfillments:
+        current = by_shipment.get(fulfillment["shipment_id"])
+        if current is None or (current["voided"] and not fulfillment["voided"]):
+            by_shipment[fulfillment["shipment_id"]] = fulfillment
+    counts = {"missing": 0, "voided": 0, "fee_mismatch": 0, "not_notified": 0}
+    for order in orders:
+        match = by_shipment.get(order["shipment_id"])
+        if match is None:
+            counts["missing"] += 1
+        elif match["voided"]:
+            counts["voided"] += 1
+        else:
+            fee = order.get("fee")
+            if (
+                fee is not None
+                and abs(match["fulfillment_fee"]["amount"] - fee) > 0.005
+            ):
+                counts["fee_mismatch"] += 1
+            if not match["order_source_notified"]:
+                counts["not_notified"] += 1
+    return counts
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        description="Time the vectorized reconciliation against a dict loop on synthetic orders."
+    )
+    parser.add_argument("--orders", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start()
+    orders, fulfillments = dataset(args.orders, args.seed)
+    _, as_dicts = get_traced_memory()
+    stop()
+    print(f"dataset: {len(orders)} orders, {len(fulfillments)} fulfillments")
+
+    began = perf_counter()
+    counts = reconcile_loop(orders, fulfillments)
+    print(f"dict loop:           {perf_counter() - began:>7.2f}s  {counts}")
+
+    began = perf_counter()
+    columns = FulfillmentColumns()
+    for offset in range(0, len(fulfillments), PAGE_SIZE):
+        columns.extend(fulfillments[offset : offset + PAGE_SIZE])  # type: ignore[arg-type]
+    order_columns = OrderColumns.from_records(orders)
+    loaded = perf_counter() - began
+    began = perf_counter()
+    report = reconcile(order_columns, columns)
+    joined = perf_counter() - began
+    in_columns = sum(columns.column(name).nbytes for name in columns.DTYPES)
+    print(f"columns from pages:  {loaded:>7.2f}s")
+    print(
+        f"memory: {as_dicts / 2**20:.0f} MiB of dicts, {in_columns / 2**20:.0f} MiB as columns"
+    )
+    print(f"vectorized join:     {joined:>7.2f}s  {report['counts']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,8 @@
 from typing import cast
 
 from ..common._types import Endpoints, Error  # type: ignore[import-not-found]
-from ..common.base import (  # type: ignore[import-not-found]
-    API_ENDPOINT,
-    ShipStationClient,
-)
+from ..common.base import ShipStationClient  # type: ignore[import-not-found]
+from ..common.endpoints import EndpointSpec  # type: ignore[import-not-found]
 from ._types import (
     AdvancedCarrierOptionList,
     Carrier,
@@ -13,184 +11,69 @@ from ._types import (
     ServiceList,
 )
 
+LIST_CARRIERS = EndpointSpec(
+    "carriers.list_carriers", "GET", Endpoints.CARRIERS, expected=(200, 207)
+)
+GET_CARRIER = EndpointSpec(
+    "carriers.get_by_id", "GET", Endpoints.CARRIERS, "/{carrier_id}"
+)
+GET_CARRIER_OPTIONS = EndpointSpec(
+    "carriers.get_options", "GET", Endpoints.CARRIERS, "/{carrier_id}/options"
+)
+GET_CARRIER_PACKAGES = EndpointSpec(
+    "carriers.get_packages", "GET", Endpoints.CARRIERS, "/{carrier_id}/packages"
+)
+GET_CARRIER_SERVICES = EndpointSpec(
+    "carriers.get_services",
+    "GET",
+    Endpoints.CARRIERS,
+    "/{carrier_id}/services",
+    hedge=True,
+)
+
 
 class CarrierPortal(ShipStationClient):
     @classmethod
     async def list_carriers(
         cls: type[ShipStationClient],
     ) -> tuple[int, CarrierListResponse | Error]:
-        endpoint = f"{API_ENDPOINT}/{Endpoints.CARRIERS}"
-
-        try:
-            res = await cls.request(
-                "GET",
-                endpoint,
-            )
-            json = res.json()
-            if res.status_code not in (200, 207):
-                if "error_code" in json:
-                    return (
-                        res.status_code,
-                        cast(Error, json),
-                    )
-                else:
-                    raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, cast(CarrierListResponse, json))
+        return cast(
+            tuple[int, CarrierListResponse | Error],
+            await cls.call(LIST_CARRIERS),
+        )
 
     @classmethod
     async def get_by_id(
         cls: type[ShipStationClient], carrier_id: str
     ) -> tuple[int, Carrier | Error]:
-        endpoint = f"{API_ENDPOINT}/{Endpoints.CARRIERS}/{carrier_id}"
-
-        try:
-            res = await cls.request(
-                "GET",
-                endpoint,
-            )
-            json = res.json()
-            if res.status_code != 200:
-                if "error_code" in json:
-                    return (
-                        res.status_code,
-                        cast(Error, json),
-                    )
-                else:
-                    raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, cast(Carrier, json))
+        return cast(
+            tuple[int, Carrier | Error],
+            await cls.call(GET_CARRIER, path={"carrier_id": carrier_id}),
+        )
 
     @classmethod
     async def get_options(
         cls: type[ShipStationClient], carrier_id: str
     ) -> tuple[int, Error | AdvancedCarrierOptionList]:
-        endpoint = f"{API_ENDPOINT}/{Endpoints.CARRIERS}/{carrier_id}/options"
-
-        try:
-            res = await cls.request(
-                "GET",
-                endpoint,
-            )
-            json = res.json()
-            if res.status_code != 200:
-                if "error_code" in json:
-                    return (
-                        res.status_code,
-                        cast(Error, json),
-                    )
-                else:
-                    raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, cast(AdvancedCarrierOptionList, json))
+        return cast(
+            tuple[int, Error | AdvancedCarrierOptionList],
+            await cls.call(GET_CARRIER_OPTIONS, path={"carrier_id": carrier_id}),
+        )
 
     @classmethod
     async def get_packages(
         cls: type[ShipStationClient], carrier_id: str
     ) -> tuple[int, Error | PackageList]:
-        endpoint = f"{API_ENDPOINT}/{Endpoints.CARRIERS}/{carrier_id}/packages"
-
-        try:
-            res = await cls.request(
-                "GET",
-                endpoint,
-            )
-            json = res.json()
-            if res.status_code != 200:
-                if "error_code" in json:
-                    return (
-                        res.status_code,
-                        cast(Error, json),
-                    )
-                else:
-                    raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, cast(PackageList, json))
+        return cast(
+            tuple[int, Error | PackageList],
+            await cls.call(GET_CARRIER_PACKAGES, path={"carrier_id": carrier_id}),
+        )
 
     @classmethod
     async def get_services(
         cls: type[ShipStationClient], carrier_id: str
     ) -> tuple[int, Error | ServiceList]:
-        endpoint = f"{API_ENDPOINT}/{Endpoints.CARRIERS}/{carrier_id}/services"
-
-        try:
-            res = await cls.request(
-                "GET",
-                endpoint,
-            )
-            json = res.json()
-            if res.status_code != 200:
-                if "error_code" in json:
-                    return (
-                        res.status_code,
-                        cast(Error, json),
-                    )
-                else:
-                    raise Exception(f"Unexpected response: {json}")
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, cast(ServiceList, json))
+        return cast(
+            tuple[int, Error | ServiceList],
+            await cls.call(GET_CARRIER_SERVICES, path={"carrier_id": carrier_id}),
+        )
@@ -0,0 +1,316 @@
+from bisect import bisect_left, insort
+from hashlib import blake2b
+from json import dumps
+from threading import Lock
+from time import monotonic
+from typing import Iterable, Iterator, cast
+
+from ..common._types import Dimensions, Error  # type: ignore[import-not-found]
+from ..common.base import LOGGER, APIError  # type: ignore[import-not-found]
+from ._types import Carrier, CarrierListResponse, Package, Service
+from .carriers import CarrierPortal
+
+CENTIMETERS_PER_INCH = 2.54
+
+# Service flags, one bitset over service slots each.
+DOMESTIC = "domestic"
+INTERNATIONAL = "international"
+MULTI_PACKAGE = "is_multi_package_supported"
+FLAGS: tuple[str, ...] = (DOMESTIC, INTERNATIONAL, MULTI_PACKAGE)
+
+
+def _inches(dimensions: Dimensions) -> tuple[float, float, float]:
+    """
+    Returns the sides of a box in inches, smallest first, so two boxes can be
+    compared in any orientation.
+    """
+    scale = 1 / CENTIMETERS_PER_INCH if dimensions.get("unit") == "centimeters" else 1
+    sides = (
+        dimensions["length"] * scale,
+        dimensions["width"] * scale,
+        dimensions["height"] * scale,
+    )
+    return cast(tuple[float, float, float], tuple(sorted(sides)))
+
+
+def _fingerprint(carrier: Carrier) -> bytes:
+    return blake2b(
+        dumps(carrier, sort_keys=True, default=str).encode(), digest_size=16
+    ).digest()
+
+
+class CarrierIndex:
+    """
+    Precomputed lookups over the services and packages of every connected carrier,
+    for prefiltering before rate shopping.
+
+    Services live in numbered slots. Service codes and carrier codes map to slots,
+    and each flag (domestic, international, multi-package) is a bitset over the
+    slots held in one Python int, so a filter on several flags is a few `&`s instead
+    of a scan of every nested list. Packages are kept sorted by volume, so finding
+    the boxes an item fits starts at the first box large enough.
+
+    `refresh` re-reads the carriers, and only carriers whose payload changed are
+    re-indexed.
+
+        index = CarrierIndex(max_age=3600)
+        await index.refresh()
+        services = index.services(international=True, multi_package=True)
+        box = index.smallest_fit({"unit": "inch", "length": 10, "width": 8, "height": 4})
+    """
+
+    __slots__ = (
+        "max_age",
+        "refreshed_at",
+        "_carriers",
+        "_fingerprints",
+        "_services",
+        "_free",
+        "_carrier_slots",
+        "_by_service_code",
+        "_by_carrier_code",
+        "_flags",
+        "_volumes",
+        "_packages",
+        "_lock",
+    )
+
+    def __init__(self, max_age: float = 3600.0) -> None:
+        """
+        Args:
+            max_age (float): Seconds after which `refresh` re-reads the carriers. Defaults to one hour.
+        """
+        self.max_age = max_age
+        self.refreshed_at: float | None = None
+        self._carriers: dict[str, Carrier] = {}
+        self._fingerprints: dict[str, bytes] = {}
+        self._services: list[Service | None] = []
+        self._free: list[int] = []
+        self._carrier_slots: dict[str, list[int]] = {}
+        self._by_service_code: dict[str, list[int]] = {}
+        self._by_carrier_code: dict[str, int] = {}
+        self._flags: dict[str, int] = {flag: 0 for flag in FLAGS}
+        # (volume, carrier_id, package_id) sorted by volume, and each package's sides.
+        self._volumes: list[tuple[float, str, str]] = []
+        self._packages: dict[
+            tuple[str, str], tuple[tuple[float, float, float], Package]
+        ] = {}
+        self._lock = Lock()
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self.refreshed_at is None or monotonic() - self.refreshed_at > self.max_age
+        )
+
+    async def refresh(self, force: bool = False) -> int:
+        """
+        Re-reads the carriers with CarrierPortal.list_carriers if the index is stale.
+        Args:
+            force (bool): Re-read even if the index is fresh. Defaults to False.
+        Returns:
+            int: The number of carriers added, changed or removed.
+        Raises:
+            APIError: If the carriers could not be listed.
+        """
+        if not force and not self.stale:
+            return 0
+        status, body = await CarrierPortal.list_carriers()
+        if status not in (200, 207):
+            raise APIError(status, cast(Error, body))
+        return self.update(cast(CarrierListResponse, body)["carriers"])
+
+    def update(self, carriers: Iterable[Carrier]) -> int:
+        """
+        Brings the index in line with a complete list of carriers, re-indexing only
+        the carriers that were added, changed or removed.
+        Args:
+            carriers (Iterable[Carrier]): Every connected carrier.
+        Returns:
+            int: The number of carriers added, changed or removed.
+        """
+        incoming = {carrier["carrier_id"]: carrier for carrier in carriers}
+        changed = 0
+        with self._lock:
+            for carrier_id in [c for c in self._carriers if c not in incoming]:
+                self._remove(carrier_id)
+                changed += 1
+            for carrier_id, carrier in incoming.items():
+                fingerprint = _fingerprint(carrier)
+                if self._fingerprints.get(carrier_id) == fingerprint:
+                    continue
+                if carrier_id in self._carriers:
+                    self._remove(carrier_id)
+                self._add(carrier, fingerprint)
+                changed += 1
+            self.refreshed_at = monotonic()
+
+        if changed:
+            LOGGER.info(f"CarrierIndex:::Re-indexed {changed} carriers")
+        return changed
+
+    def _add(self, carrier: Carrier, fingerprint: bytes) -> None:
+        carrier_id = carrier["carrier_id"]
+        self._carriers[carrier_id] = carrier
+        self._fingerprints[carrier_id] = fingerprint
+
+        slots: list[int] = []
+        for service in carrier.get("services") or []:
+            slot = self._free.pop() if self._free else len(self._services)
+            if slot == len(self._services):
+                self._services.append(service)
+            else:
+                self._services[slot] = service
+            slots.append(slot)
+            self._by_service_code.setdefault(service["service_code"], []).append(slot)
+            bit = 1 << slot
+            for flag in FLAGS:
+                if service.get(flag):
+                    self._flags[flag] |= bit
+            code = service.get("carrier_code") or carrier["carrier_code"]
+            self._by_carrier_code[code] = self._by_carrier_code.get(code, 0) | bit
+        self._carrier_slots[carrier_id] = slots
+
+        for package in carrier.get("packages") or []:
+            dimensions = package.get("dimensions")
+            if not dimensions:
+                continue
+            sides = _inches(dimensions)
+            key = (carrier_id, package["package_id"])
+            self._packages[key] = (sides, package)
+            insort(self._volumes, (sides[0] * sides[1] * sides[2], *key))
+
+    def _remove(self, carrier_id: str) -> None:
+        self._carriers.pop(carrier_id)
+        self._fingerprints.pop(carrier_id, None)
+
+        mask = 0
+        for slot in self._carrier_slots.pop(carrier_id, []):
+            service = self._services[slot]
+            self._services[slot] = None
+            self._free.append(slot)
+            mask |= 1 << slot
+            if service is not None:
+                code = service["service_code"]
+                remaining = [s for s in self._by_service_code[code] if s != slot]
+                if remaining:
+                    self._by_service_code[code] = remaining
+                else:
+                    del self._by_service_code[code]
+        for flag in FLAGS:
+            self._flags[flag] &= ~mask
+        for code in list(self._by_carrier_code):
+            self._by_carrier_code[code] &= ~mask
+            if not self._by_carrier_code[code]:
+                del self._by_carrier_code[code]
+
+        self._volumes = [entry for entry in self._volumes if entry[1] != carrier_id]
+        for key in [key for key in self._packages if key[0] == carrier_id]:
+            del self._packages[key]
+
+    def _slots(self, mask: int) -> Iterator[Service]:
+        while mask:
+            low = mask & -mask
+            service = self._services[low.bit_length() - 1]
+            if service is not None:
+                yield service
+            mask ^= low
+
+    def carrier(self, carrier_id: str) -> Carrier | None:
+        return self._carriers.get(carrier_id)
+
+    def service(
+        self, service_code: str, carrier_code: str | None = None
+    ) -> Service | None:
+        """
+        Looks up a service by its code.
+        Args:
+            service_code (str): The service code, e.g. "usps_priority_mail".
+            carrier_code (str | None): The carrier to pick, if several offer the code.
+        Returns:
+            Service | None: The service, or None if no connected carrier offers it.
+        """
+        with self._lock:
+            for slot in self._by_service_code.get(service_code, []):
+                service = self._services[slot]
+                if service is not None and (
+                    carrier_code is None or service["carrier_code"] == carrier_code
+                ):
+                    return service
+            return None
+
+    def services(
+        self,
+        carrier_code: str | None = None,
+        domestic: bool | None = None,
+        international: bool | None = None,
+        multi_package: bool | None = None,
+    ) -> list[Service]:
+        """
+        Lists the services matching every given filter.
+        Args:
+            carrier_code (str | None): Only services of this carrier.
+            domestic (bool | None): Only services that do (True) or do not (False) ship domestically.
+            international (bool | None): Only services that do or do not ship internationally.
+            multi_package (bool | None): Only services that do or do not support multiple packages.
+        Returns:
+            list[Service]: The matching services.
+        """
+        with self._lock:
+            everything = (1 << len(self._services)) - 1
+            mask = everything
+            if carrier_code is not None:
+                mask &= self._by_carrier_code.get(carrier_code, 0)
+            for flag, wanted in (
+                (DOMESTIC, domestic),
+                (INTERNATIONAL, international),
+                (MULTI_PACKAGE, multi_package),
+            ):
+                if wanted is True:
+                    mask &= self._flags[flag]
+                elif wanted is False:
+                    mask &= everything & ~self._flags[flag]
+            return list(self._slots(mask))
+
+    def fits(
+        self,
+        dimensions: Dimensions,
+        carrier_id: str | None = None,
+        limit: int | None = None,
+    ) -> list[Package]:
+        """
+        Lists the packages an item fits into, in any orientation, smallest first.
+        Args:
+            dimensions (Dimensions): The dimensions of the item.
+            carrier_id (str | None): Only packages of this carrier.
+            limit (int | None): Stop after this many packages.
+        Returns:
+            list[Package]: The packages the item fits, by increasing volume.
+        """
+        sides = _inches(dimensions)
+        volume = sides[0] * sides[1] * sides[2]
+        found: list[Package] = []
+        with self._lock:
+            # Smaller packages cannot hold the item, so the scan starts at its volume.
+            start = bisect_left(self._volumes, (volume,))
+            for _, owner, package_id in self._volumes[start:]:
+                if carrier_id is not None and owner != carrier_id:
+                    continue
+                box, package = self._packages[(owner, package_id)]
+                if box[0] >= sides[0] and box[1] >= sides[1] and box[2] >= sides[2]:
+                    found.append(package)
+                    if limit is not None and len(found) >= limit:
+                        break
+        return found
+
+    def smallest_fit(
+        self, dimensions: Dimensions, carrier_id: str | None = None
+    ) -> Package | None:
+        """
+        Returns the smallest package an item fits into, if any.
+        """
+        found = self.fits(dimensions, carrier_id, limit=1)
+        return found[0] if found else None
+
+    def __len__(self) -> int:
+        return len(self._carriers)
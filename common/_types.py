@@ -1,9 +1,12 @@
 from enum import Enum
-from typing import Literal, TypedDict
+from typing import TYPE_CHECKING, Literal, TypeAlias, TypedDict
 
-from pydantic import EmailStr, HttpUrl, PastDatetime
+if TYPE_CHECKING:
+    from pydantic import EmailStr, HttpUrl, PastDatetime
 
-JSONDict = dict[str, str | int | bool | EmailStr | HttpUrl | PastDatetime | None]
+JSONDict: TypeAlias = (
+    "dict[str, str | int | bool | EmailStr | HttpUrl | PastDatetime | None]"
+)
 
 
 class Endpoints(Enum):
@@ -86,6 +89,7 @@ ErrorCodes = Literal[
     "invalid_charge_event",
     "invalid_object",
     "no_rates_returned",
+    "circuit_open",
 ]
 
 
@@ -133,6 +137,7 @@ class ErrorCode(Enum):
     INVALID_CHARGE_EVENT = "invalid_charge_event"
     INVALID_OBJECT = "invalid_object"
     NO_RATES_RETURNED = "no_rates_returned"
+    CIRCUIT_OPEN = "circuit_open"
 
 
 DisplayFormatScheme = Literal[
@@ -194,6 +199,12 @@ class Error(TypedDict):
     message: str
 
 
+class CircuitOpen(Error):
+    family: str
+    state: str
+    retry_in: float
+
+
 class Dimensions(TypedDict):
     unit: Literal["inch", "centimeters"]  # default "inch"
     length: float
@@ -0,0 +1,164 @@
+from json import dumps, loads
+from os import replace
+from pathlib import Path
+from typing import Any, Hashable, Sequence
+
+import numpy as np  # type: ignore[import-not-found]
+
+from .base import LOGGER
+
+
+def _label(value: Any) -> Hashable:
+    # JSON turns tuple labels into lists; they come back as tuples.
+    return tuple(value) if isinstance(value, list) else value
+
+
+class GroupedTotals:
+    """
+    Running totals of a few numeric fields per group, over records identified by a
+    key, e.g. label counts per batch status. Requires the optional `numpy` package.
+
+    Each record's values are kept in one row of a NumPy array, and the totals of
+    every group in another, so adding a page costs one vectorized update and reading
+    the totals costs nothing per record. A record added again, e.g. a batch whose
+    status changed since the last sync, replaces its earlier values: they are taken
+    out of their old group's totals before the new ones go in.
+    """
+
+    __slots__ = ("fields", "meta", "_rows", "_labels", "_groups", "_values", "_sums")
+
+    def __init__(self, fields: Sequence[str]) -> None:
+        """
+        Args:
+            fields (Sequence[str]): The names of the summed values, e.g. ("count", "errors").
+        """
+        self.fields = tuple(fields)
+        # Saved along with the records, e.g. where the next sync picks up.
+        self.meta: dict[str, Any] = {}
+        self._rows: dict[str, int] = {}
+        self._labels: dict[Hashable, int] = {}
+        self._groups = np.zeros(0, dtype=np.int64)
+        self._values = np.zeros((0, len(self.fields)))
+        self._sums = np.zeros((0, len(self.fields)))
+
+    def upsert(
+        self, keys: Sequence[str], labels: Sequence[Hashable], values: Any
+    ) -> None:
+        """
+        Adds or replaces records, e.g. one page of a list endpoint.
+        Args:
+            keys (Sequence[str]): The ID of each record.
+            labels (Sequence[Hashable]): The group of each record.
+            values (array-like): One row per record, one column per field.
+        """
+        count = len(keys)
+        if not count:
+            return
+        values = np.asarray(values, dtype=np.float64).reshape(count, len(self.fields))
+        known = len(self._rows)
+        rows = np.fromiter(
+            (self._rows.setdefault(key, len(self._rows)) for key in keys),
+            dtype=np.int64,
+            count=count,
+        )
+        groups = np.fromiter(
+            (self._labels.setdefault(label, len(self._labels)) for label in labels),
+            dtype=np.int64,
+            count=count,
+        )
+        # A key repeated within the page counts once, with its last values.
+        _, last = np.unique(rows[::-1], return_index=True)
+        keep = count - 1 - last
+        rows, groups, values = rows[keep], groups[keep], values[keep]
+
+        self._grow(len(self._rows), len(self._labels))
+        old = rows < known
+        np.subtract.at(self._sums, self._groups[rows[old]], self._values[rows[old]])
+        self._groups[rows] = groups
+        self._values[rows] = values
+        np.add.at(self._sums, groups, values)
+
+    def _grow(self, records: int, groups: int) -> None:
+        if records > len(self._groups):
+            size = max(records, 2 * len(self._groups), 1024)
+            self._groups = np.resize(self._groups, size)
+            self._values = np.vstack(
+                (self._values, np.zeros((size - len(self._values), len(self.fields))))
+            )
+        if groups > len(self._sums):
+            self._sums = np.vstack(
+                (self._sums, np.zeros((groups - len(self._sums), len(self.fields))))
+            )
+
+    def totals(self) -> dict[Hashable, dict[str, float]]:
+        """
+        Returns:
+            dict[Hashable, dict[str, float]]: The totals of every field, per group.
+        """
+        return {
+            label: dict(zip(self.fields, self._sums[code].tolist()))
+            for label, code in self._labels.items()
+        }
+
+    def total(self) -> dict[str, float]:
+        """
+        Returns:
+            dict[str, float]: The totals of every field over all groups.
+        """
+        return dict(zip(self.fields, self._sums.sum(axis=0).tolist()))
+
+    def save(self, path: Path) -> bool:
+        """
+        Writes the records and `meta` to an .npz file, replacing it atomically.
+        Returns:
+            bool: True if the file was written.
+        """
+        records = len(self._rows)
+        temp = path.with_suffix(path.suffix + ".tmp")
+        try:
+            with open(temp, "wb") as f:
+                np.savez(
+                    f,
+                    fields=np.array(self.fields, dtype=np.str_),
+                    keys=np.array(list(self._rows), dtype=np.str_),
+                    labels=np.array(dumps(list(self._labels))),
+                    meta=np.array(dumps(self.meta)),
+                    groups=self._groups[:records],
+                    values=self._values[:records],
+                )
+            replace(temp, path)
+            return True
+        except OSError as err:
+            LOGGER.error(f"GroupedTotals:::Failed to write {path}: {err}")
+            return False
+
+    @classmethod
+    def load(cls, path: Path, fields: Sequence[str]) -> "GroupedTotals":
+        """
+        Reads totals saved with `save`, or returns empty ones if the file is missing,
+        unreadable or has other fields.
+        Returns:
+            GroupedTotals: The totals.
+        """
+        totals = cls(fields)
+        if not path.exists():
+            return totals
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if tuple(data["fields"].tolist()) != totals.fields:
+                    LOGGER.warning(f"GroupedTotals:::{path} has other fields, ignored")
+                    return totals
+                keys = data["keys"].tolist()
+                labels = [_label(label) for label in loads(str(data["labels"]))]
+                groups = data["groups"]
+                values = data["values"]
+                totals.meta = loads(str(data["meta"]))
+        except (OSError, ValueError, KeyError) as err:
+            LOGGER.error(f"GroupedTotals:::Failed to read {path}: {err}")
+            return totals
+
+        totals.upsert(keys, [labels[group] for group in groups.tolist()], values)
+        return totals
+
+    def __len__(self) -> int:
+        return len(self._rows)
@@ -1,39 +1,86 @@
+from __future__ import annotations
+
 from contextlib import asynccontextmanager
-from json import JSONDecodeError, dump, load
+from datetime import datetime, timezone
+from functools import cache
+from json import JSONDecodeError, dump, dumps, load
 from logging import Logger, getLogger
 from os import environ, makedirs
 from pathlib import Path
 from threading import Lock
-from typing import Any, AsyncGenerator, Literal, cast
+from time import monotonic
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Callable, Literal, cast
+
+from .breaker import CircuitBreakers
+from .ratelimit import RateLimiter
+
+if TYPE_CHECKING:
+    from httpx import AsyncBaseTransport, AsyncClient, Response
+    from httpx._types import HeaderTypes
 
-from dotenv import load_dotenv  # type: ignore
-from httpx import AsyncClient, Response
-from httpx._types import HeaderTypes
+    from ._types import CircuitOpen, Error
+    from .endpoints import EndpointSpec
+    from .hedging import Hedger
 
 LOGGER: Logger = getLogger(__name__)
 LOGGER.setLevel("INFO")
 
-load_dotenv()
 CWD: Path = Path(__file__).parent.resolve()
 CACHE_DIR: Path = CWD / "__cache__"
-makedirs(CACHE_DIR, exist_ok=True)
 
 CACHE_LOCK: Lock = Lock()
+CONFIG_LOCK: Lock = Lock()
 API_ENDPOINT = "https://api.shipstation.com/v2"
 
+# gzip level for request bodies: most of the size reduction of level 9 at a fraction of its CPU.
+COMPRESS_LEVEL = 5
+
 API_KEY: str | None = None
+_CONFIGURED = False
+
+
+def load_config() -> str | None:
+    """
+    Loads the .env file and reads the API key, once per process.
+    Deferred until the first client start so importing a portal stays cheap.
+    Returns:
+        str | None: The API key, or None if it is not configured.
+    """
+    global API_KEY, _CONFIGURED
 
-try:
-    assert load_dotenv(
-        verbose=True,
-    ), "Failed to load variables from .env file"
+    with CONFIG_LOCK:
+        if _CONFIGURED:
+            return API_KEY
+        _CONFIGURED = True
 
-    API_KEY = environ.get("API_KEY", None)
+        try:
+            from dotenv import load_dotenv  # type: ignore
+
+            assert load_dotenv(
+                verbose=True,
+            ), "Failed to load variables from .env file"
+
+        except (AssertionError, AttributeError, OSError) as err:
+            LOGGER.error(f"Error during global configuration:::{err}")
+
+        API_KEY = environ.get("API_KEY", None)
+        if API_KEY is None:
+            LOGGER.error(
+                "Error during global configuration:::API_KEY must be set in environment variables."
+            )
 
-    assert API_KEY is not None, "API_KEY must be set in environment variables."
+        return API_KEY
 
-except (AssertionError, AttributeError, OSError) as err:
-    LOGGER.error(f"Error during global configuration:::{err}")
+
+def cache_dir() -> Path:
+    """
+    Returns the cache directory, creating it on first use.
+    Returns:
+        Path: The cache directory.
+    """
+    with CACHE_LOCK:
+        makedirs(CACHE_DIR, exist_ok=True)
+    return CACHE_DIR
 
 
 class APIError(Exception):
@@ -55,31 +102,125 @@ class APIError(Exception):
         return str(self.details).encode("utf-8")
 
 
+def circuit_open_error(family: str, state: str, retry_in: float) -> CircuitOpen:
+    """
+    Builds the Error returned with a 503 instead of sending a request while the
+    circuit breaker of its endpoint family is open, or when a low-priority request
+    is shed while it is half-open.
+    Args:
+        family (str): The endpoint family, e.g. "batches".
+        state (str): The state of its breaker.
+        retry_in (float): Seconds until the breaker lets requests through again.
+    Returns:
+        CircuitOpen: An Error with the "circuit_open" error code and the breaker details.
+    """
+    error: CircuitOpen = {
+        "error_source": "ShipStation",
+        "errors_type": "system",
+        "error_code": "circuit_open",
+        "message": f"Circuit for {family} is {state}. Retry in {retry_in:.1f}s",
+        "family": family,
+        "state": state,
+        "retry_in": retry_in,
+    }
+    return error
+
+
+def encode_json(data: Any) -> bytes:
+    """
+    Serializes a request body as compact UTF-8 JSON, with orjson when it is installed.
+    Large ID lists are several times faster to encode with orjson than with the json module.
+    Args:
+        data (Any): The body.
+    Returns:
+        bytes: The encoded body.
+    """
+    return _json_encoder()(data)
+
+
+@cache
+def _json_encoder() -> Callable[[Any], bytes]:
+    # Resolved on the first body sent, so importing a portal does not pay for orjson.
+    try:
+        from orjson import dumps as orjson_dumps  # type: ignore[import-not-found]
+
+        return orjson_dumps
+    except ImportError:
+        return lambda data: dumps(
+            data, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+
+
+def unknown_error(message: str) -> Error:
+    """
+    Builds the Error returned when a call fails locally or the response is unexpected.
+    Args:
+        message (str): Description of what went wrong.
+    Returns:
+        Error: An Error with the "unknown" error code.
+    """
+    return cast(
+        "Error",
+        {
+            "error_source": "ShipStation",
+            "error_type": "integrations",
+            "error_code": "unknown",
+            "message": message,
+        },
+    )
+
+
+async def _penalize(limiter: RateLimiter | None, response: Response) -> str:
+    retry_after = response.headers.get("Retry-After", "60")
+    if limiter is not None:
+        try:
+            await limiter.penalize(float(retry_after))
+        except ValueError:
+            await limiter.penalize(60.0)
+    return retry_after
+
+
 class ShipStationClient:
     __slots__ = ()
 
-    _api_key = API_KEY
+    _api_key: str | None = None
     _endpoint = API_ENDPOINT
     _headers: HeaderTypes = {
         "User-Agent": "asyncShipStation/1.0.0",
-        "api-key": API_KEY if API_KEY else "",
     }
     _client: AsyncClient | None = None
     _connection_lock: Lock = Lock()
+    _rate_limiter: RateLimiter | None = RateLimiter()
+    _circuit_breakers: CircuitBreakers | None = CircuitBreakers()
+    _hedger: Hedger | None = None
+    _compress_requests_over: int | None = None
 
     @classmethod
     async def start(
         cls: type["ShipStationClient"],
+        transport: AsyncBaseTransport | None = None,
     ) -> None:
         """
         Initializes the asynchronous HTTP client session.
+        Args:
+            transport (AsyncBaseTransport | None): Optional transport to route requests through,
+                such as a mock server or a replay transport. Defaults to the network.
         """
         with cls._connection_lock:
             if cls._client is None:
+                from httpx import AsyncClient
+
+                if cls._api_key is None:
+                    cls._api_key = load_config()
+
                 cls._client = AsyncClient(
                     base_url=cast(str, cls._endpoint),
-                    headers=cls._headers,
+                    headers={
+                        **cast(dict[str, str], cls._headers),
+                        "api-key": cls._api_key or "",
+                    },
                     timeout=30,
+                    transport=transport,
                 )
 
     @classmethod
@@ -94,6 +235,86 @@ class ShipStationClient:
                 await cls._client.aclose()
                 cls._client = None
 
+    @classmethod
+    def set_rate_limiter(
+        cls: type["ShipStationClient"],
+        limiter: RateLimiter | None,
+    ) -> None:
+        """
+        Replaces the rate limiter shared by every portal.
+        Args:
+            limiter (RateLimiter | None): The new limiter, or None to send requests unthrottled.
+        """
+        ShipStationClient._rate_limiter = limiter
+
+    @classmethod
+    def rate_limiter(
+        cls: type["ShipStationClient"],
+    ) -> RateLimiter | None:
+        """
+        Returns:
+            RateLimiter | None: The rate limiter shared by every portal, if any.
+        """
+        return ShipStationClient._rate_limiter
+
+    @classmethod
+    def set_circuit_breakers(
+        cls: type["ShipStationClient"],
+        breakers: CircuitBreakers | None,
+    ) -> None:
+        """
+        Replaces the circuit breakers guarding each endpoint family.
+        Args:
+            breakers (CircuitBreakers | None): The new breakers, or None to always send requests.
+        """
+        ShipStationClient._circuit_breakers = breakers
+
+    @classmethod
+    def circuit_breakers(
+        cls: type["ShipStationClient"],
+    ) -> CircuitBreakers | None:
+        """
+        Returns:
+            CircuitBreakers | None: The circuit breakers guarding each endpoint family, if any.
+        """
+        return ShipStationClient._circuit_breakers
+
+    @classmethod
+    def set_request_compression(
+        cls: type["ShipStationClient"],
+        min_bytes: int | None,
+    ) -> None:
+        """
+        Sends JSON request bodies of at least `min_bytes` gzip-compressed, e.g. bulk
+        creates with thousands of shipment IDs. Off by default: only turn it on for a
+        server known to accept `Content-Encoding: gzip` request bodies.
+        Args:
+            min_bytes (int | None): Smallest body to compress, or None to send every body as is.
+        """
+        ShipStationClient._compress_requests_over = min_bytes
+
+    @classmethod
+    def set_hedger(
+        cls: type["ShipStationClient"],
+        hedger: Hedger | None,
+    ) -> None:
+        """
+        Turns on hedging of the endpoints whose spec allows it.
+        Args:
+            hedger (Hedger | None): The hedger, or None to send every call once.
+        """
+        ShipStationClient._hedger = hedger
+
+    @classmethod
+    def hedger(
+        cls: type["ShipStationClient"],
+    ) -> Hedger | None:
+        """
+        Returns:
+            Hedger | None: The hedger of the endpoints whose spec allows it, if any.
+        """
+        return ShipStationClient._hedger
+
     @classmethod
     @asynccontextmanager
     async def scoped_client(
@@ -128,27 +349,160 @@ class ShipStationClient:
         Raises:
             RequestError: If an error occurs while making the request.
         """
+        return (await cls._send(method, url, **kwargs))[0]
+
+    @classmethod
+    async def _send(
+        cls: type["ShipStationClient"],
+        method: Literal["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"],
+        url: str,
+        **kwargs,
+    ) -> tuple[Response | APIError, float]:
+        """
+        Does the work of `request`, also returning the seconds the exchange itself took,
+        without the time spent waiting on the rate limiter.
+        """
         if cls._client is None:
             await cls.start()
 
         if cls._client is None:
             raise APIError(500, "HTTP client could not be initialized.")
 
+        limiter = cls._rate_limiter
+        if limiter is not None:
+            await limiter.acquire()
+
+        sent = monotonic()
         response = await cls._client.request(method, url, **kwargs)
+        latency = monotonic() - sent
 
         # Handle rate limiting - return as error to match union pattern
         if response.status_code == 429:
-            retry_after = response.headers.get("Retry-After", "60")
-            return APIError(
-                429,
-                {
-                    "error": "rate_limit_exceeded",
-                    "retry_after": retry_after,
-                    "message": f"Rate limited. Retry after {retry_after}s",
-                },
+            retry_after = await _penalize(limiter, response)
+            return (
+                APIError(
+                    429,
+                    {
+                        "error": "rate_limit_exceeded",
+                        "retry_after": retry_after,
+                        "message": f"Rate limited. Retry after {retry_after}s",
+                    },
+                ),
+                latency,
+            )
+
+        return (response, latency)
+
+    @classmethod
+    @asynccontextmanager
+    async def stream(
+        cls: type["ShipStationClient"],
+        method: Literal["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"],
+        url: str,
+        **kwargs,
+    ) -> AsyncGenerator[Response, None]:
+        """
+        Makes an asynchronous HTTP request whose body is read incrementally, e.g. a file download.
+        Args:
+            method (str): The HTTP method to use.
+            url (str): The endpoint URL, relative to the API or absolute.
+            **kwargs: Additional keyword arguments to pass to the request.
+        Yields:
+            Response: The response, with its body not yet read.
+        """
+        if cls._client is None:
+            await cls.start()
+
+        if cls._client is None:
+            raise APIError(500, "HTTP client could not be initialized.")
+
+        limiter = cls._rate_limiter
+        if limiter is not None:
+            await limiter.acquire()
+
+        async with cls._client.stream(method, url, **kwargs) as response:
+            if response.status_code == 429:
+                await _penalize(limiter, response)
+            yield response
+
+    @classmethod
+    async def call(
+        cls: type["ShipStationClient"],
+        spec: EndpointSpec,
+        path: dict[str, str] | None = None,
+        params: dict[str, Any] | None = None,
+        json: Any = None,
+        headers: dict[str, str] | None = None,
+    ) -> tuple[int, Any]:
+        """
+        Calls an endpoint described by a spec and returns its result in the portal convention.
+        None values are dropped from the query parameters.
+        Args:
+            spec (EndpointSpec): The endpoint to call.
+            path (dict[str, str] | None): Values for the placeholders in the endpoint path.
+            params (dict[str, Any] | None): Query parameters.
+            json (Any): JSON request body.
+            headers (dict[str, str] | None): Extra request headers.
+        Returns:
+            tuple[int, Any]: The status code and either the parsed body or an Error.
+            The status is 503 with a "circuit_open" Error if the circuit breaker of the
+            endpoint's family turned the call away.
+        """
+        kwargs: dict[str, Any] = {}
+        if params is not None:
+            kwargs["params"] = {k: v for k, v in params.items() if v is not None}
+        if json is not None:
+            content = encode_json(json)
+            body_headers = {"Content-Type": "application/json"}
+            threshold = ShipStationClient._compress_requests_over
+            if threshold is not None and len(content) >= threshold:
+                from gzip import compress
+
+                content = compress(content, compresslevel=COMPRESS_LEVEL)
+                body_headers["Content-Encoding"] = "gzip"
+            kwargs["content"] = content
+            headers = {**body_headers, **(headers or {})}
+        if headers is not None:
+            kwargs["headers"] = headers
+
+        breakers = ShipStationClient._circuit_breakers
+        breaker = breakers.get(spec.family.value) if breakers is not None else None
+        if breaker is not None and not breaker.admit():
+            return (
+                503,
+                circuit_open_error(breaker.family, breaker.state, breaker.retry_in()),
             )
 
-        return response
+        # Status and duration of the exchange, for the breaker. Left None if cancelled.
+        outcome: tuple[int, float] | None = None
+        try:
+            url = spec.url(path)
+            hedger = ShipStationClient._hedger
+            if hedger is not None and spec.hedge:
+                res, latency = await hedger.run(
+                    spec.name,
+                    lambda: cls._send(spec.method, url, **kwargs),
+                    ShipStationClient._rate_limiter,
+                )
+            else:
+                res, latency = await cls._send(spec.method, url, **kwargs)
+            outcome = (res.status_code, latency)
+            if res.status_code not in spec.expected:
+                body = res.json()
+                if "error_code" in body:
+                    return (res.status_code, cast("Error", body))
+                raise Exception(f"Unexpected response: {body}")
+            return (res.status_code, spec.parse(res))
+        except Exception as e:
+            if outcome is None:
+                outcome = (500, 0.0)
+            return (500, unknown_error(str(e)))
+        finally:
+            if breaker is not None:
+                if outcome is None:
+                    breaker.release()
+                else:
+                    breaker.record(*outcome)
 
 
 def write_json(fp: Path, data: dict[str, Any] | None) -> bool:
@@ -194,3 +548,21 @@ def read_json(fp: Path) -> dict[str, Any] | None:
     except (IOError, OSError, JSONDecodeError) as err:
         LOGGER.error(f"read_json:::Failed to read data from {fp} with error: {err}")
         return None
+
+
+def to_utc(value: datetime | str) -> datetime:
+    """
+    Reads a ShipStation timestamp, such as "2025-01-02T03:04:05Z", as a UTC datetime.
+    Args:
+        value (datetime | str): A datetime or an ISO 8601 string. Values without a timezone are taken as UTC.
+    Returns:
+        datetime: The same moment, timezone-aware and in UTC.
+    """
+    moment = (
+        value
+        if isinstance(value, datetime)
+        else datetime.fromisoformat(value.replace("Z", "+00:00"))
+    )
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
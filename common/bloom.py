@@ -0,0 +1,125 @@
+from hashlib import blake2b
+from math import ceil, log
+from os import replace
+from pathlib import Path
+from struct import Struct
+from struct import error as StructError
+
+from .base import LOGGER
+
+# Bit count, hash count and item count, in front of the bits in a saved filter.
+_HEADER = Struct("<QIQ")
+
+
+class BloomFilter:
+    """
+    Compact set membership with no false negatives: `key in bloom` is False for
+    every key never added, and True for one that was added or, at `error_rate`,
+    for one that was not. Sized for `capacity` keys at about 1.2 bytes per key
+    for a 1% error rate and 1.8 bytes for 0.1%.
+
+    Positions come from one 128-bit blake2b digest split into two hashes, so the
+    filter is the same across processes and can be saved and loaded.
+    """
+
+    __slots__ = ("size", "hashes", "count", "capacity", "_bits")
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001) -> None:
+        """
+        Args:
+            capacity (int): Keys the filter is sized for. Past it the error rate grows.
+            error_rate (float): Chance that an absent key is reported present. Defaults to 0.1%.
+        """
+        self.capacity = max(capacity, 1)
+        self.size = max(ceil(-self.capacity * log(error_rate) / log(2) ** 2), 8)
+        self.hashes = max(round(self.size / self.capacity * log(2)), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> list[int]:
+        digest = blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> bool:
+        """
+        Adds a key.
+        Returns:
+            bool: True if the key was not in the filter before.
+        """
+        bits = self._bits
+        new = False
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not bits[byte] >> bit & 1:
+                bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self.count += 1
+            if self.count == self.capacity + 1:
+                LOGGER.warning(
+                    f"BloomFilter:::Over its capacity of {self.capacity} keys, false positives will rise"
+                )
+        return new
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        bits = self._bits
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not bits[byte] >> bit & 1:
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+    def save(self, path: Path) -> bool:
+        """
+        Writes the filter to a binary file, replacing it atomically.
+        Returns:
+            bool: True if the file was written.
+        """
+        temp = path.with_suffix(path.suffix + ".tmp")
+        try:
+            with open(temp, "wb") as f:
+                f.write(_HEADER.pack(self.size, self.hashes, self.count))
+                f.write(self._bits)
+            replace(temp, path)
+            return True
+        except OSError as err:
+            LOGGER.error(f"BloomFilter:::Failed to write {path}: {err}")
+            return False
+
+    @classmethod
+    def load(cls, path: Path, capacity: int, error_rate: float) -> "BloomFilter":
+        """
+        Reads a filter saved with `save`, or returns an empty one if the file is
+        missing or unreadable.
+        Args:
+            path (Path): The file.
+            capacity (int): Capacity of the empty filter.
+            error_rate (float): Error rate of the empty filter.
+        Returns:
+            BloomFilter: The filter.
+        """
+        bloom = cls(capacity, error_rate)
+        if not path.exists():
+            return bloom
+        try:
+            data = path.read_bytes()
+            size, hashes, count = _HEADER.unpack_from(data)
+            bits = data[_HEADER.size :]
+            if len(bits) != (size + 7) // 8:
+                raise ValueError(f"{len(bits)} bytes of bits for {size} bits")
+        except (OSError, ValueError, StructError) as err:
+            LOGGER.error(f"BloomFilter:::Failed to read {path}: {err}")
+            return bloom
+
+        bloom.size = size
+        bloom.hashes = hashes
+        bloom.count = count
+        bloom._bits = bytearray(bits)
+        return bloom
@@ -0,0 +1,271 @@
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from threading import Lock
+from time import monotonic
+from typing import Any, Iterator, Literal, TypedDict
+
+State = Literal["closed", "open", "half_open"]
+
+
+class Priority(IntEnum):
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+
+
+_priority: ContextVar[Priority] = ContextVar("priority", default=Priority.NORMAL)
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """
+    Sets the priority of the requests made inside the block, including those of
+    tasks created inside it.
+
+        with priority(Priority.LOW):
+            await map_concurrent(InventoryPortal.list, ...)
+
+    Args:
+        level (Priority): The priority.
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+class BreakerStats(TypedDict):
+    family: str
+    state: State
+    calls: int
+    failure_rate: float
+    slow_rate: float
+    trips: int
+    shed: int
+    rejected: int
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one endpoint family.
+
+    The outcomes of the last `window` calls are kept. Once at least `min_calls` are
+    known and the share of failures (5xx or a local error) or of calls slower than
+    `slow_call` seconds reaches its threshold, the breaker opens and calls fail fast.
+    After `open_for` seconds it turns half-open: a single call is let through, then
+    one more at a time for every success, until `probes` successes close it again.
+    A failure while half-open opens it again for twice as long, up to `max_open_for`.
+    While half-open, LOW priority calls are shed so the probes go to the rest.
+    """
+
+    __slots__ = (
+        "family",
+        "window",
+        "min_calls",
+        "failure_threshold",
+        "slow_call",
+        "slow_threshold",
+        "open_for",
+        "max_open_for",
+        "probes",
+        "state",
+        "_outcomes",
+        "_failures",
+        "_slow",
+        "_opened_at",
+        "_cooldown",
+        "_successes",
+        "_in_flight",
+        "_trips",
+        "_shed",
+        "_rejected",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        family: str,
+        window: int = 50,
+        min_calls: int = 10,
+        failure_threshold: float = 0.5,
+        slow_call: float = 10.0,
+        slow_threshold: float = 0.8,
+        open_for: float = 15.0,
+        max_open_for: float = 300.0,
+        probes: int = 5,
+    ) -> None:
+        """
+        Args:
+            family (str): The endpoint family, e.g. "batches".
+            window (int): Number of recent calls the rates are computed over. Defaults to 50.
+            min_calls (int): Calls needed in the window before the breaker may open. Defaults to 10.
+            failure_threshold (float): Share of failed calls that opens the breaker. Defaults to 0.5.
+            slow_call (float): Seconds after which a call counts as slow. Defaults to 10.
+            slow_threshold (float): Share of slow calls that opens the breaker. Defaults to 0.8.
+            open_for (float): Seconds the breaker stays open the first time. Defaults to 15.
+            max_open_for (float): Longest the breaker stays open after repeated trips. Defaults to 300.
+            probes (int): Successes needed while half-open to close the breaker. Defaults to 5.
+        """
+        self.family = family
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.slow_call = slow_call
+        self.slow_threshold = slow_threshold
+        self.open_for = open_for
+        self.max_open_for = max_open_for
+        self.probes = probes
+        self.state: State = "closed"
+        self._outcomes: deque[tuple[bool, bool]] = deque()
+        self._failures = 0
+        self._slow = 0
+        self._opened_at = 0.0
+        self._cooldown = open_for
+        self._successes = 0
+        self._in_flight = 0
+        self._trips = 0
+        self._shed = 0
+        self._rejected = 0
+        self._lock = Lock()
+
+    def retry_in(self) -> float:
+        """
+        Seconds until an open breaker lets a probe through.
+        """
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(self._opened_at + self._cooldown - monotonic(), 0.0)
+
+    def admit(self, level: Priority | None = None) -> bool:
+        """
+        Decides whether a call may be sent. Every admitted call must be followed by
+        `record` or `release`.
+        Args:
+            level (Priority | None): Priority of the call. Defaults to the current context's.
+        Returns:
+            bool: True if the call may be sent.
+        """
+        level = level if level is not None else _priority.get()
+        with self._lock:
+            if self.state == "open":
+                if monotonic() - self._opened_at < self._cooldown:
+                    self._rejected += 1
+                    return False
+                self.state = "half_open"
+                self._successes = 0
+
+            if self.state == "half_open":
+                if level <= Priority.LOW:
+                    self._shed += 1
+                    return False
+                # One probe at first, one more in flight for every success since.
+                if self._in_flight >= 1 + self._successes:
+                    self._rejected += 1
+                    return False
+
+            self._in_flight += 1
+            return True
+
+    def release(self) -> None:
+        """
+        Gives back an admitted call that was cancelled before it had an outcome.
+        """
+        with self._lock:
+            self._in_flight = max(self._in_flight - 1, 0)
+
+    def record(self, status: int, latency: float) -> None:
+        """
+        Records the outcome of an admitted call.
+        Args:
+            status (int): The status code returned for the call.
+            latency (float): Seconds the call took.
+        """
+        failed = status >= 500
+        slow = latency >= self.slow_call
+        with self._lock:
+            self._in_flight = max(self._in_flight - 1, 0)
+
+            if self.state == "half_open":
+                if failed or slow:
+                    self._trip(backoff=True)
+                    return
+                self._successes += 1
+                if self._successes >= self.probes:
+                    self.state = "closed"
+                    self._cooldown = self.open_for
+                    self._outcomes.clear()
+                    self._failures = self._slow = 0
+                return
+
+            self._outcomes.append((failed, slow))
+            self._failures += failed
+            self._slow += slow
+            if len(self._outcomes) > self.window:
+                old_failed, old_slow = self._outcomes.popleft()
+                self._failures -= old_failed
+                self._slow -= old_slow
+
+            calls = len(self._outcomes)
+            if self.state == "closed" and calls >= self.min_calls:
+                if (
+                    self._failures / calls >= self.failure_threshold
+                    or self._slow / calls >= self.slow_threshold
+                ):
+                    self._trip(backoff=False)
+
+    def _trip(self, backoff: bool) -> None:
+        self.state = "open"
+        self._opened_at = monotonic()
+        self._trips += 1
+        if backoff:
+            self._cooldown = min(self._cooldown * 2, self.max_open_for)
+
+    def stats(self) -> BreakerStats:
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "family": self.family,
+                "state": self.state,
+                "calls": calls,
+                "failure_rate": self._failures / calls if calls else 0.0,
+                "slow_rate": self._slow / calls if calls else 0.0,
+                "trips": self._trips,
+                "shed": self._shed,
+                "rejected": self._rejected,
+            }
+
+
+class CircuitBreakers:
+    """
+    One CircuitBreaker per endpoint family, created on first use with shared settings.
+    """
+
+    __slots__ = ("settings", "_breakers", "_lock")
+
+    def __init__(self, **settings: Any) -> None:
+        """
+        Args:
+            **settings: Keyword arguments for every CircuitBreaker, e.g. failure_threshold=0.3.
+        """
+        self.settings = settings
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = Lock()
+
+    def get(self, family: str) -> CircuitBreaker:
+        with self._lock:
+            if family not in self._breakers:
+                self._breakers[family] = CircuitBreaker(family, **self.settings)
+            return self._breakers[family]
+
+    def stats(self) -> list[BreakerStats]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [breaker.stats() for breaker in breakers]
@@ -0,0 +1,201 @@
+from asyncio import CancelledError, Condition, Lock, Queue, create_task, gather, sleep
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Collection,
+    Iterable,
+    Sized,
+    TypeVar,
+)
+
+from .base import APIError, ShipStationClient
+from .ratelimit import RateLimiter
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+Progress = Callable[[int, int | None], None]
+
+# Statuses every following call would also fail with, so the run is aborted.
+FATAL_STATUSES: tuple[int, ...] = (401, 403)
+
+
+async def as_completed(
+    func: Callable[[T], Awaitable[tuple[int, R]]],
+    items: Iterable[T] | AsyncIterable[T],
+    concurrency: int = 10,
+    ordered: bool = False,
+    fatal_statuses: Collection[int] = FATAL_STATUSES,
+    on_progress: Progress | None = None,
+    limiter: RateLimiter | None = None,
+) -> AsyncIterator[tuple[T, tuple[int, R]]]:
+    """
+    Calls a Portal method for every item with at most `concurrency` calls in flight,
+    yielding each item with its result.
+
+    A fixed pool of workers pulls items lazily, so only `concurrency` coroutines exist
+    at a time however long the input is. Workers also stop pulling while the rate
+    limiter has a backlog, and results wait in a bounded queue, so a slow consumer
+    pauses the workers instead of piling up results.
+
+    Args:
+        func (Callable[[T], Awaitable[tuple[int, R]]]): The Portal method to call, e.g. BatchPortal.get_by_id.
+        items (Iterable[T] | AsyncIterable[T]): The arguments to call it with, one call per item.
+        concurrency (int): The most calls in flight at once. Defaults to 10.
+        ordered (bool): Yield results in input order instead of completion order. Defaults to False.
+        fatal_statuses (Collection[int]): Statuses that cancel every remaining call. Defaults to 401 and 403.
+        on_progress (Progress | None): Called with (done, total) after each call. total is None for unsized inputs.
+        limiter (RateLimiter | None): Limiter to take backpressure from. Defaults to the client's limiter.
+
+    Yields:
+        tuple[T, tuple[int, R]]: Each item paired with the status code and body returned for it.
+
+    Raises:
+        APIError: If a call returned one of the fatal statuses.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    limiter = limiter if limiter is not None else ShipStationClient.rate_limiter()
+    total = len(items) if isinstance(items, Sized) else None
+    sync_items = iter(items) if isinstance(items, Iterable) else None
+    async_items = aiter(items) if not isinstance(items, Iterable) else None
+
+    queue: Queue[tuple[int, T, tuple[int, R]] | BaseException | None] = Queue(
+        maxsize=concurrency * 2
+    )
+    pull_lock = Lock()
+    window = Condition()
+    window_size = concurrency * 4
+    pulled = 0
+    emitted = 0
+    stopped = False
+
+    async def pull() -> tuple[int, T] | None:
+        nonlocal pulled
+        async with pull_lock:
+            if ordered:
+                # Bound how far ahead of the slowest call the workers may run.
+                async with window:
+                    await window.wait_for(lambda: pulled < emitted + window_size)
+            if stopped:
+                return None
+            try:
+                if sync_items is not None:
+                    item = next(sync_items)
+                else:
+                    item = await anext(async_items)  # type: ignore[arg-type]
+            except (StopIteration, StopAsyncIteration):
+                return None
+            pulled += 1
+            return (pulled - 1, item)
+
+    async def work() -> None:
+        nonlocal stopped
+        while not stopped:
+            if limiter is not None:
+                backlog = await limiter.backlog()
+                if backlog > 0:
+                    await sleep(backlog)
+            pair = await pull()
+            if pair is None:
+                return
+            index, item = pair
+            result = await func(item)
+            if result[0] in fatal_statuses:
+                stopped = True
+                await queue.put(
+                    APIError(result[0], {"item": str(item), "detail": result[1]})
+                )
+                return
+            await queue.put((index, item, result))
+
+    async def worker() -> None:
+        nonlocal stopped
+        try:
+            await work()
+        except CancelledError:
+            raise
+        except BaseException as err:
+            stopped = True
+            await queue.put(err)
+        await queue.put(None)
+
+    workers = [create_task(worker()) for _ in range(concurrency)]
+    pending: dict[int, tuple[T, tuple[int, R]]] = {}
+    alive = concurrency
+    done = 0
+
+    try:
+        while alive:
+            entry = await queue.get()
+            if entry is None:
+                alive -= 1
+                continue
+            if isinstance(entry, BaseException):
+                raise entry
+
+            index, item, result = entry
+            done += 1
+            if on_progress is not None:
+                on_progress(done, total)
+
+            if not ordered:
+                yield (item, result)
+                continue
+
+            pending[index] = (item, result)
+            while emitted in pending:
+                yield pending.pop(emitted)
+                emitted += 1
+            async with window:
+                window.notify_all()
+    finally:
+        stopped = True
+        for task in workers:
+            task.cancel()
+        await gather(*workers, return_exceptions=True)
+
+
+async def map_concurrent(
+    func: Callable[[T], Awaitable[tuple[int, R]]],
+    items: Iterable[T] | AsyncIterable[T],
+    concurrency: int = 10,
+    ordered: bool = True,
+    fatal_statuses: Collection[int] = FATAL_STATUSES,
+    on_progress: Progress | None = None,
+    limiter: RateLimiter | None = None,
+) -> list[tuple[int, R]]:
+    """
+    Calls a Portal method for every item with bounded concurrency and collects the results.
+    A bounded replacement for `asyncio.gather(*(func(item) for item in items))`.
+
+    Args:
+        func (Callable[[T], Awaitable[tuple[int, R]]]): The Portal method to call, e.g. CarrierPortal.get_services.
+        items (Iterable[T] | AsyncIterable[T]): The arguments to call it with, one call per item.
+        concurrency (int): The most calls in flight at once. Defaults to 10.
+        ordered (bool): Return results in input order instead of completion order. Defaults to True.
+        fatal_statuses (Collection[int]): Statuses that cancel every remaining call. Defaults to 401 and 403.
+        on_progress (Progress | None): Called with (done, total) after each call.
+        limiter (RateLimiter | None): Limiter to take backpressure from. Defaults to the client's limiter.
+
+    Returns:
+        list[tuple[int, R]]: The status code and body returned for each item.
+
+    Raises:
+        APIError: If a call returned one of the fatal statuses.
+    """
+    return [
+        result
+        async for _, result in as_completed(
+            func,
+            items,
+            concurrency=concurrency,
+            ordered=ordered,
+            fatal_statuses=fatal_statuses,
+            on_progress=on_progress,
+            limiter=limiter,
+        )
+    ]
@@ -0,0 +1,102 @@
+from string import Formatter
+from typing import Any, Literal
+
+from ._types import Endpoints
+from .base import API_ENDPOINT
+
+Methods = Literal["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"]
+Bodies = Literal["json", "bytes", "none"]
+
+
+class EndpointSpec:
+    """
+    Declarative description of one ShipStation endpoint.
+
+    The URL template is split into literal and placeholder parts once, when the
+    spec is created, so building a URL per call is a join instead of a format of
+    the Endpoints enum. Endpoints without placeholders reuse one prebuilt URL.
+    """
+
+    __slots__ = (
+        "name",
+        "method",
+        "family",
+        "path",
+        "expected",
+        "body",
+        "hedge",
+        "_parts",
+        "_url",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        method: Methods,
+        family: Endpoints,
+        path: str = "",
+        expected: tuple[int, ...] = (200,),
+        body: Bodies = "json",
+        hedge: bool = False,
+    ) -> None:
+        """
+        Args:
+            name (str): Identifier of the endpoint, e.g. "batches.get_by_id".
+            method (Methods): The HTTP method.
+            family (Endpoints): The resource the endpoint belongs to.
+            path (str): Path below the resource, with {placeholders}, e.g. "/{batch_id}/add".
+            expected (tuple[int, ...]): Status codes that mean success. Defaults to (200,).
+            body (Bodies): How a successful response is read: "json", "bytes" or "none".
+            hedge (bool): Whether a slow call may be sent twice when a Hedger is set.
+                Only for idempotent reads. Defaults to False.
+        """
+        self.name = name
+        self.method = method
+        self.family = family
+        self.path = path
+        self.expected = expected
+        self.body = body
+        self.hedge = hedge and method == "GET"
+
+        template = f"{API_ENDPOINT}/{family.value}{path}"
+        self._parts: tuple[tuple[str, str | None], ...] = tuple(
+            (literal, field) for literal, field, _, _ in Formatter().parse(template)
+        )
+        self._url: str | None = (
+            template if all(field is None for _, field in self._parts) else None
+        )
+
+    def url(self, path: dict[str, str] | None = None) -> str:
+        """
+        Builds the URL of the endpoint.
+        Args:
+            path (dict[str, str] | None): Values for the placeholders in the path.
+        Returns:
+            str: The full URL.
+        """
+        if self._url is not None:
+            return self._url
+        values = path or {}
+        return "".join(
+            literal + (values[field] if field is not None else "")
+            for literal, field in self._parts
+        )
+
+    def parse(self, response: Any) -> Any:
+        """
+        Reads the body of a successful response.
+        Args:
+            response (Response): The response to read.
+        Returns:
+            Any: The decoded JSON, the raw bytes, or None, depending on the spec.
+        """
+        if self.body == "json":
+            return response.json()
+        if self.body == "bytes":
+            return response.content
+        return None
+
+    def __repr__(self) -> str:
+        return (
+            f"EndpointSpec({self.name}, {self.method} {self.family.value}{self.path})"
+        )
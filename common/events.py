@@ -0,0 +1,247 @@
+from asyncio import (
+    AbstractEventLoop,
+    Future,
+    Queue,
+    QueueFull,
+    get_running_loop,
+    wait_for,
+)
+from collections import OrderedDict
+from threading import Lock
+from time import time
+from typing import Any, AsyncIterator, TypedDict
+from urllib.parse import parse_qs, urlsplit
+
+from .base import LOGGER
+
+# Keys of a webhook's `data` that identify the resource, checked in order.
+RESOURCE_KEYS: tuple[str, ...] = ("batch_id", "shipment_id", "fulfillment_id", "id")
+
+
+class WebhookEvent(TypedDict):
+    event: str
+    topic: str
+    resource_id: str
+    resource_url: str
+    received_at: float
+    data: dict[str, Any]
+
+
+def topic_of(event: str) -> str:
+    """
+    Maps a ShipStation webhook event type onto the topic waiters subscribe to,
+    e.g. "fulfillment_shipped_v2" onto "fulfillment" and "API_BATCH" onto "batch".
+    Args:
+        event (str): The event or resource type sent by ShipStation.
+    Returns:
+        str: The topic.
+    """
+    name = event.lower().removeprefix("api_")
+    for topic in ("batch", "fulfillment", "track", "rate", "shipment"):
+        if name.startswith(topic):
+            return topic
+    return name
+
+
+def parse_event(payload: dict[str, Any]) -> WebhookEvent:
+    """
+    Normalizes a webhook payload.
+    ShipStation sends the type of the resource and its URL, and some events also
+    include the resource itself under `data`.
+
+    Fulfillments are awaited by shipment, so a fulfillment event without a
+    `shipment_id` in its data is keyed by the `shipment_id` query parameter of its
+    URL. If the URL has none either, the event is keyed by the last segment of the
+    URL's path, which no fulfillment waiter matches; those waiters then rely on
+    polling every `late_after` seconds.
+    Args:
+        payload (dict[str, Any]): The decoded webhook body.
+    Returns:
+        WebhookEvent: The event, with its topic and the ID of its resource.
+    """
+    event = str(payload.get("event") or payload.get("resource_type") or "unknown")
+    url = str(payload.get("resource_url") or "")
+    raw = payload.get("data")
+    data: dict[str, Any] = raw if isinstance(raw, dict) else {}
+
+    topic = topic_of(event)
+    resource_id = str(payload.get("resource_id") or "")
+    if not resource_id:
+        resource_id = next((str(data[k]) for k in RESOURCE_KEYS if data.get(k)), "")
+    if not resource_id and url:
+        parts = urlsplit(url)
+        shipment_ids = parse_qs(parts.query).get("shipment_id")
+        if topic == "fulfillment" and shipment_ids:
+            resource_id = shipment_ids[0]
+        else:
+            resource_id = parts.path.rstrip("/").rpartition("/")[2]
+
+    return {
+        "event": event,
+        "topic": topic,
+        "resource_id": resource_id,
+        "resource_url": url,
+        "received_at": time(),
+        "data": data,
+    }
+
+
+class EventBus:
+    """
+    In-process bus turning pushed webhook events into awaitable notifications.
+
+    Events are keyed by topic and resource ID. The latest event of each key is kept
+    for a while, so a waiter that starts just after its event arrived still sees
+    it. `publish` may be called from any thread, e.g. by a webhook server running
+    its own event loop; waiters are woken on their own loops.
+
+    Subclass and override `publish`, `wait_for` and `subscribe` to back the bus
+    with an external broker.
+    """
+
+    __slots__ = ("max_recent", "_recent", "_waiters", "_subscribers", "_lock")
+
+    def __init__(self, max_recent: int = 10_000) -> None:
+        """
+        Args:
+            max_recent (int): Number of recent events kept for late waiters. Defaults to 10,000.
+        """
+        self.max_recent = max_recent
+        self._recent: OrderedDict[tuple[str, str], WebhookEvent] = OrderedDict()
+        self._waiters: dict[
+            tuple[str, str], list[tuple[AbstractEventLoop, Future[WebhookEvent]]]
+        ] = {}
+        self._subscribers: list[
+            tuple[str | None, AbstractEventLoop, Queue[WebhookEvent]]
+        ] = []
+        self._lock = Lock()
+
+    def publish(self, event: WebhookEvent) -> int:
+        """
+        Delivers an event to its waiters and subscribers.
+        Args:
+            event (WebhookEvent): The event, e.g. from parse_event.
+        Returns:
+            int: The number of waiters and subscribers it was delivered to.
+        """
+        key = (event["topic"], event["resource_id"])
+        with self._lock:
+            self._recent[key] = event
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.max_recent:
+                self._recent.popitem(last=False)
+            waiters = self._waiters.pop(key, [])
+            subscribers = [
+                (loop, queue)
+                for topic, loop, queue in self._subscribers
+                if topic is None or topic == event["topic"]
+            ]
+
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future, event)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, event)
+        return len(waiters) + len(subscribers)
+
+    def last(self, topic: str, resource_id: str) -> WebhookEvent | None:
+        """
+        Returns the most recent event of a resource, if it is still kept.
+        """
+        with self._lock:
+            return self._recent.get((topic, resource_id))
+
+    async def wait_for(
+        self,
+        topic: str,
+        resource_id: str,
+        timeout: float | None = None,
+        since: float | None = None,
+    ) -> WebhookEvent | None:
+        """
+        Waits for the next event of a resource.
+        Args:
+            topic (str): The topic, e.g. "batch" or "fulfillment".
+            resource_id (str): The resource, e.g. a batch ID or a shipment ID.
+            timeout (float | None): Seconds to wait. Defaults to waiting forever.
+            since (float | None): A `time()` value; an event received after it is returned at once.
+        Returns:
+            WebhookEvent | None: The event, or None if none arrived in time.
+        """
+        key = (topic, resource_id)
+        loop = get_running_loop()
+        future: Future[WebhookEvent] = loop.create_future()
+        with self._lock:
+            recent = self._recent.get(key)
+            if (
+                since is not None
+                and recent is not None
+                and recent["received_at"] >= since
+            ):
+                return recent
+            self._waiters.setdefault(key, []).append((loop, future))
+
+        try:
+            return await wait_for(future, timeout)
+        except TimeoutError:
+            return None
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(key)
+                if waiters is not None:
+                    waiters[:] = [w for w in waiters if w[1] is not future]
+                    if not waiters:
+                        del self._waiters[key]
+
+    async def subscribe(
+        self, topic: str | None = None, maxsize: int = 1000
+    ) -> AsyncIterator[WebhookEvent]:
+        """
+        Yields every event of a topic as it arrives.
+        Args:
+            topic (str | None): The topic to follow. Defaults to every topic.
+            maxsize (int): Events buffered for a slow consumer before new ones are dropped.
+        Yields:
+            WebhookEvent: Each event, in arrival order.
+        """
+        entry = (topic, get_running_loop(), Queue[WebhookEvent](maxsize))
+        with self._lock:
+            self._subscribers.append(entry)
+        try:
+            while True:
+                yield await entry[2].get()
+        finally:
+            with self._lock:
+                self._subscribers.remove(entry)
+
+
+def _resolve(future: Future[WebhookEvent], event: WebhookEvent) -> None:
+    if not future.done():
+        future.set_result(event)
+
+
+def _offer(queue: Queue[WebhookEvent], event: WebhookEvent) -> None:
+    try:
+        queue.put_nowait(event)
+    except QueueFull:
+        LOGGER.warning(f"EventBus:::Subscriber is full, dropped {event['event']}")
+
+
+_event_bus: EventBus | None = None
+
+
+def set_event_bus(bus: EventBus | None) -> None:
+    """
+    Sets the bus that waiters such as wait_for_batch listen on.
+    Args:
+        bus (EventBus | None): The bus, or None to go back to polling only.
+    """
+    global _event_bus
+    _event_bus = bus
+
+
+def event_bus() -> EventBus | None:
+    """
+    Returns:
+        EventBus | None: The bus waiters listen on, if webhooks are set up.
+    """
+    return _event_bus
@@ -0,0 +1,185 @@
+from asyncio import FIRST_COMPLETED, Task, create_task, gather, wait
+from collections import deque
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Coroutine, TypedDict, TypeVar
+
+from .ratelimit import DEFAULT_PERIOD, DEFAULT_RATE, RateLimiter
+
+T = TypeVar("T")
+
+
+class HedgeStats(TypedDict):
+    calls: int
+    hedged: int
+    hedge_won: int
+    over_budget: int
+
+
+class Hedger:
+    """
+    Sends a second copy of a slow idempotent GET and keeps whichever answers first.
+
+    Recent latencies are kept per endpoint. Once an endpoint has `min_samples`, a
+    call that has not answered after the `percentile` of its recent latency is sent
+    again, and the other copy is cancelled when one answers. Hedges take a token
+    from the rate limiter like any request, and at most `budget` of the limiter's
+    rate may be spent on them per period. No hedge is sent while the limiter has a
+    backlog, since it would only queue behind other requests.
+
+    Only endpoints whose spec is marked `hedge=True` are hedged:
+
+        ShipStationClient.set_hedger(Hedger(percentile=0.9, budget=0.05))
+    """
+
+    __slots__ = (
+        "percentile",
+        "window",
+        "min_samples",
+        "budget",
+        "min_delay",
+        "_latencies",
+        "_hedges",
+        "_calls",
+        "_hedged",
+        "_hedge_won",
+        "_over_budget",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        window: int = 200,
+        min_samples: int = 20,
+        budget: float = 0.05,
+        min_delay: float = 0.01,
+    ) -> None:
+        """
+        Args:
+            percentile (float): Share of recent calls that answered before a hedge is sent. Defaults to 0.95.
+            window (int): Number of recent latencies kept per endpoint. Defaults to 200.
+            min_samples (int): Latencies needed before an endpoint is hedged. Defaults to 20.
+            budget (float): Largest share of the rate limit spent on hedges. Defaults to 0.05.
+            min_delay (float): Shortest wait before a hedge, in seconds. Defaults to 0.01.
+        """
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.budget = budget
+        self.min_delay = min_delay
+        self._latencies: dict[str, deque[float]] = {}
+        self._hedges: deque[float] = deque()
+        self._calls = 0
+        self._hedged = 0
+        self._hedge_won = 0
+        self._over_budget = 0
+        self._lock = Lock()
+
+    def observe(self, name: str, latency: float) -> None:
+        """
+        Records the latency of a call to an endpoint.
+        """
+        with self._lock:
+            samples = self._latencies.get(name)
+            if samples is None:
+                samples = self._latencies[name] = deque(maxlen=self.window)
+            samples.append(latency)
+
+    def delay(self, name: str) -> float | None:
+        """
+        Seconds to wait before hedging a call to an endpoint.
+        Args:
+            name (str): The endpoint, e.g. "batches.get_by_id".
+        Returns:
+            float | None: The delay, or None while too few latencies are known.
+        """
+        with self._lock:
+            samples = self._latencies.get(name)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        index = min(int(len(ordered) * self.percentile), len(ordered) - 1)
+        return max(ordered[index], self.min_delay)
+
+    def _spend(self, limiter: RateLimiter | None) -> bool:
+        rate = limiter.rate if limiter is not None else DEFAULT_RATE
+        period = limiter.period if limiter is not None else DEFAULT_PERIOD
+        now = monotonic()
+        with self._lock:
+            while self._hedges and now - self._hedges[0] >= period:
+                self._hedges.popleft()
+            if len(self._hedges) >= max(int(rate * self.budget), 1):
+                self._over_budget += 1
+                return False
+            self._hedges.append(now)
+            self._hedged += 1
+            return True
+
+    async def run(
+        self,
+        name: str,
+        send: Callable[[], Coroutine[Any, Any, tuple[T, float]]],
+        limiter: RateLimiter | None = None,
+    ) -> tuple[T, float]:
+        """
+        Sends a call, hedging it if it is slow.
+        Args:
+            name (str): The endpoint, e.g. "batches.get_by_id".
+            send (Callable[[], Coroutine[Any, Any, tuple[T, float]]]): Sends one copy and returns its result
+                with the seconds the exchange took.
+            limiter (RateLimiter | None): The limiter the budget is taken from.
+        Returns:
+            tuple[T, float]: The first result to arrive and its latency.
+        """
+        with self._lock:
+            self._calls += 1
+        delay = self.delay(name)
+        sent = monotonic()
+        primary: Task[tuple[T, float]] = create_task(send())
+        tasks = {primary}
+        try:
+            if delay is not None:
+                done, _ = await wait(tasks, timeout=delay)
+                if (
+                    not done
+                    and (limiter is None or await limiter.backlog() <= 0)
+                    and self._spend(limiter)
+                ):
+                    tasks.add(create_task(send()))
+
+            error: BaseException | None = None
+            while tasks:
+                done, tasks = await wait(tasks, return_when=FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    result = task.result()
+                    latency = result[1]
+                    if task is not primary:
+                        with self._lock:
+                            self._hedge_won += 1
+                        # The endpoint's latency is the primary's, which took at
+                        # least this long; the faster hedge would pull the percentile down.
+                        latency = monotonic() - sent
+                    self.observe(name, latency)
+                    return result
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> HedgeStats:
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "hedged": self._hedged,
+                "hedge_won": self._hedge_won,
+                "over_budget": self._over_budget,
+            }
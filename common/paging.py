@@ -0,0 +1,220 @@
+from asyncio import Lock as AsyncLock
+from pathlib import Path
+from threading import Lock
+from typing import Any, AsyncIterator, Awaitable, Callable, cast
+
+from .base import LOGGER, APIError, cache_dir, read_json, write_json
+from .concurrency import as_completed
+
+# Page sizes tried on the first call of a list endpoint, largest first.
+PAGE_SIZES: tuple[int, ...] = (500, 200, 100, 50, 25)
+# The size the portals default to, assumed for endpoints not yet called.
+DEFAULT_PAGE_SIZE = 25
+
+# Fetches one page of a list endpoint: called with (page, page_size).
+PageCall = Callable[[int, int], Awaitable[tuple[int, Any]]]
+
+
+def rejects_page_size(status: int, body: Any) -> bool:
+    """
+    Tells whether a response refused the requested page_size.
+    """
+    if status != 400 or not isinstance(body, dict):
+        return False
+    return body.get("field_name") == "page_size" or "page_size" in str(
+        body.get("message", "")
+    )
+
+
+class PageSizes:
+    """
+    The largest page_size each list endpoint accepts, keyed by endpoint name and
+    persisted as JSON in the cache directory.
+
+    On the first call of an endpoint the sizes in `candidates` are tried from the
+    largest down until one is accepted, and that size is used from then on. If a
+    remembered size is later refused, smaller sizes are tried again.
+    """
+
+    __slots__ = ("path", "autosave", "candidates", "_sizes", "_discovering", "_lock")
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        candidates: tuple[int, ...] = PAGE_SIZES,
+        autosave: bool = True,
+    ) -> None:
+        """
+        Args:
+            path (Path | None): The JSON file of the sizes. Defaults to page_sizes.json in the cache directory.
+            candidates (tuple[int, ...]): Sizes to try, largest first. Defaults to 500 down to 25.
+            autosave (bool): Write the file after every change. Defaults to True.
+        """
+        self.path = path if path is not None else cache_dir() / "page_sizes.json"
+        self.autosave = autosave
+        self.candidates = tuple(sorted(candidates, reverse=True))
+        self._lock = Lock()
+        # One discovery at a time per endpoint, so concurrent first calls wait for it.
+        self._discovering: dict[str, AsyncLock] = {}
+        self._sizes: dict[str, int] = (
+            cast(
+                dict[str, int],
+                read_json(self.path) if self.path.exists() else None,
+            )
+            or {}
+        )
+
+    def get(self, name: str) -> int | None:
+        with self._lock:
+            return self._sizes.get(name)
+
+    def put(self, name: str, size: int) -> None:
+        with self._lock:
+            if self._sizes.get(name) == size:
+                return
+            self._sizes[name] = size
+            if self.autosave:
+                write_json(self.path, cast(dict, self._sizes))
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            if self._sizes.pop(name, None) is not None and self.autosave:
+                write_json(self.path, cast(dict, self._sizes))
+
+    def save(self) -> bool:
+        """
+        Writes the sizes to their file.
+        Returns:
+            bool: True if the file was written.
+        """
+        with self._lock:
+            return write_json(self.path, cast(dict, self._sizes))
+
+    async def fetch(
+        self, name: str, call: PageCall, page: int = 1
+    ) -> tuple[int, int, Any]:
+        """
+        Fetches a page with the largest page_size the endpoint accepts, finding that
+        size on the endpoint's first call. Later pages of the same listing must be
+        fetched with the returned size.
+        Args:
+            name (str): The endpoint, e.g. "batches.list".
+            call (PageCall): Fetches one page, called with (page, page_size).
+            page (int): The page to fetch. Defaults to 1.
+        Returns:
+            tuple[int, int, Any]: The status code, the page_size used, and the body.
+        """
+        size = self.get(name)
+        candidates = list(self.candidates)
+        if size is not None:
+            status, body = await call(page, size)
+            if not rejects_page_size(status, body):
+                return (status, size, body)
+            LOGGER.warning(f"PageSizes:::{name} no longer accepts page_size={size}")
+            self.discard(name)
+            candidates = [c for c in candidates if c < size]
+            if not candidates:
+                return (status, size, body)
+
+        async with self._discovering.setdefault(name, AsyncLock()):
+            known = self.get(name)
+            if known is not None:
+                status, body = await call(page, known)
+                return (status, known, body)
+
+            for candidate in candidates:
+                status, body = await call(page, candidate)
+                if rejects_page_size(status, body):
+                    continue
+                if status == 200:
+                    LOGGER.info(f"PageSizes:::{name} accepts page_size={candidate}")
+                    self.put(name, candidate)
+                return (status, candidate, body)
+            return (status, candidates[-1], body)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._sizes
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+
+_default_sizes: PageSizes | None = None
+_default_lock = Lock()
+
+
+def default_page_sizes() -> PageSizes:
+    """
+    Returns the process-wide page sizes, loading them from the cache directory on first use.
+    Returns:
+        PageSizes: The shared page sizes.
+    """
+    global _default_sizes
+
+    with _default_lock:
+        if _default_sizes is None:
+            _default_sizes = PageSizes()
+        return _default_sizes
+
+
+async def page_all(
+    name: str,
+    call: PageCall,
+    key: str,
+    sizes: PageSizes | None = None,
+    concurrency: int = 5,
+) -> AsyncIterator[Any]:
+    """
+    Yields every item of a list endpoint, reading it with its largest accepted page
+    size. The first page tells how many pages there are, and the rest are fetched
+    concurrently and yielded in order.
+
+        call = lambda page, size: BatchPortal.list(page=page, page_size=size)
+        async for batch in page_all("batches.list", call, "batches"):
+            ...
+
+    Args:
+        name (str): The endpoint, e.g. "batches.list".
+        call (PageCall): Fetches one page, called with (page, page_size).
+        key (str): The key of the items in a page, e.g. "batches".
+        sizes (PageSizes | None): The page sizes to use. Defaults to the process-wide ones.
+        concurrency (int): The most pages fetched at once. Defaults to 5.
+    Yields:
+        Any: Each item, in page order.
+    Raises:
+        APIError: If a page could not be fetched.
+    """
+    sizes = sizes if sizes is not None else default_page_sizes()
+    status, size, body = await sizes.fetch(name, call)
+    if status != 200:
+        raise APIError(status, body)
+    for item in body.get(key, []):
+        yield item
+
+    pages = body.get("pages") or 1
+    async for _, (status, body) in as_completed(
+        lambda page: call(page, size),
+        range(2, pages + 1),
+        concurrency=concurrency,
+        ordered=True,
+    ):
+        if status != 200:
+            raise APIError(status, body)
+        for item in body.get(key, []):
+            yield item
+
+
+async def count_items(call: PageCall) -> int:
+    """
+    Reads how many items a listing holds with a single one-item page, e.g. to plan a job.
+    Args:
+        call (PageCall): Fetches one page, called with (page, page_size).
+    Returns:
+        int: The `total` the endpoint reports.
+    Raises:
+        APIError: If the page could not be fetched.
+    """
+    status, body = await call(1, 1)
+    if status != 200:
+        raise APIError(status, body)
+    return int(body.get("total", 0))
@@ -0,0 +1,109 @@
+from math import ceil
+from typing import TypedDict
+
+from .base import ShipStationClient
+from .paging import DEFAULT_PAGE_SIZE, PageSizes, default_page_sizes
+from .ratelimit import RateLimiter
+
+
+class PlanStep(TypedDict):
+    name: str
+    requests: int
+    page_size: int | None
+
+
+class Plan(TypedDict):
+    steps: list[PlanStep]
+    requests: int
+    backlog: float
+    seconds: float
+
+
+class RequestPlanner:
+    """
+    Dry run of a job: counts the requests it will send and estimates how long they
+    take under the current rate budget, without sending any.
+
+    List steps are counted with the page size remembered for the endpoint, or 25
+    if it was never called. The estimate is the longer of two bounds: the
+    limiter's current backlog plus every request beyond one burst at the
+    sustained rate, and the requests run `concurrency` at a time at `latency`
+    seconds each.
+
+        plan = await (
+            RequestPlanner()
+            .list_all("fulfillments.list", total=120_000)
+            .calls("batches.get_by_id", 2_000)
+            .estimate()
+        )
+    """
+
+    __slots__ = ("sizes", "limiter", "latency", "concurrency", "steps")
+
+    def __init__(
+        self,
+        sizes: PageSizes | None = None,
+        limiter: RateLimiter | None = None,
+        latency: float = 0.3,
+        concurrency: int = 10,
+    ) -> None:
+        """
+        Args:
+            sizes (PageSizes | None): The page sizes to count with. Defaults to the process-wide ones.
+            limiter (RateLimiter | None): The rate budget. Defaults to the client's limiter.
+            latency (float): Seconds one request takes. Defaults to 0.3.
+            concurrency (int): Requests the job keeps in flight. Defaults to 10.
+        """
+        self.sizes = sizes if sizes is not None else default_page_sizes()
+        self.limiter = (
+            limiter if limiter is not None else ShipStationClient.rate_limiter()
+        )
+        self.latency = latency
+        self.concurrency = concurrency
+        self.steps: list[PlanStep] = []
+
+    def list_all(
+        self, name: str, total: int, page_size: int | None = None
+    ) -> "RequestPlanner":
+        """
+        Adds reading every item of a list endpoint.
+        Args:
+            name (str): The endpoint, e.g. "fulfillments.list".
+            total (int): Items to read, e.g. from count_items.
+            page_size (int | None): Size to count with. Defaults to the endpoint's remembered size.
+        Returns:
+            RequestPlanner: The planner, to chain steps.
+        """
+        size = page_size or self.sizes.get(name) or DEFAULT_PAGE_SIZE
+        self.steps.append(
+            {"name": name, "requests": max(ceil(total / size), 1), "page_size": size}
+        )
+        return self
+
+    def calls(self, name: str, count: int) -> "RequestPlanner":
+        """
+        Adds `count` single requests, e.g. one get_by_id per batch.
+        Returns:
+            RequestPlanner: The planner, to chain steps.
+        """
+        self.steps.append({"name": name, "requests": count, "page_size": None})
+        return self
+
+    async def estimate(self) -> Plan:
+        """
+        Returns:
+            Plan: The steps, the total request count and the estimated seconds.
+        """
+        requests = sum(step["requests"] for step in self.steps)
+        backlog = 0.0
+        paced = 0.0
+        if self.limiter is not None:
+            backlog = await self.limiter.backlog()
+            paced = max(requests - self.limiter.burst, 0) * self.limiter.interval
+        in_flight = ceil(requests / max(self.concurrency, 1)) * self.latency
+        return {
+            "steps": list(self.steps),
+            "requests": requests,
+            "backlog": backlog,
+            "seconds": round(max(backlog + paced, in_flight), 3),
+        }
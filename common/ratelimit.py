@@ -0,0 +1,338 @@
+import os
+from abc import ABC, abstractmethod
+from struct import pack, unpack
+from threading import Lock
+from time import monotonic, time
+from typing import Any, Literal, Protocol
+
+# ShipStation allows 200 requests per minute per account by default.
+DEFAULT_RATE = 200
+DEFAULT_PERIOD = 60.0
+
+Mode = Literal["reserve", "peek", "penalize"]
+
+
+def gcra(
+    tat: float | None,
+    now: float,
+    interval: float,
+    burst: int,
+    mode: Mode,
+    retry_after: float = 0.0,
+) -> tuple[float, float]:
+    """
+    One step of the generic cell rate algorithm, the token bucket stored as a single
+    number: the theoretical arrival time (TAT) of the next request at the sustained rate.
+    A bucket holding `burst - (tat - now) / interval` tokens has the same behaviour.
+
+    Args:
+        tat (float | None): The stored TAT, or None for a full bucket.
+        now (float): The current time, on the same clock as `tat`.
+        interval (float): Seconds between two requests at the sustained rate.
+        burst (int): Most requests that may be sent back to back.
+        mode (Mode): "reserve" takes a request, going into debt if needed; "peek" only
+            measures the wait; "penalize" holds every request back for `retry_after`.
+        retry_after (float): Seconds to hold requests back for, in "penalize" mode.
+    Returns:
+        tuple[float, float]: The TAT to store and the seconds the caller must wait.
+    """
+    current = max(tat if tat is not None else now, now)
+    if mode == "penalize":
+        return (max(current, now + retry_after + (burst - 1) * interval), 0.0)
+    following = current + interval
+    wait = max(following - burst * interval - now, 0.0)
+    return (following if mode == "reserve" else current, wait)
+
+
+class RateLimitBackend(ABC):
+    """
+    Where the state of a RateLimiter lives. Every limiter using the same backend and
+    key draws from the same budget.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    async def update(
+        self,
+        key: str,
+        interval: float,
+        burst: int,
+        mode: Mode,
+        retry_after: float = 0.0,
+    ) -> float:
+        """
+        Applies one GCRA step to the state of a key atomically.
+        Returns:
+            float: Seconds the caller must wait.
+        """
+
+
+class LocalBackend(RateLimitBackend):
+    """
+    State kept in this process, guarded by a threading lock so limiters on event
+    loops in different threads can share it.
+    """
+
+    __slots__ = ("_tats", "_lock")
+
+    def __init__(self) -> None:
+        self._tats: dict[str, float] = {}
+        self._lock = Lock()
+
+    async def update(
+        self,
+        key: str,
+        interval: float,
+        burst: int,
+        mode: Mode,
+        retry_after: float = 0.0,
+    ) -> float:
+        with self._lock:
+            tat, wait = gcra(
+                self._tats.get(key), monotonic(), interval, burst, mode, retry_after
+            )
+            self._tats[key] = tat
+            return wait
+
+
+class FileBackend(RateLimitBackend):
+    """
+    State shared by every process on one host through a small file, locked with
+    `flock` around each update. Uses the wall clock, which all processes share.
+    POSIX only.
+    """
+
+    __slots__ = ("directory", "_fds", "_pid", "_lock")
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        """
+        Args:
+            directory (str | PathLike): Directory holding one state file per key. Created if missing.
+        """
+        import fcntl  # Fails early on platforms without flock.
+
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._fds: dict[str, int] = {}
+        self._pid = os.getpid()
+        self._lock = Lock()
+
+    def _fd(self, key: str) -> int:
+        if self._pid != os.getpid():
+            # flock is held per open file, which a forked child shares with its parent.
+            self._fds = {}
+            self._pid = os.getpid()
+        if key not in self._fds:
+            self._fds[key] = os.open(
+                os.path.join(self.directory, f"{key}.ratelimit"),
+                os.O_RDWR | os.O_CREAT,
+                0o600,
+            )
+        return self._fds[key]
+
+    async def update(
+        self,
+        key: str,
+        interval: float,
+        burst: int,
+        mode: Mode,
+        retry_after: float = 0.0,
+    ) -> float:
+        from fcntl import LOCK_EX, LOCK_UN, flock
+
+        with self._lock:
+            fd = self._fd(key)
+            flock(fd, LOCK_EX)
+            try:
+                raw = os.pread(fd, 8, 0)
+                stored = unpack("d", raw)[0] if len(raw) == 8 else None
+                tat, wait = gcra(stored, time(), interval, burst, mode, retry_after)
+                os.pwrite(fd, pack("d", tat), 0)
+                return wait
+            finally:
+                flock(fd, LOCK_UN)
+
+    def close(self) -> None:
+        with self._lock:
+            for fd in self._fds.values():
+                os.close(fd)
+            self._fds = {}
+
+
+class RateLimitStore(Protocol):
+    """
+    The part of the Redis protocol a StoreBackend needs, e.g. `redis.asyncio.Redis`.
+    """
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any: ...
+
+
+# The GCRA step above, run atomically inside the store on the store's own clock,
+# so hosts with skewed clocks still agree. Keys expire once their bucket is full again.
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local mode = ARGV[3]
+local retry_after = tonumber(ARGV[4])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tat = tonumber(redis.call("GET", KEYS[1]) or now)
+if tat < now then tat = now end
+local wait = 0
+if mode == "penalize" then
+    tat = math.max(tat, now + retry_after + (burst - 1) * interval)
+else
+    wait = math.max(tat + interval - burst * interval - now, 0)
+    if mode == "reserve" then tat = tat + interval end
+end
+if mode ~= "peek" then
+    redis.call("SET", KEYS[1], tostring(tat), "PX", math.ceil((tat - now) * 1000) + 1000)
+end
+return tostring(wait)
+"""
+
+
+class MemoryStore:
+    """
+    In-process stand-in for a Redis server, answering the scripts of this module.
+    For tests and single-host runs of code written against a StoreBackend.
+    """
+
+    __slots__ = ("_values", "_lock")
+
+    def __init__(self) -> None:
+        self._values: dict[str, float] = {}
+        self._lock = Lock()
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any:
+        if script != GCRA_SCRIPT or numkeys != 1:
+            raise NotImplementedError("MemoryStore only runs GCRA_SCRIPT")
+        key, interval, burst, mode, retry_after = keys_and_args
+        with self._lock:
+            tat, wait = gcra(
+                self._values.get(key),
+                time(),
+                float(interval),
+                int(burst),
+                mode,
+                float(retry_after),
+            )
+            self._values[key] = tat
+            return str(wait)
+
+
+class StoreBackend(RateLimitBackend):
+    """
+    State shared by every process on every host through a Redis-protocol store.
+    """
+
+    __slots__ = ("store", "prefix")
+
+    def __init__(self, store: RateLimitStore, prefix: str = "ratelimit:") -> None:
+        """
+        Args:
+            store (RateLimitStore): The store, e.g. `redis.asyncio.Redis(...)` or a MemoryStore.
+            prefix (str): Prefix of the keys written to the store.
+        """
+        self.store = store
+        self.prefix = prefix
+
+    async def update(
+        self,
+        key: str,
+        interval: float,
+        burst: int,
+        mode: Mode,
+        retry_after: float = 0.0,
+    ) -> float:
+        wait = await self.store.eval(
+            GCRA_SCRIPT,
+            1,
+            f"{self.prefix}{key}",
+            repr(interval),
+            str(burst),
+            mode,
+            repr(retry_after),
+        )
+        return float(wait.decode() if isinstance(wait, bytes) else wait)
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how many requests are sent per period.
+
+    Callers reserve a token and then sleep until it is theirs. The bucket itself
+    lives in a backend: in this process by default, or shared between processes
+    (FileBackend) or hosts (StoreBackend), so that every worker using the same
+    account draws from one budget.
+    """
+
+    __slots__ = ("rate", "period", "burst", "backend", "key")
+
+    def __init__(
+        self,
+        rate: int = DEFAULT_RATE,
+        period: float = DEFAULT_PERIOD,
+        burst: int | None = None,
+        backend: RateLimitBackend | None = None,
+        key: str = "shipstation",
+    ) -> None:
+        """
+        Args:
+            rate (int): Number of requests allowed per period.
+            period (float): Length of the period in seconds.
+            burst (int | None): Most requests that may be sent back to back. Defaults to `rate`.
+            backend (RateLimitBackend | None): Where the bucket lives. Defaults to this process.
+            key (str): Name of the bucket in the backend, e.g. one per ShipStation account.
+        """
+        self.rate = rate
+        self.period = period
+        self.burst = burst if burst is not None else rate
+        self.backend = backend if backend is not None else LocalBackend()
+        self.key = key
+
+    @property
+    def interval(self) -> float:
+        """
+        Seconds between two requests at the sustained rate.
+        """
+        return self.period / self.rate
+
+    async def reserve(self) -> float:
+        """
+        Takes a token from the bucket, going into debt if it is empty.
+        Returns:
+            float: Seconds the caller must wait before sending its request.
+        """
+        return await self.backend.update(self.key, self.interval, self.burst, "reserve")
+
+    async def backlog(self) -> float:
+        """
+        Seconds until a token would be available, without taking one.
+        Returns:
+            float: Zero when a request could be sent immediately.
+        """
+        return await self.backend.update(self.key, self.interval, self.burst, "peek")
+
+    async def acquire(self) -> None:
+        """
+        Waits until the caller may send a request.
+        """
+        delay = await self.reserve()
+        if delay > 0:
+            # Imported here so importing a portal does not pay for asyncio up front.
+            from asyncio import sleep
+
+            await sleep(delay)
+
+    async def penalize(self, retry_after: float) -> None:
+        """
+        Holds back every following request for at least `retry_after` seconds,
+        as asked by a 429 response. With a shared backend this pauses every worker.
+        Args:
+            retry_after (float): The Retry-After value of the response, in seconds.
+        """
+        await self.backend.update(
+            self.key, self.interval, self.burst, "penalize", retry_after
+        )
@@ -0,0 +1,317 @@
+from asyncio import sleep
+from base64 import b64decode, b64encode
+from collections import defaultdict, deque
+from gzip import decompress
+from gzip import open as gzip_open
+from hashlib import blake2b
+from json import JSONDecodeError, dumps, loads
+from pathlib import Path
+from threading import Lock
+from time import monotonic
+from typing import IO, Any, Iterable, Iterator, TypedDict
+
+from httpx import AsyncBaseTransport, AsyncHTTPTransport, Request, Response
+
+from .base import LOGGER
+
+RECORDING_VERSION = 1
+
+# Fields holding personal data in ShipStation payloads. Values are replaced with a
+# stable digest so that identical inputs still match after sanitizing.
+SENSITIVE_FIELDS: frozenset[str] = frozenset(
+    {
+        "name",
+        "company_name",
+        "email",
+        "phone",
+        "address_line1",
+        "address_line2",
+        "address_line3",
+        "ship_to_name",
+        "account_number",
+    }
+)
+
+# Response headers worth keeping; everything else, including auth, is dropped.
+KEPT_HEADERS: frozenset[str] = frozenset({"content-type", "retry-after"})
+
+
+class Exchange(TypedDict):
+    method: str
+    path: str
+    query: str
+    body: str
+    status: int
+    headers: dict[str, str]
+    content: str
+    encoding: str
+    offset: float
+    elapsed: float
+
+
+def _digest(value: str) -> str:
+    return "redacted-" + blake2b(value.encode("utf-8"), digest_size=6).hexdigest()
+
+
+def sanitize(data: Any, fields: frozenset[str] = SENSITIVE_FIELDS) -> Any:
+    """
+    Recursively replaces the values of sensitive fields with a stable digest.
+    Args:
+        data (Any): A decoded JSON value.
+        fields (frozenset[str]): The keys whose values should be replaced.
+    Returns:
+        Any: A sanitized copy of the value.
+    """
+    if isinstance(data, dict):
+        return {
+            k: (
+                _digest(str(v))
+                if k in fields and v is not None
+                else sanitize(v, fields)
+            )
+            for k, v in data.items()
+        }
+    if isinstance(data, list):
+        return [sanitize(v, fields) for v in data]
+    return data
+
+
+def _sanitize_body(content: bytes, fields: frozenset[str]) -> tuple[str, str]:
+    if not content:
+        return ("", "utf-8")
+    try:
+        return (dumps(sanitize(loads(content), fields), separators=(",", ":")), "json")
+    except (JSONDecodeError, UnicodeDecodeError):
+        return (b64encode(content).decode("ascii"), "base64")
+
+
+def _sanitize_query(request: Request, fields: frozenset[str]) -> str:
+    pairs = sorted(
+        (k, _digest(v) if k in fields else v)
+        for k, v in request.url.params.multi_items()
+    )
+    return "&".join(f"{k}={v}" for k, v in pairs)
+
+
+def _key(method: str, path: str, query: str) -> str:
+    return f"{method} {path}?{query}"
+
+
+class RecordingTransport(AsyncBaseTransport):
+    """
+    Forwards requests to an inner transport and appends each sanitized exchange
+    to a gzip-compressed JSON lines file. The API key is never written, since only
+    the method, path, query and body of a request are kept.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        transport: AsyncBaseTransport | None = None,
+        fields: Iterable[str] = SENSITIVE_FIELDS,
+    ) -> None:
+        """
+        Args:
+            path (Path): File to write the recording to. Overwritten if it exists.
+            transport (AsyncBaseTransport | None): Transport to forward requests to. Defaults to the network.
+            fields (Iterable[str]): Keys whose values are redacted in queries and bodies.
+        """
+        self.path = path
+        self._inner = transport if transport is not None else AsyncHTTPTransport()
+        self._fields = frozenset(fields)
+        self._lock = Lock()
+        self._began = monotonic()
+        self._file: IO[str] | None = gzip_open(path, "wt", encoding="utf-8")
+        self._file.write(dumps({"version": RECORDING_VERSION}) + "\n")
+
+    async def handle_async_request(self, request: Request) -> Response:
+        began = monotonic()
+        response = await self._inner.handle_async_request(request)
+        content = await response.aread()
+        elapsed = monotonic() - began
+
+        sent = request.content
+        if request.headers.get("content-encoding") == "gzip":
+            sent = decompress(sent)
+        body, _ = _sanitize_body(sent, self._fields)
+        recorded, encoding = _sanitize_body(content, self._fields)
+        exchange: Exchange = {
+            "method": request.method,
+            "path": request.url.path,
+            "query": _sanitize_query(request, self._fields),
+            "body": body,
+            "status": response.status_code,
+            "headers": {
+                k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS
+            },
+            "content": recorded,
+            "encoding": encoding,
+            "offset": round(began - self._began, 6),
+            "elapsed": round(elapsed, 6),
+        }
+
+        with self._lock:
+            if self._file is not None:
+                self._file.write(dumps(exchange, separators=(",", ":")) + "\n")
+
+        return Response(
+            response.status_code,
+            headers={
+                k: v
+                for k, v in response.headers.items()
+                if k.lower() not in ("content-encoding", "content-length")
+            },
+            content=content,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                LOGGER.info(f"RecordingTransport:::Recording written to {self.path}")
+        await self._inner.aclose()
+
+
+def read_recording(path: Path) -> Iterator[Exchange]:
+    """
+    Reads the exchanges stored in a recording file, in recorded order.
+    Args:
+        path (Path): The recording file.
+    Yields:
+        Exchange: Each recorded request and response pair.
+    """
+    with gzip_open(path, "rt", encoding="utf-8") as f:
+        header = loads(f.readline())
+        if header.get("version") != RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version {header.get('version')}")
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+
+class ReplayTransport(AsyncBaseTransport):
+    """
+    Answers requests from a recording instead of the network.
+
+    Requests are matched on method, path and sanitized query. Repeated requests
+    for the same key are answered with the recorded responses in order, and wrap
+    around when `loop` is set so a recording can drive many times its own volume.
+
+    Responses are paced by the recording: each one is held back until its recorded
+    offset plus latency, scaled by `speed`, has passed since the first replayed
+    request, so bursts and gaps between requests come back as they were captured.
+    Each pass of a wrapped key is placed one recording length after the previous one.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        speed: float = 1.0,
+        loop: bool = True,
+        fields: Iterable[str] = SENSITIVE_FIELDS,
+    ) -> None:
+        """
+        Args:
+            path (Path): The recording file to replay.
+            speed (float): Time scale for recorded offsets and latencies. 1.0 replays at original timing,
+                10.0 is ten times faster and 0 answers immediately.
+            loop (bool): Whether to wrap around once every response for a key was served.
+            fields (Iterable[str]): Keys redacted during recording, so queries are matched the same way.
+        """
+        self.speed = speed
+        self.loop = loop
+        self._fields = frozenset(fields)
+        self._lock = Lock()
+        self._exchanges: dict[str, list[Exchange]] = defaultdict(list)
+        self._cursors: dict[str, int] = defaultdict(int)
+        self._passes: dict[str, int] = defaultdict(int)
+        self._began: float | None = None
+        self.misses: deque[str] = deque(maxlen=100)
+        self.served = 0
+
+        # Exchanges are written as they complete, so a fast request sent later can
+        # come first in the file; replay them in the order they were sent.
+        recorded = sorted(read_recording(path), key=lambda e: e["offset"])
+        for exchange in recorded:
+            key = _key(exchange["method"], exchange["path"], exchange["query"])
+            self._exchanges[key].append(exchange)
+            # Same path with any query, for requests whose query was not recorded.
+            self._exchanges[_key(exchange["method"], exchange["path"], "*")].append(
+                exchange
+            )
+        # Offsets count from the transport's creation, not from the first request.
+        self._first = recorded[0]["offset"] if recorded else 0.0
+        self._length = max(
+            (e["offset"] + e["elapsed"] - self._first for e in recorded), default=0.0
+        )
+
+    def _next(self, key: str) -> tuple[Exchange, int] | None:
+        exchanges = self._exchanges.get(key)
+        if not exchanges:
+            return None
+        with self._lock:
+            cursor = self._cursors[key]
+            if cursor >= len(exchanges):
+                if not self.loop:
+                    return None
+                cursor = 0
+                self._passes[key] += 1
+            self._cursors[key] = cursor + 1
+            return (exchanges[cursor], self._passes[key])
+
+    def _delay(self, exchange: Exchange, passes: int) -> float:
+        now = monotonic()
+        with self._lock:
+            if self._began is None:
+                self._began = now
+            began = self._began
+        due = (
+            passes * self._length
+            + exchange["offset"]
+            - self._first
+            + exchange["elapsed"]
+        )
+        # A request sent later than recorded still takes its recorded latency.
+        return max(began + due / self.speed - now, exchange["elapsed"] / self.speed)
+
+    async def handle_async_request(self, request: Request) -> Response:
+        method, path = request.method, request.url.path
+        key = _key(method, path, _sanitize_query(request, self._fields))
+        found = self._next(key)
+        if found is None:
+            found = self._next(_key(method, path, "*"))
+
+        if found is None:
+            self.misses.append(key)
+            LOGGER.warning(f"ReplayTransport:::No recorded response for {key}")
+            return Response(
+                404,
+                json={
+                    "error_source": "ShipStation",
+                    "error_type": "integrations",
+                    "error_code": "unknown",
+                    "message": f"No recorded response for {key}",
+                },
+                request=request,
+            )
+
+        exchange, passes = found
+        if self.speed > 0:
+            delay = self._delay(exchange, passes)
+            if delay > 0:
+                await sleep(delay)
+
+        self.served += 1
+        content = (
+            b64decode(exchange["content"])
+            if exchange["encoding"] == "base64"
+            else exchange["content"].encode("utf-8")
+        )
+        return Response(
+            exchange["status"],
+            headers=exchange["headers"],
+            content=content,
+            request=request,
+        )
@@ -0,0 +1,227 @@
+from codecs import getincrementaldecoder
+from json import JSONDecodeError, JSONDecoder, loads
+from re import compile as compile_regex
+from typing import Any, AsyncIterator, Literal, cast
+
+from .base import APIError, ShipStationClient, unknown_error
+from .endpoints import EndpointSpec
+
+# Characters that change the nesting depth or start a string, while seeking the array.
+_STRUCTURE = compile_regex(r'["{}\[\]]')
+# The rest of a JSON string after its opening quote, including the closing quote.
+_STRING_REST = compile_regex(r'(?:[^"\\]|\\.)*"')
+_SEPARATORS = compile_regex(r"[\s,]*")
+
+_DECODER = JSONDecoder()
+
+
+class ArrayItems:
+    """
+    Incremental parser pulling the items of one top-level array out of a JSON object
+    while its bytes arrive, e.g. the "fulfillments" of a list response.
+
+    Until the array is found the text is scanned for the key, which is cheap as it
+    comes first or after a few small fields. From then on every item is decoded on
+    its own by the C decoder as soon as its last byte is in, and its text dropped,
+    so only the item being received is buffered instead of the whole page. The
+    fields around the array are kept and read with `envelope` at the end.
+
+    Items must be objects or arrays, as they are in every ShipStation list.
+    """
+
+    __slots__ = (
+        "key",
+        "_decoder",
+        "_text",
+        "_pos",
+        "_depth",
+        "_last",
+        "_head",
+        "_state",
+    )
+
+    def __init__(self, key: str) -> None:
+        """
+        Args:
+            key (str): The key of the array, e.g. "fulfillments".
+        """
+        self.key = key
+        self._decoder = getincrementaldecoder("utf-8")()
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._last: str | None = None
+        self._head = ""
+        self._state: Literal["seek", "items", "tail"] = "seek"
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """
+        Parses the next chunk of the body.
+        Args:
+            chunk (bytes): The bytes received.
+        Returns:
+            list[Any]: The items completed by this chunk, in order.
+        """
+        self._text += self._decoder.decode(chunk)
+        return self._parse(final=False)
+
+    def close(self) -> list[Any]:
+        """
+        Parses the end of the body.
+        Returns:
+            list[Any]: The items still pending, in order.
+        Raises:
+            ValueError: If the body is not a complete JSON object.
+        """
+        self._text += self._decoder.decode(b"", final=True)
+        items = self._parse(final=True)
+        if self._state == "items":
+            raise ValueError(f"Body ended inside the {self.key!r} array")
+        return items
+
+    def envelope(self) -> dict[str, Any]:
+        """
+        Decodes the fields around the array, once the body was closed.
+        Returns:
+            dict[str, Any]: The response with the array emptied, e.g. with its total and pages.
+        """
+        return loads(self._head + self._text)
+
+    def _parse(self, final: bool) -> list[Any]:
+        if self._state == "seek":
+            self._seek()
+        if self._state != "items":
+            return []
+
+        text = self._text
+        pos = self._pos
+        items: list[Any] = []
+        while True:
+            pos = _SEPARATORS.match(text, pos).end()  # type: ignore[union-attr]
+            if pos >= len(text):
+                break
+            if text[pos] == "]":
+                self._state = "tail"
+                break
+            try:
+                item, end = _DECODER.raw_decode(text, pos)
+            except JSONDecodeError:
+                if final:
+                    raise
+                break
+            if end == len(text) and not final and not isinstance(item, (dict, list)):
+                break  # A number cut by the chunk boundary decodes too early.
+            items.append(item)
+            pos = end
+
+        self._text = text[pos:]
+        self._pos = 0
+        return items
+
+    def _seek(self) -> None:
+        text = self._text
+        pos = self._pos
+        while True:
+            match = _STRUCTURE.search(text, pos)
+            if match is None:
+                pos = len(text)
+                break
+            i = match.start()
+            char = text[i]
+            if char == '"':
+                rest = _STRING_REST.match(text, i + 1)
+                if rest is None:
+                    pos = i  # The string continues in the next chunk.
+                    break
+                if self._depth == 1:
+                    self._last = text[i + 1 : rest.end() - 1]
+                pos = rest.end()
+                continue
+
+            pos = i + 1
+            if char in "{[":
+                self._depth += 1
+                if char == "[" and self._depth == 2 and self._last == self.key:
+                    self._head = text[:pos]
+                    self._text = text[pos:]
+                    self._pos = 0
+                    self._state = "items"
+                    return
+            else:
+                self._depth -= 1
+        self._pos = pos
+
+
+class ListStream:
+    """
+    One page of a list endpoint, read as a stream: its items are yielded while the
+    body is still arriving, so processing overlaps the transfer and a page is never
+    held decoded in memory all at once.
+
+        stream = ListStream(LIST_FULFILLMENTS, "fulfillments", params={"page_size": 500})
+        async for fulfillment in stream:
+            ...
+        print(stream.envelope["pages"])
+
+    The request goes through the rate limiter like any other. The circuit breakers
+    and hedging of `ShipStationClient.call` do not apply to it.
+    """
+
+    __slots__ = ("spec", "key", "path", "params", "chunk_size", "status", "envelope")
+
+    def __init__(
+        self,
+        spec: EndpointSpec,
+        key: str,
+        path: dict[str, str] | None = None,
+        params: dict[str, Any] | None = None,
+        chunk_size: int = 64 * 1024,
+    ) -> None:
+        """
+        Args:
+            spec (EndpointSpec): The list endpoint, e.g. LIST_FULFILLMENTS.
+            key (str): The key of the items, e.g. "fulfillments".
+            path (dict[str, str] | None): Values for the placeholders in the endpoint path.
+            params (dict[str, Any] | None): Query parameters. None values are dropped.
+            chunk_size (int): Bytes read at a time. Defaults to 64 KiB.
+        """
+        self.spec = spec
+        self.key = key
+        self.path = path
+        self.params = params
+        self.chunk_size = chunk_size
+        self.status: int | None = None
+        self.envelope: dict[str, Any] | None = None
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        """
+        Yields:
+            Any: Each item of the page, in order.
+        Raises:
+            APIError: If the endpoint answered with an unexpected status or a malformed body.
+        """
+        params = {k: v for k, v in (self.params or {}).items() if v is not None}
+        async with ShipStationClient.stream(
+            self.spec.method, self.spec.url(self.path), params=params
+        ) as response:
+            self.status = response.status_code
+            if response.status_code not in self.spec.expected:
+                body = await response.aread()
+                try:
+                    detail = loads(body)
+                except ValueError:
+                    detail = unknown_error(f"Unexpected response: {body[:200]!r}")
+                raise APIError(response.status_code, cast(dict, detail))
+
+            parser = ArrayItems(self.key)
+            try:
+                async for chunk in response.aiter_bytes(self.chunk_size):
+                    for item in parser.feed(chunk):
+                        yield item
+                for item in parser.close():
+                    yield item
+                self.envelope = parser.envelope()
+            except ValueError as err:
+                raise APIError(
+                    500, cast(dict, unknown_error(f"Malformed {self.key} page: {err}"))
+                )
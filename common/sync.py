@@ -0,0 +1,232 @@
+import os
+from asyncio import AbstractEventLoop, new_event_loop, run_coroutine_threadsafe
+from atexit import register
+from concurrent.futures import Future
+from inspect import iscoroutinefunction
+from threading import Event, Lock, Thread
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, TypeVar
+
+from .base import LOGGER, ShipStationClient
+
+if TYPE_CHECKING:
+    from httpx import AsyncBaseTransport
+
+T = TypeVar("T")
+
+
+class SyncPortal:
+    """
+    Proxy exposing the async classmethods of a portal as plain functions that
+    return concurrent futures resolved on the background event loop.
+    """
+
+    __slots__ = ("_portal", "_facade")
+
+    def __init__(
+        self, portal: type[ShipStationClient], facade: "SyncShipStation"
+    ) -> None:
+        self._portal = portal
+        self._facade = facade
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        attr = getattr(self._portal, name)
+        if not iscoroutinefunction(attr):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Future[Any]:
+            return self._facade.submit(attr, *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = attr.__doc__
+        return call
+
+    def __repr__(self) -> str:
+        return f"SyncPortal({self._portal.__name__})"
+
+
+class SyncShipStation:
+    """
+    Thread-safe synchronous facade for the async portals.
+
+    One event loop runs on a daemon thread for the life of the process, and the
+    shared AsyncClient is started on it once, so its connection pool stays warm
+    across calls instead of being rebuilt by `asyncio.run` each time. Calls from any
+    thread are handed to that loop and return a `concurrent.futures.Future`.
+
+        facade = SyncShipStation.instance()
+        batches = facade.portal(BatchPortal)
+        status, batch = batches.get_by_id("se-123").result()
+
+    Portal calls made through the facade must not use `scoped_client`, which would
+    close the shared session.
+    """
+
+    __slots__ = (
+        "_transport",
+        "_loop",
+        "_thread",
+        "_ready",
+        "_lock",
+        "_portals",
+    )
+
+    _instance: "SyncShipStation | None" = None
+    _instance_lock: Lock = Lock()
+
+    def __init__(self, transport: "AsyncBaseTransport | None" = None) -> None:
+        """
+        Args:
+            transport (AsyncBaseTransport | None): Optional transport for the shared client.
+        """
+        self._transport = transport
+        self._loop: AbstractEventLoop | None = None
+        self._thread: Thread | None = None
+        self._ready = Event()
+        self._lock = Lock()
+        self._portals: dict[type[ShipStationClient], SyncPortal] = {}
+
+    @classmethod
+    def instance(
+        cls: type["SyncShipStation"],
+        transport: "AsyncBaseTransport | None" = None,
+    ) -> "SyncShipStation":
+        """
+        Returns the process-wide facade, starting it on first use.
+        Args:
+            transport (AsyncBaseTransport | None): Transport used if the facade is created by this call.
+        Returns:
+            SyncShipStation: The running facade.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(transport)
+                cls._instance.start()
+            return cls._instance
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Starts the background event loop and the shared client session.
+        """
+        with self._lock:
+            if self.running:
+                return
+            self._ready.clear()
+            self._thread = Thread(target=self._run, name="ShipStationLoop", daemon=True)
+            self._thread.start()
+            self._ready.wait()
+
+        self.submit(ShipStationClient.start, self._transport).result()
+        LOGGER.info("SyncShipStation:::Background event loop started")
+
+    def _run(self) -> None:
+        loop = new_event_loop()
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def submit(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Future[T]:
+        """
+        Schedules a coroutine function on the background loop.
+        Args:
+            func (Callable[..., Awaitable[T]]): The coroutine function to call, e.g. BatchPortal.get_by_id.
+            *args: Positional arguments for the call.
+            **kwargs: Keyword arguments for the call.
+        Returns:
+            Future[T]: Resolves to the value returned by the call.
+        """
+        if self._loop is None or not self.running:
+            raise RuntimeError("SyncShipStation is not running.")
+
+        async def call() -> T:
+            return await func(*args, **kwargs)
+
+        return run_coroutine_threadsafe(call(), self._loop)
+
+    def call(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> T:
+        """
+        Runs a coroutine function on the background loop and waits for its result.
+        Args:
+            func (Callable[..., Awaitable[T]]): The coroutine function to call.
+            *args: Positional arguments for the call.
+            timeout (float | None): Seconds to wait before raising TimeoutError.
+            **kwargs: Keyword arguments for the call.
+        Returns:
+            T: The value returned by the call.
+        """
+        return self.submit(func, *args, **kwargs).result(timeout)
+
+    def portal(self, portal: type[ShipStationClient]) -> SyncPortal:
+        """
+        Returns a synchronous proxy for a portal.
+        Args:
+            portal (type[ShipStationClient]): The portal class, e.g. BatchPortal.
+        Returns:
+            SyncPortal: Proxy whose methods return concurrent futures.
+        """
+        with self._lock:
+            if portal not in self._portals:
+                self._portals[portal] = SyncPortal(portal, self)
+            return self._portals[portal]
+
+    def stop(self, timeout: float | None = 10) -> None:
+        """
+        Closes the shared client session and stops the background loop.
+        Args:
+            timeout (float | None): Seconds to wait for the session to close.
+        """
+        with self._lock:
+            if not self.running or self._loop is None:
+                return
+            loop = self._loop
+            try:
+                run_coroutine_threadsafe(ShipStationClient.close(), loop).result(
+                    timeout
+                )
+            finally:
+                loop.call_soon_threadsafe(loop.stop)
+                if self._thread is not None:
+                    self._thread.join(timeout)
+                self._thread = None
+                self._loop = None
+        LOGGER.info("SyncShipStation:::Background event loop stopped")
+
+    @classmethod
+    def shutdown(cls: type["SyncShipStation"]) -> None:
+        """
+        Stops the process-wide facade, if it was started.
+        """
+        with cls._instance_lock:
+            if cls._instance is not None:
+                cls._instance.stop()
+                cls._instance = None
+
+    @classmethod
+    def _after_fork(cls: type["SyncShipStation"]) -> None:
+        # The loop thread does not survive a fork, and the inherited client is bound to it.
+        cls._instance = None
+        cls._instance_lock = Lock()
+        ShipStationClient._client = None
+        ShipStationClient._connection_lock = Lock()
+
+
+register(SyncShipStation.shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=SyncShipStation._after_fork)
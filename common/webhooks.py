@@ -0,0 +1,152 @@
+from json import JSONDecodeError, dumps, loads
+from typing import Any, Awaitable, Callable, MutableMapping
+
+from .base import LOGGER
+from .events import EventBus, parse_event
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+Verifier = Callable[[dict[str, str], bytes], bool]
+
+
+class WebhookReceiver:
+    """
+    Minimal ASGI application receiving ShipStation webhooks and publishing them on
+    an EventBus. It has no dependencies and runs under any ASGI server:
+
+        bus = EventBus()
+        set_event_bus(bus)
+        app = WebhookReceiver(bus)
+        # uvicorn module:app --port 8080
+
+    Register `https://<host><path>` as the webhook URL of the batch and fulfillment
+    events in ShipStation.
+    """
+
+    __slots__ = ("bus", "path", "verify", "max_body", "received", "rejected")
+
+    def __init__(
+        self,
+        bus: EventBus,
+        path: str = "/webhooks/shipstation",
+        verify: Verifier | None = None,
+        max_body: int = 1024 * 1024,
+    ) -> None:
+        """
+        Args:
+            bus (EventBus): The bus events are published on.
+            path (str): The URL path webhooks are posted to.
+            verify (Verifier | None): Called with the lowercased headers and the raw body;
+                requests it returns False for are rejected with 401.
+            max_body (int): Largest accepted body in bytes. Defaults to 1 MiB.
+        """
+        self.bus = bus
+        self.path = path
+        self.verify = verify
+        self.max_body = max_body
+        self.received = 0
+        self.rejected = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        if scope["type"] != "http":
+            return
+        if scope["path"] != self.path:
+            return await self._respond(send, 404, "Not found")
+        if scope["method"] != "POST":
+            return await self._respond(send, 405, "Method not allowed")
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > self.max_body:
+                self.rejected += 1
+                return await self._respond(send, 413, "Body too large")
+            if not message.get("more_body", False):
+                break
+
+        headers = {
+            key.decode("latin-1").lower(): value.decode("latin-1")
+            for key, value in scope.get("headers", [])
+        }
+        if self.verify is not None and not self.verify(headers, bytes(body)):
+            self.rejected += 1
+            LOGGER.warning(
+                "WebhookReceiver:::Rejected a webhook that failed verification"
+            )
+            return await self._respond(send, 401, "Invalid signature")
+
+        try:
+            payload = loads(body)
+        except (JSONDecodeError, UnicodeDecodeError):
+            self.rejected += 1
+            return await self._respond(send, 400, "Body must be JSON")
+
+        payloads = payload if isinstance(payload, list) else [payload]
+        for item in payloads:
+            if isinstance(item, dict):
+                self.received += 1
+                self.bus.publish(parse_event(item))
+        await self._respond(send, 204, None)
+
+    @staticmethod
+    async def _respond(send: Send, status: int, message: str | None) -> None:
+        body = dumps({"message": message}).encode() if message is not None else b""
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+async def send_webhook(
+    target: str | WebhookReceiver,
+    resource_type: str,
+    resource_url: str,
+    data: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+) -> int:
+    """
+    Posts a webhook shaped like ShipStation's, standing in for ShipStation in tests
+    and local runs.
+    Args:
+        target (str | WebhookReceiver): The webhook URL, or a receiver to call in-process.
+        resource_type (str): The event type, e.g. "API_BATCH" or "fulfillment_shipped_v2".
+        resource_url (str): The URL of the changed resource.
+        data (dict[str, Any] | None): Optional resource body sent along.
+        headers (dict[str, str] | None): Extra headers, e.g. a signature.
+    Returns:
+        int: The status code the receiver answered with.
+    """
+    from httpx import ASGITransport, AsyncClient
+
+    payload: dict[str, Any] = {
+        "resource_type": resource_type,
+        "resource_url": resource_url,
+    }
+    if data is not None:
+        payload["data"] = data
+
+    if isinstance(target, WebhookReceiver):
+        async with AsyncClient(
+            transport=ASGITransport(app=target), base_url="http://webhooks"
+        ) as client:
+            response = await client.post(target.path, json=payload, headers=headers)
+    else:
+        async with AsyncClient() as client:
+            response = await client.post(target, json=payload, headers=headers)
+    return response.status_code
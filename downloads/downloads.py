@@ -1,9 +1,22 @@
+from json import JSONDecodeError, loads
+from os import replace
+from pathlib import Path
 from typing import cast
 
 from ..common._types import Endpoints, Error  # type: ignore[import-not-found, misc]
 from ..common.base import (  # type: ignore[import-not-found, misc]
-    API_ENDPOINT,
+    LOGGER,
     ShipStationClient,
+    unknown_error,
+)
+from ..common.endpoints import EndpointSpec  # type: ignore[import-not-found, misc]
+
+DOWNLOAD_FILE = EndpointSpec(
+    "downloads.download_file",
+    "GET",
+    Endpoints.DOWNLOADS,
+    "/{dir}/{subdir}/{filename}",
+    body="bytes",
 )
 
 
@@ -17,40 +30,64 @@ class DownloadPortal(ShipStationClient):
         download: str,
         rotation: int = 0,
     ) -> tuple[int, bytes | Error]:
-        endpoint = f"{API_ENDPOINT}/{Endpoints.DOWNLOADS}/{dir}/{subdir}/{filename}"
         params = {
             "download": download,
             "rotation": rotation,
         }
 
-        try:
-            res = await cls.request(
-                "GET",
-                endpoint,
+        return cast(
+            tuple[int, bytes | Error],
+            await cls.call(
+                DOWNLOAD_FILE,
+                path={"dir": dir, "subdir": subdir, "filename": filename},
                 params=params,
                 headers={"content-type": "application/pdf"},
-            )
-            if res.status_code != 200:
-                if "error_code" in res.json():
+            ),
+        )
+
+    @classmethod
+    async def save_file(
+        cls: type[ShipStationClient],
+        url: str,
+        path: Path,
+        chunk_size: int = 64 * 1024,
+    ) -> tuple[int, Path | Error]:
+        """
+        Streams a file, such as a Batch label_download or form_download, to disk.
+        The body is written chunk by chunk to a ".part" file that is renamed once
+        complete, so a partial download never appears under the final name.
+
+        Args:
+            url (str): The download URL, absolute or relative to the API.
+            path (Path): Where to write the file. Its directory is created if missing.
+            chunk_size (int): Bytes read from the network at a time. Defaults to 64 KiB.
+
+        Returns:
+            tuple[int, Path | Error]: A tuple containing the status code and either the written path or an Error.
+        """
+        partial = path.with_name(f"{path.name}.part")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            async with cls.stream("GET", url) as res:
+                if res.status_code != 200:
+                    body = await res.aread()
+                    try:
+                        error = loads(body)
+                    except (JSONDecodeError, UnicodeDecodeError):
+                        error = None
+                    if isinstance(error, dict) and "error_code" in error:
+                        return (res.status_code, cast(Error, error))
                     return (
                         res.status_code,
-                        cast(Error, res.json()),
+                        unknown_error(f"Download of {url} failed: {body[:200]!r}"),
                     )
-                else:
-                    raise Exception(f"Unexpected response: {res.json()}")
 
+                with open(partial, "wb") as f:
+                    async for chunk in res.aiter_bytes(chunk_size):
+                        f.write(chunk)
+            replace(partial, path)
+            return (200, path)
         except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, cast(bytes, res.content))
+            LOGGER.error(f"save_file:::Download of {url} failed: {e}")
+            partial.unlink(missing_ok=True)
+            return (500, unknown_error(str(e)))
@@ -0,0 +1,294 @@
+import sys
+from abc import ABC, abstractmethod
+from asyncio import as_completed, gather, get_running_loop
+from concurrent.futures import Executor, ProcessPoolExecutor
+from io import BytesIO
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count
+from pathlib import Path
+from re import DOTALL, compile
+from typing import AsyncIterator, Sequence, cast
+
+from ..common.base import APIError, LOGGER  # type: ignore[import-not-found]
+from .downloads import DownloadPortal
+
+ZPL_LABEL = compile(rb"\^XA.*?\^XZ", DOTALL)
+
+
+class LabelTransform(ABC):
+    """
+    A CPU-bound transform run in worker processes.
+
+    `plan` inspects the whole file once and returns small, picklable descriptions of
+    each output, then `render` builds the outputs of a contiguous run of those
+    descriptions. Each run is its own pool task, so outputs are written as soon as
+    their run is ready, and setup such as parsing the file is paid once per run
+    rather than once per output.
+    Subclasses must be importable at module level so they can be pickled.
+    """
+
+    suffix: str = ""
+
+    @abstractmethod
+    def plan(self, data: memoryview) -> Sequence[object]:
+        """
+        Returns:
+            Sequence[object]: One picklable description per output, in output order.
+        """
+
+    @abstractmethod
+    def render(self, data: memoryview, parts: Sequence[object]) -> list[bytes]:
+        """
+        Returns:
+            list[bytes]: One output per description in `parts`.
+        """
+
+
+class ZplSplit(LabelTransform):
+    """
+    Splits a batch ZPL file into one file per `^XA ... ^XZ` label.
+    """
+
+    suffix = ".zpl"
+
+    def plan(self, data: memoryview) -> Sequence[object]:
+        return [match.span() for match in ZPL_LABEL.finditer(data)]
+
+    def render(self, data: memoryview, parts: Sequence[object]) -> list[bytes]:
+        return [
+            bytes(data[start:end])
+            for start, end in cast(Sequence[tuple[int, int]], parts)
+        ]
+
+
+class PdfSplit(LabelTransform):
+    """
+    Splits a batch PDF into one file per page. Requires the optional `pypdf` package.
+    """
+
+    suffix = ".pdf"
+
+    def plan(self, data: memoryview) -> Sequence[object]:
+        from pypdf import PdfReader  # type: ignore[import-not-found]
+
+        return list(range(len(PdfReader(BytesIO(data)).pages)))
+
+    def render(self, data: memoryview, parts: Sequence[object]) -> list[bytes]:
+        from pypdf import PdfReader, PdfWriter  # type: ignore[import-not-found]
+
+        # One copy and parse of the file for the whole run of pages.
+        reader = PdfReader(BytesIO(data))
+        pages = []
+        for part in parts:
+            writer = PdfWriter()
+            writer.add_page(reader.pages[cast(int, part)])
+            out = BytesIO()
+            writer.write(out)
+            pages.append(out.getvalue())
+        return pages
+
+
+def _attach(name: str) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        # The parent owns the segment; workers must not unlink it when they exit.
+        return SharedMemory(name=name, track=False)
+    return SharedMemory(name=name)
+
+
+def _view(shm: SharedMemory, size: int) -> memoryview:
+    return cast(memoryview, shm.buf)[:size]
+
+
+def _plan(name: str, size: int, transform: LabelTransform) -> Sequence[object]:
+    shm = _attach(name)
+    data = _view(shm, size)
+    try:
+        return transform.plan(data)
+    finally:
+        data.release()
+        shm.close()
+
+
+def _render(
+    name: str,
+    size: int,
+    transform: LabelTransform,
+    parts: Sequence[object],
+    paths: list[Path],
+) -> list[Path]:
+    shm = _attach(name)
+    data = _view(shm, size)
+    try:
+        for path, output in zip(paths, transform.render(data, parts)):
+            path.write_bytes(output)
+        return paths
+    finally:
+        data.release()
+        shm.close()
+
+
+def _merge(paths: list[Path], path: Path) -> Path:
+    if path.suffix == ".pdf":
+        from pypdf import PdfWriter  # type: ignore[import-not-found]
+
+        writer = PdfWriter()
+        for part in paths:
+            writer.append(part)
+        with open(path, "wb") as f:
+            writer.write(f)
+        return path
+
+    with open(path, "wb") as f:
+        for part in paths:
+            f.write(part.read_bytes())
+    return path
+
+
+class LabelPostProcessor:
+    """
+    Runs label post-processing in a process pool so the event loop keeps serving
+    other downloads.
+
+    A downloaded file is copied once into a shared memory segment, and every worker
+    reads it from there rather than receiving a pickled copy. Its outputs are
+    rendered in contiguous runs, about two per worker.
+    """
+
+    __slots__ = ("output_dir", "workers", "_executor", "_owned")
+
+    def __init__(
+        self,
+        output_dir: Path,
+        workers: int | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        """
+        Args:
+            output_dir (Path): Directory the output files are written to. Created if missing.
+            workers (int | None): Size of the process pool, or of `executor` if given. Defaults to the CPU count.
+            executor (Executor | None): An existing process pool to use instead of creating one.
+        """
+        self.output_dir = output_dir
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers or cpu_count() or 1
+        self._owned = executor is None
+        self._executor = executor or ProcessPoolExecutor(max_workers=workers)
+
+    async def process(
+        self,
+        data: bytes,
+        transform: LabelTransform,
+        prefix: str,
+    ) -> AsyncIterator[Path]:
+        """
+        Applies a transform to a label file, yielding each output file as it is written.
+        Args:
+            data (bytes): The label file, e.g. as returned by DownloadPortal.download_file.
+            transform (LabelTransform): The transform to apply, e.g. PdfSplit() or ZplSplit().
+            prefix (str): Prefix of the output file names.
+        Yields:
+            Path: Each written output file, as its run of outputs completes.
+        """
+        loop = get_running_loop()
+        size = len(data)
+        shm = SharedMemory(create=True, size=max(size, 1))
+        try:
+            _view(shm, size)[:] = data
+            parts = await loop.run_in_executor(
+                self._executor, _plan, shm.name, size, transform
+            )
+            paths = [
+                self.output_dir / f"{prefix}-{index:04d}{transform.suffix}"
+                for index in range(len(parts))
+            ]
+            # Two runs per worker, so a slow run does not hold back the rest.
+            step = max(1, -(-len(parts) // (2 * self.workers)))
+            renders = [
+                loop.run_in_executor(
+                    self._executor,
+                    _render,
+                    shm.name,
+                    size,
+                    transform,
+                    parts[start : start + step],
+                    paths[start : start + step],
+                )
+                for start in range(0, len(parts), step)
+            ]
+            try:
+                for render in as_completed(renders):
+                    for path in await render:
+                        yield path
+            finally:
+                for render in renders:
+                    render.cancel()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    async def download(
+        self,
+        dir: str,
+        subdir: str,
+        filename: str,
+        download: str,
+        transform: LabelTransform,
+        rotation: int = 0,
+    ) -> AsyncIterator[Path]:
+        """
+        Downloads a label file and streams the outputs of a transform applied to it.
+        Args:
+            dir (str): The download directory, as for DownloadPortal.download_file.
+            subdir (str): The download subdirectory.
+            filename (str): The file name, also used as the prefix of the outputs.
+            download (str): The download token.
+            transform (LabelTransform): The transform to apply.
+            rotation (int): Label rotation in degrees. Defaults to 0.
+        Yields:
+            Path: Each written output file, in completion order.
+        Raises:
+            APIError: If the download failed.
+        """
+        status, content = await DownloadPortal.download_file(
+            dir, subdir, filename, download, rotation
+        )
+        if status != 200:
+            raise APIError(status, content)  # type: ignore[arg-type]
+
+        async for path in self.process(content, transform, Path(filename).stem):  # type: ignore[arg-type]
+            yield path
+
+    async def merge(
+        self, groups: dict[str, list[Path]], suffix: str
+    ) -> dict[str, Path]:
+        """
+        Merges output files into one file per group, e.g. per printer.
+        PDFs are merged with `pypdf`; other formats such as ZPL are concatenated.
+        Args:
+            groups (dict[str, list[Path]]): The files to merge, keyed by group name.
+            suffix (str): Suffix of the merged files, e.g. ".pdf" or ".zpl".
+        Returns:
+            dict[str, Path]: The merged file of each group.
+        """
+        loop = get_running_loop()
+        names = list(groups)
+        merged = await gather(
+            *[
+                loop.run_in_executor(
+                    self._executor,
+                    _merge,
+                    groups[name],
+                    self.output_dir / f"{name}{suffix}",
+                )
+                for name in names
+            ]
+        )
+        LOGGER.info(f"LabelPostProcessor:::Merged {len(names)} groups")
+        return dict(zip(names, merged))
+
+    def close(self) -> None:
+        """
+        Shuts down the process pool if it was created by this processor.
+        """
+        if self._owned:
+            self._executor.shutdown(wait=True)
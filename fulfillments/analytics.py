@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Literal, TypedDict, cast
+
+from ..common.analytics import GroupedTotals  # type: ignore[import-not-found]
+from ..common.base import cache_dir, to_utc  # type: ignore[import-not-found]
+from ._types import Fulfillment as FulfillmentRecord
+from .export import scan_fulfillments
+
+FIELDS = ("fulfillments", "fee", "voided")
+
+Period = Literal["day", "month", "year"]
+
+# Characters of an ISO date kept for each histogram period.
+PERIODS: dict[Period, int] = {"day": 10, "month": 7, "year": 4}
+
+
+class FeeTotal(TypedDict):
+    fulfillments: int
+    fee: float
+    voided: int
+
+
+class FulfillmentAnalytics:
+    """
+    Fulfillment counts and fees per carrier, currency and ship day, updated a page
+    at a time and kept in NumPy arrays rather than Fulfillment dicts. A fulfillment
+    seen again replaces its earlier figures, e.g. once it was voided. Voided
+    fulfillments are counted apart and left out of the fee totals. Requires the
+    optional `numpy` package.
+
+        analytics = FulfillmentAnalytics.load()
+        await refresh_fulfillments(analytics, start="2025-01-01")
+        print(analytics.fees_by_carrier(), analytics.ship_dates("month"))
+        analytics.save()
+    """
+
+    __slots__ = ("path", "totals")
+
+    def __init__(self, path: Path | None = None) -> None:
+        """
+        Args:
+            path (Path | None): The file of `save` and `load`. Defaults to fulfillment_analytics.npz in the cache directory.
+        """
+        self.path = (
+            path if path is not None else cache_dir() / "fulfillment_analytics.npz"
+        )
+        # Grouped by (carrier, currency, ship day); every view sums these groups.
+        self.totals = GroupedTotals(FIELDS)
+
+    @property
+    def since(self) -> str | None:
+        """
+        The latest created_at added, in UTC, where the next refresh picks up.
+        """
+        return self.totals.meta.get("since")
+
+    def add(self, fulfillments: Iterable[FulfillmentRecord]) -> int:
+        """
+        Adds or replaces fulfillments, e.g. one page of Fulfillment.list.
+        Returns:
+            int: How many were added.
+        """
+        page = list(fulfillments)
+        fees = [f.get("fulfillment_fee") or {} for f in page]
+        self.totals.upsert(
+            [f["fulfillment_id"] for f in page],
+            [
+                (
+                    f["fulfillment_carrier_friendly_name"] or "",
+                    fee.get("currency") or "",
+                    (f["ship_date"] or "")[: PERIODS["day"]],
+                )
+                for f, fee in zip(page, fees)
+            ],
+            [
+                (0, 0, 1) if f["voided"] else (1, fee.get("amount") or 0, 0)
+                for f, fee in zip(page, fees)
+            ],
+        )
+        latest = max((to_utc(f["created_at"]).isoformat() for f in page), default=None)
+        if latest is not None and (self.since is None or latest > self.since):
+            self.totals.meta["since"] = latest
+        return len(page)
+
+    def fees_by_carrier(self) -> dict[tuple[str, str], FeeTotal]:
+        """
+        Returns:
+            dict[tuple[str, str], FeeTotal]: Fulfillment counts and fee totals per (carrier, currency).
+        """
+        fees: dict[tuple[str, str], FeeTotal] = {}
+        for label, totals in self.totals.totals().items():
+            carrier, currency, _ = cast(tuple[str, str, str], label)
+            total = fees.setdefault(
+                (carrier, currency), {"fulfillments": 0, "fee": 0.0, "voided": 0}
+            )
+            total["fulfillments"] += int(totals["fulfillments"])
+            total["fee"] = round(total["fee"] + totals["fee"], 2)
+            total["voided"] += int(totals["voided"])
+        return fees
+
+    def ship_dates(self, period: Period = "day") -> dict[str, int]:
+        """
+        Histogram of the fulfillments not voided by ship date.
+        Args:
+            period (Period): "day", "month" or "year". Defaults to "day".
+        Returns:
+            dict[str, int]: The count per period, e.g. {"2025-01": 412}, oldest first.
+        """
+        counts: dict[str, int] = {}
+        for label, totals in self.totals.totals().items():
+            bucket = cast(tuple[str, str, str], label)[2][: PERIODS[period]]
+            counts[bucket] = counts.get(bucket, 0) + int(totals["fulfillments"])
+        return {bucket: counts[bucket] for bucket in sorted(counts) if counts[bucket]}
+
+    def save(self) -> bool:
+        """
+        Writes the figures and `since` to `path`.
+        Returns:
+            bool: True if the file was written.
+        """
+        return self.totals.save(self.path)
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> "FulfillmentAnalytics":
+        """
+        Reads figures written by `save`, or starts empty.
+        Returns:
+            FulfillmentAnalytics: The analytics.
+        """
+        analytics = cls(path)
+        analytics.totals = GroupedTotals.load(analytics.path, FIELDS)
+        return analytics
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+
+async def refresh_fulfillments(
+    analytics: FulfillmentAnalytics,
+    start: datetime | str | None = None,
+    lookback: timedelta = timedelta(days=2),
+    page_size: int = 5000,
+    concurrency: int = 10,
+) -> int:
+    """
+    Adds the fulfillments created since the last refresh, and the ones created
+    within `lookback` before it, which may have been voided since, with a range scan
+    up to now.
+    Args:
+        analytics (FulfillmentAnalytics): The analytics to update.
+        start (datetime | str | None): Where the first refresh starts. Later ones start from `since`.
+        lookback (timedelta): How long a fulfillment may still change. Defaults to 2 days.
+        page_size (int): Fulfillments added at a time. Defaults to 5000.
+        concurrency (int): The most list calls in flight at once. Defaults to 10.
+    Returns:
+        int: How many fulfillments were read.
+    Raises:
+        APIError: If a list call failed.
+        ValueError: If there is neither a `start` nor an earlier refresh.
+    """
+    begin: datetime | str
+    if analytics.since is not None:
+        begin = to_utc(analytics.since) - lookback
+    elif start is not None:
+        begin = start
+    else:
+        raise ValueError("The first refresh needs a start")
+
+    read = 0
+    page: list[FulfillmentRecord] = []
+    async for fulfillment in scan_fulfillments(
+        begin, datetime.now(timezone.utc), concurrency=concurrency
+    ):
+        page.append(fulfillment)
+        if len(page) >= page_size:
+            read += analytics.add(page)
+            page = []
+    return read + analytics.add(page)
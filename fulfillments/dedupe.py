@@ -0,0 +1,273 @@
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable, List, Literal, cast
+
+from ..common._types import Error  # type: ignore[import-not-found]
+from ..common.base import (  # type: ignore[import-not-found]
+    LOGGER,
+    APIError,
+    cache_dir,
+    read_json,
+    write_json,
+)
+from ..common.bloom import BloomFilter  # type: ignore[import-not-found]
+from ..common.concurrency import as_completed  # type: ignore[import-not-found]
+from ._types import BatchFulfillmentCreationResponse
+from ._types import Fulfillment as FulfillmentRecord
+from ._types import FulfillmentGist, FulfillmentListResponse
+from .fulfillments import Fulfillment
+
+Check = Literal["new", "known", "maybe"]
+
+
+def _keys(shipment_id: str, tracking_number: str) -> tuple[str, str]:
+    return (f"shipment:{shipment_id}", f"tracking:{tracking_number}")
+
+
+class FulfilledIndex:
+    """
+    Local record of the shipments already fulfilled, so a re-run of a create job
+    does not fulfill them twice and notify customers and marketplaces again.
+
+    Every shipment_id and tracking_number fulfilled goes into a Bloom filter saved
+    as fulfilled.bloom in the cache directory, which holds the whole history in
+    about 2 bytes per key. The latest `recent` keys are also kept exactly in
+    fulfilled_index.json. A gist whose keys the filter has never seen is new with
+    no lookup at all. One it may have seen is known if the exact store has it, and
+    has to be confirmed with Fulfillment.list otherwise.
+    """
+
+    __slots__ = ("path", "bloom_path", "autosave", "recent", "bloom", "_keys", "_lock")
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        capacity: int = 1_000_000,
+        error_rate: float = 0.001,
+        recent: int = 100_000,
+        autosave: bool = True,
+    ) -> None:
+        """
+        Args:
+            path (Path | None): The JSON file of the exact store. Defaults to fulfilled_index.json
+                in the cache directory. The filter is saved next to it with a .bloom suffix.
+            capacity (int): Keys the filter is sized for, two per fulfillment. Defaults to 1,000,000.
+            error_rate (float): Share of new keys the filter reports as maybe seen. Defaults to 0.1%.
+            recent (int): Keys kept in the exact store, newest first. Defaults to 100,000.
+            autosave (bool): Write both files after every `record`. Defaults to True.
+        """
+        self.path = path if path is not None else cache_dir() / "fulfilled_index.json"
+        self.bloom_path = self.path.with_suffix(".bloom")
+        self.autosave = autosave
+        self.recent = recent
+        self._lock = Lock()
+        self.bloom = BloomFilter.load(self.bloom_path, capacity, error_rate)
+        stored = read_json(self.path) if self.path.exists() else None
+        # Insertion ordered, so the oldest keys are dropped first.
+        self._keys: dict[str, None] = dict.fromkeys((stored or {}).get("keys", []))
+
+    def add(self, shipment_id: str, tracking_number: str) -> None:
+        """
+        Marks a shipment as fulfilled, without saving.
+        """
+        with self._lock:
+            for key in _keys(shipment_id, tracking_number):
+                self.bloom.add(key)
+                self._keys.pop(key, None)
+                self._keys[key] = None
+            while len(self._keys) > self.recent:
+                del self._keys[next(iter(self._keys))]
+
+    def record(
+        self, fulfillments: Iterable[FulfillmentGist | FulfillmentRecord]
+    ) -> int:
+        """
+        Marks shipments as fulfilled, e.g. the gists a create accepted or the
+        output of export_fulfillments to seed a new index. Voided fulfillments are skipped.
+        Returns:
+            int: How many were marked.
+        """
+        count = 0
+        for fulfillment in fulfillments:
+            if fulfillment.get("voided"):
+                continue
+            self.add(fulfillment["shipment_id"], fulfillment["tracking_number"])
+            count += 1
+        if count and self.autosave:
+            self.save()
+        return count
+
+    def check(self, gist: FulfillmentGist) -> Check:
+        """
+        Classifies a gist without any request.
+        Returns:
+            Check: "new" if the shipment was never fulfilled, "known" if it was, and
+                "maybe" if only Fulfillment.list can tell.
+        """
+        keys = _keys(gist["shipment_id"], gist["tracking_number"])
+        with self._lock:
+            if not any(key in self.bloom for key in keys):
+                return "new"
+            if any(key in self._keys for key in keys):
+                return "known"
+            return "maybe"
+
+    def save(self) -> bool:
+        """
+        Writes the filter and the exact store to their files.
+        Returns:
+            bool: True if both were written.
+        """
+        with self._lock:
+            saved = self.bloom.save(self.bloom_path)
+            return write_json(self.path, {"keys": list(self._keys)}) and saved
+
+    def __len__(self) -> int:
+        return len(self.bloom) // 2
+
+
+_default_index: FulfilledIndex | None = None
+_default_lock = Lock()
+
+
+def default_fulfilled_index() -> FulfilledIndex:
+    """
+    Returns the process-wide index, loading it from the cache directory on first use.
+    Returns:
+        FulfilledIndex: The shared index.
+    """
+    global _default_index
+
+    with _default_lock:
+        if _default_index is None:
+            _default_index = FulfilledIndex()
+        return _default_index
+
+
+async def _fulfilled(
+    gist: FulfillmentGist,
+) -> tuple[int, FulfillmentRecord | None | Error]:
+    lookups: dict[str, Any] = {
+        "shipment_id": gist["shipment_id"],
+        "tracking_number": gist["tracking_number"],
+    }
+    for field, value in lookups.items():
+        status, body = await Fulfillment.list(
+            ship_to_name=None,
+            ship_to_country_code=None,
+            shipment_number=None,
+            shipment_id=value if field == "shipment_id" else None,
+            fulfillment_id=None,
+            batch_id=None,
+            order_source_id=None,
+            fulfillment_provider_code=None,
+            tracking_number=value if field == "tracking_number" else None,
+            ship_date_start=None,
+            ship_date_end=None,
+            create_date_start=None,
+            create_date_end=None,
+        )
+        if status != 200:
+            return (status, cast(Error, body))
+        for fulfillment in cast(FulfillmentListResponse, body)["fulfillments"]:
+            if not fulfillment["voided"]:
+                return (200, fulfillment)
+    return (200, None)
+
+
+async def guard_fulfillments(
+    gists: List[FulfillmentGist],
+    index: FulfilledIndex | None = None,
+    concurrency: int = 5,
+) -> tuple[List[FulfillmentGist], List[FulfillmentGist]]:
+    """
+    Splits gists into those still to fulfill and those already fulfilled, before a
+    Fulfillment.create that would otherwise notify customers a second time.
+
+    Most gists are settled by the index alone. Only the few the Bloom filter may
+    have seen but the exact store does not hold cost a Fulfillment.list call, and
+    the ones found that way are added to the exact store. A shipment listed twice
+    in `gists` is kept once.
+
+    Args:
+        gists (list[FulfillmentGist]): The fulfillments about to be created.
+        index (FulfilledIndex | None): The index to check. Defaults to the process-wide index.
+        concurrency (int): The most Fulfillment.list calls in flight. Defaults to 5.
+
+    Returns:
+        tuple[list[FulfillmentGist], list[FulfillmentGist]]: The gists to create and the
+            gists skipped, each in their original order.
+
+    Raises:
+        APIError: If a Fulfillment.list lookup failed.
+    """
+    index = index if index is not None else default_fulfilled_index()
+    verdicts: list[Check] = []
+    seen: set[str] = set()
+    maybe: list[FulfillmentGist] = []
+    for gist in gists:
+        keys = _keys(gist["shipment_id"], gist["tracking_number"])
+        if any(key in seen for key in keys):
+            verdicts.append("known")
+            continue
+        seen.update(keys)
+        verdict = index.check(gist)
+        verdicts.append(verdict)
+        if verdict == "maybe":
+            maybe.append(gist)
+
+    found: set[str] = set()
+    async for gist, (status, body) in as_completed(
+        _fulfilled, maybe, concurrency=concurrency
+    ):
+        if status != 200:
+            raise APIError(status, cast(Error, body))
+        if body is not None:
+            found.add(gist["shipment_id"])
+    index.record(gist for gist in maybe if gist["shipment_id"] in found)
+
+    create: List[FulfillmentGist] = []
+    skipped: List[FulfillmentGist] = []
+    for gist, verdict in zip(gists, verdicts):
+        done = verdict == "known" or gist["shipment_id"] in found
+        (skipped if done else create).append(gist)
+    LOGGER.info(
+        f"guard_fulfillments:::{len(skipped)} of {len(gists)} already fulfilled, {len(maybe)} looked up"
+    )
+    return (create, skipped)
+
+
+async def create_fulfillments_once(
+    gists: List[FulfillmentGist],
+    index: FulfilledIndex | None = None,
+    concurrency: int = 5,
+) -> tuple[int, BatchFulfillmentCreationResponse | Error]:
+    """
+    Fulfillment.create for the gists not fulfilled yet, recording the ones it creates,
+    so a failed job can be run again with the same gists.
+
+        status, body = await create_fulfillments_once(gists)
+
+    Args:
+        gists (list[FulfillmentGist]): The fulfillments to create.
+        index (FulfilledIndex | None): The index to use. Defaults to the process-wide index.
+        concurrency (int): The most Fulfillment.list lookups in flight. Defaults to 5.
+
+    Returns:
+        tuple[int, BatchFulfillmentCreationResponse | Error]: The status code and the create
+            response, which only lists the gists sent. 200 with an empty list if all were done.
+
+    Raises:
+        APIError: If a Fulfillment.list lookup failed.
+    """
+    index = index if index is not None else default_fulfilled_index()
+    create, _ = await guard_fulfillments(gists, index, concurrency)
+    if not create:
+        return (200, {"has_errors": False, "fulfillments": []})
+
+    status, body = await Fulfillment.create(create)
+    if status in (200, 207):
+        results = cast(BatchFulfillmentCreationResponse, body)["fulfillments"]
+        failed = {r["shipment_id"] for r in results if r["error_message"]}
+        index.record(gist for gist in create if gist["shipment_id"] not in failed)
+    return (status, body)
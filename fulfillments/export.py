@@ -0,0 +1,250 @@
+from asyncio import Semaphore, Task, create_task, gather
+from datetime import datetime, timedelta, timezone
+from math import ceil
+from typing import Any, AsyncIterator, Literal, cast
+
+from ..common._types import Error  # type: ignore[import-not-found]
+from ..common.base import LOGGER, APIError, to_utc  # type: ignore[import-not-found]
+from ..common.paging import default_page_sizes  # type: ignore[import-not-found]
+from ._types import Fulfillment as FulfillmentRecord
+from ._types import FulfillmentListResponse
+from .fulfillments import LIST_FULFILLMENTS, Fulfillment
+
+RangeField = Literal["create_date", "ship_date"]
+
+# The sort key matching each range, so every window comes back in order.
+SORT_BY: dict[RangeField, Literal["created_at", "shipped_at"]] = {
+    "create_date": "created_at",
+    "ship_date": "shipped_at",
+}
+
+# Fulfillment.list filters that may be combined with a range scan.
+FILTERS: tuple[str, ...] = (
+    "ship_to_name",
+    "ship_to_country_code",
+    "shipment_number",
+    "shipment_id",
+    "fulfillment_id",
+    "batch_id",
+    "order_source_id",
+    "fulfillment_provider_code",
+    "tracking_number",
+)
+
+
+def _format(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class _Window:
+    __slots__ = ("start", "end", "page_size", "items", "children")
+
+    def __init__(self, start: datetime, end: datetime) -> None:
+        self.start = start
+        self.end = end
+        self.page_size = 0
+        self.items: list[FulfillmentRecord] = []
+        self.children: list[Task[_Window]] = []
+
+
+class _Scan:
+    __slots__ = (
+        "field",
+        "filters",
+        "page_size",
+        "max_window",
+        "min_window",
+        "requests",
+        "tasks",
+        "_semaphore",
+    )
+
+    def __init__(
+        self,
+        field: RangeField,
+        filters: dict[str, str],
+        page_size: int | None,
+        max_window: int,
+        min_window: timedelta,
+        concurrency: int,
+    ) -> None:
+        self.field = field
+        self.filters = filters
+        self.page_size = page_size
+        self.max_window = max_window
+        self.min_window = min_window
+        self.requests = 0
+        self.tasks: list[Task[_Window]] = []
+        self._semaphore = Semaphore(concurrency)
+
+    def spawn(self, window: _Window) -> Task[_Window]:
+        task = create_task(self.fill(window))
+        self.tasks.append(task)
+        return task
+
+    async def page(self, window: _Window, page: int) -> FulfillmentListResponse:
+        params: dict[str, Any] = {name: None for name in FILTERS}
+        params.update(self.filters)
+        params["ship_date_start"] = params["ship_date_end"] = None
+        params["create_date_start"] = params["create_date_end"] = None
+        params[f"{self.field}_start"] = _format(window.start)
+        params[f"{self.field}_end"] = _format(window.end)
+
+        async def call(page: int, size: int) -> tuple[int, Any]:
+            self.requests += 1
+            return await Fulfillment.list(
+                **params,
+                page=page,
+                page_size=size,
+                sort_dir="asc",
+                sort_by=SORT_BY[self.field],
+            )
+
+        async with self._semaphore:
+            if window.page_size:
+                status, body = await call(page, window.page_size)
+            elif self.page_size is not None:
+                window.page_size = self.page_size
+                status, body = await call(page, self.page_size)
+            else:
+                status, window.page_size, body = await default_page_sizes().fetch(
+                    LIST_FULFILLMENTS.name, call, page
+                )
+        if status != 200:
+            raise APIError(status, cast(Error, body))
+        return cast(FulfillmentListResponse, body)
+
+    async def fill(self, window: _Window) -> _Window:
+        first = await self.page(window, 1)
+        span = window.end - window.start
+        if first["total"] > self.max_window and span > self.min_window:
+            # Split evenly by the count, down to whole min_windows; uneven windows split again.
+            parts = min(
+                ceil(first["total"] / self.max_window), ceil(span / self.min_window)
+            )
+            seconds = span.total_seconds()
+            bounds = sorted(
+                {
+                    window.start + timedelta(seconds=round(seconds * i / parts))
+                    for i in range(parts)
+                }
+                | {window.end}
+            )
+            window.children = [
+                self.spawn(_Window(start, end))
+                for start, end in zip(bounds, bounds[1:])
+            ]
+            return window
+
+        rest = await gather(
+            *(self.page(window, page) for page in range(2, first["pages"] + 1))
+        )
+        window.items = first["fulfillments"]
+        for body in rest:
+            window.items += body["fulfillments"]
+        return window
+
+
+async def scan_fulfillments(
+    start: datetime | str,
+    end: datetime | str,
+    field: RangeField = "create_date",
+    filters: dict[str, str] | None = None,
+    page_size: int | None = None,
+    max_window: int = 1000,
+    min_window: timedelta = timedelta(seconds=1),
+    concurrency: int = 10,
+) -> AsyncIterator[FulfillmentRecord]:
+    """
+    Lists every fulfillment in a date range by scanning time windows in parallel,
+    instead of walking one deep page cursor.
+
+    The range is listed once; a window holding more than `max_window` fulfillments
+    is split into as many equal windows as its count asks for, and those are listed
+    in parallel and split again if still too large. The pages of a small enough
+    window are then fetched in parallel too. Windows are yielded in time order and
+    fulfillments seen twice, at a shared window boundary or because the data moved
+    between pages, are yielded once.
+
+        async for fulfillment in scan_fulfillments("2025-01-01", "2026-01-01", concurrency=20):
+            ...
+
+    Args:
+        start (datetime | str): Start of the range. Naive datetimes are taken as UTC.
+        end (datetime | str): End of the range.
+        field (RangeField): Range over "create_date" or "ship_date". Defaults to "create_date".
+        filters (dict[str, str] | None): Other Fulfillment.list filters, e.g. {"batch_id": ...}.
+        page_size (int | None): Fulfillments per page. Defaults to the largest size the
+            endpoint accepts, found on its first call and remembered.
+        max_window (int): Most fulfillments a window may hold before it is split. Defaults to 1000.
+        min_window (timedelta): Shortest window; it is paginated however many it holds. Defaults to 1s.
+        concurrency (int): The most list calls in flight at once. Defaults to 10.
+
+    Yields:
+        Fulfillment: Each fulfillment once, in order of `field`.
+
+    Raises:
+        APIError: If a list call failed.
+        ValueError: If a filter is not a Fulfillment.list filter.
+    """
+    unknown = set(filters or {}) - set(FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown Fulfillment.list filters: {sorted(unknown)}")
+
+    scan = _Scan(
+        field, dict(filters or {}), page_size, max_window, min_window, concurrency
+    )
+    pending = [scan.spawn(_Window(to_utc(start), to_utc(end)))]
+    seen: set[str] = set()
+    windows = 0
+    try:
+        while pending:
+            window = await pending.pop()
+            if window.children:
+                pending.extend(reversed(window.children))
+                continue
+            windows += 1
+            for fulfillment in window.items:
+                if fulfillment["fulfillment_id"] not in seen:
+                    seen.add(fulfillment["fulfillment_id"])
+                    yield fulfillment
+    finally:
+        for task in scan.tasks:
+            task.cancel()
+        await gather(*scan.tasks, return_exceptions=True)
+
+    LOGGER.info(
+        f"scan_fulfillments:::{len(seen)} fulfillments in {windows} windows, {scan.requests} requests"
+    )
+
+
+async def export_fulfillments(
+    start: datetime | str,
+    end: datetime | str,
+    field: RangeField = "create_date",
+    filters: dict[str, str] | None = None,
+    page_size: int | None = None,
+    max_window: int = 1000,
+    min_window: timedelta = timedelta(seconds=1),
+    concurrency: int = 10,
+) -> list[FulfillmentRecord]:
+    """
+    Collects every fulfillment in a date range with scan_fulfillments.
+    Returns:
+        list[Fulfillment]: The fulfillments, in order of `field`.
+    Raises:
+        APIError: If a list call failed.
+    """
+    return [
+        fulfillment
+        async for fulfillment in scan_fulfillments(
+            start,
+            end,
+            field=field,
+            filters=filters,
+            page_size=page_size,
+            max_window=max_window,
+            min_window=min_window,
+            concurrency=concurrency,
+        )
+    ]
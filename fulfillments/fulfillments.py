@@ -1,10 +1,8 @@
 from typing import List, Literal, cast
 
 from ..common._types import Endpoints, Error  # type: ignore[import-not-found, misc]
-from ..common.base import (  # type: ignore[import-not-found, misc]
-    API_ENDPOINT,
-    ShipStationClient,
-)
+from ..common.base import ShipStationClient  # type: ignore[import-not-found, misc]
+from ..common.endpoints import EndpointSpec  # type: ignore[import-not-found, misc]
 from ._types import (  # type: ignore[import-not-found, misc]
     BatchFulfillmentCreationResponse,
     FulfillmentGist,
@@ -12,6 +10,16 @@ from ._types import (  # type: ignore[import-not-found, misc]
     FulfillmentListResponse,
 )
 
+LIST_FULFILLMENTS = EndpointSpec("fulfillments.list", "GET", Endpoints.FULFILLMENTS)
+# Tracking-number lookups are small and interactive, so they alone are hedged and
+# keep their own latency window, apart from bulk pages.
+FULFILLMENTS_BY_TRACKING = EndpointSpec(
+    "fulfillments.by_tracking", "GET", Endpoints.FULFILLMENTS, hedge=True
+)
+CREATE_FULFILLMENTS = EndpointSpec(
+    "fulfillments.create", "POST", Endpoints.FULFILLMENTS
+)
+
 
 class Fulfillment(ShipStationClient):
     @classmethod
@@ -55,40 +63,17 @@ class Fulfillment(ShipStationClient):
             "sort_by": sort_by,
         }
 
-        data = {k: v for k, v in data.items() if v is not None}
-
-        endpoint = f"{API_ENDPOINT}/{Endpoints.FULFILLMENTS.value}"
-
-        try:
-            res = await cls.request(
-                "GET",
-                endpoint,
-                params=data,
-            )
-            if res.status_code != 200:
-                if "error_code" in res.json():
-                    return (
-                        res.status_code,
-                        cast(Error, res.json()),
-                    )
-
-                raise Exception(f"Unexpected response: {res.json()}")
-
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
+        return cast(
+            tuple[int, FulfillmentListResponse | Error],
+            await cls.call(
+                (
+                    FULFILLMENTS_BY_TRACKING
+                    if tracking_number is not None
+                    else LIST_FULFILLMENTS
                 ),
-            )
-
-        return (res.status_code, cast(FulfillmentListResponse, res.json()))
+                params=data,
+            ),
+        )
 
     @classmethod
     async def create(
@@ -102,35 +87,7 @@ class Fulfillment(ShipStationClient):
 
         data: FulfillmentGistRequest = {"fulfillments": fulfillments}
 
-        endpoint = f"{API_ENDPOINT}/{Endpoints.FULFILLMENTS.value}"
-
-        try:
-            res = await cls.request(
-                "POST",
-                endpoint,
-                json=data,
-            )
-            if res.status_code != 200:
-                if "error_code" in res.json():
-                    return (
-                        res.status_code,
-                        cast(Error, res.json()),
-                    )
-                else:
-                    raise Exception(f"Unexpected response: {res.json()}")
-
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return (res.status_code, cast(BatchFulfillmentCreationResponse, res.json()))
+        return cast(
+            tuple[int, Error | BatchFulfillmentCreationResponse],
+            await cls.call(CREATE_FULFILLMENTS, json=data),
+        )
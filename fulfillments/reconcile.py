@@ -0,0 +1,355 @@
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterable, Iterable, Literal, NotRequired, TypedDict
+
+import numpy as np  # type: ignore[import-not-found]
+
+from ._types import Fulfillment as FulfillmentRecord
+from .export import RangeField, scan_fulfillments
+
+Issue = Literal[
+    "missing",
+    "voided",
+    "fee_mismatch",
+    "tracking_mismatch",
+    "not_notified",
+    "unexpected",
+]
+
+ISSUES: tuple[Issue, ...] = (
+    "missing",
+    "voided",
+    "fee_mismatch",
+    "tracking_mismatch",
+    "not_notified",
+    "unexpected",
+)
+
+
+class Order(TypedDict):
+    shipment_id: str
+    tracking_number: NotRequired[str | None]
+    fee: NotRequired[float | None]
+
+
+class FeeMismatch(TypedDict):
+    shipment_id: str
+    expected: float
+    actual: float | None
+    currency: str
+
+
+class ReconciliationReport(TypedDict):
+    orders: int
+    fulfillments: int
+    counts: dict[Issue, int]
+    issues: dict[Issue, list[str]]
+    fee_mismatches: list[FeeMismatch]
+    fee_difference: float
+
+
+def _strings(values: Iterable[str | None]) -> Any:
+    return np.array([value or "" for value in values], dtype=np.str_)
+
+
+def _dates(values: Iterable[str | None]) -> Any:
+    # Seconds precision, as numpy refuses the "Z" suffix of ISO timestamps.
+    return np.array(
+        [value[:19] if value else "NaT" for value in values], dtype="datetime64[s]"
+    )
+
+
+class OrderColumns:
+    """
+    Our side of a reconciliation, one array per field: the shipment each order
+    should have been fulfilled with and, where known, the tracking number and fee
+    we expect on the fulfillment. An empty tracking number or a NaN fee is not checked.
+    """
+
+    __slots__ = ("shipment_id", "tracking_number", "fee")
+
+    def __init__(
+        self,
+        shipment_ids: Iterable[str],
+        tracking_numbers: Iterable[str | None] | None = None,
+        fees: Iterable[float | None] | None = None,
+    ) -> None:
+        """
+        Args:
+            shipment_ids (Iterable[str]): The shipment of each order.
+            tracking_numbers (Iterable[str | None] | None): The expected tracking numbers, aligned with the shipments.
+            fees (Iterable[float | None] | None): The expected fulfillment fee amounts, aligned with the shipments.
+        """
+        self.shipment_id = _strings(shipment_ids)
+        count = len(self.shipment_id)
+        self.tracking_number = (
+            _strings(tracking_numbers)
+            if tracking_numbers is not None
+            else np.full(count, "", dtype=np.str_)
+        )
+        self.fee = (
+            np.array(list(fees), dtype=np.float64)
+            if fees is not None
+            else np.full(count, np.nan)
+        )
+        if not len(self.tracking_number) == len(self.fee) == count:
+            raise ValueError("Order columns must all have one value per order")
+
+    @classmethod
+    def from_records(cls, orders: Iterable[Order]) -> "OrderColumns":
+        """
+        Builds the columns from order dicts.
+        Args:
+            orders (Iterable[Order]): The orders.
+        Returns:
+            OrderColumns: The columns.
+        """
+        records = list(orders)
+        return cls(
+            (order["shipment_id"] for order in records),
+            (order.get("tracking_number") for order in records),
+            (order.get("fee") for order in records),
+        )
+
+    def __len__(self) -> int:
+        return len(self.shipment_id)
+
+
+class FulfillmentColumns:
+    """
+    ShipStation's side of a reconciliation: the fields of Fulfillment records held
+    as one array per field instead of one dict per record. Pages are converted as
+    they are added, so the dicts of a page can be dropped once it is in.
+    """
+
+    __slots__ = ("_chunks", "_columns")
+
+    # The dtype of each column, also used for the columns of an empty set.
+    DTYPES: dict[str, Any] = {
+        "shipment_id": np.str_,
+        "tracking_number": np.str_,
+        "ship_date": "datetime64[s]",
+        "voided": np.bool_,
+        "order_source_notified": np.bool_,
+        "fee": np.float64,
+        "currency": np.str_,
+    }
+
+    def __init__(self, fulfillments: Iterable[FulfillmentRecord] = ()) -> None:
+        """
+        Args:
+            fulfillments (Iterable[Fulfillment]): Records to start with.
+        """
+        self._chunks: list[dict[str, Any]] = []
+        self._columns: dict[str, Any] | None = None
+        self.extend(fulfillments)
+
+    def extend(self, fulfillments: Iterable[FulfillmentRecord]) -> None:
+        """
+        Adds records, e.g. one page of Fulfillment.list.
+        Args:
+            fulfillments (Iterable[Fulfillment]): The records.
+        """
+        rows = list(fulfillments)
+        if not rows:
+            return
+        fees = [f.get("fulfillment_fee") or {} for f in rows]
+        self._chunks.append(
+            {
+                "shipment_id": _strings(f["shipment_id"] for f in rows),
+                "tracking_number": _strings(f["tracking_number"] for f in rows),
+                "ship_date": _dates(f["ship_date"] for f in rows),
+                "voided": np.array([f["voided"] for f in rows], dtype=np.bool_),
+                "order_source_notified": np.array(
+                    [f["order_source_notified"] for f in rows], dtype=np.bool_
+                ),
+                "fee": np.array([fee.get("amount") for fee in fees], dtype=np.float64),
+                "currency": _strings(fee.get("currency") for fee in fees),
+            }
+        )
+        self._columns = None
+
+    def column(self, name: str) -> Any:
+        """
+        Returns:
+            np.ndarray: Every value of one field, in the order the records were added.
+        """
+        if self._columns is None:
+            self._columns = {
+                field: (
+                    np.concatenate([chunk[field] for chunk in self._chunks])
+                    if self._chunks
+                    else np.array([], dtype=dtype)
+                )
+                for field, dtype in self.DTYPES.items()
+            }
+            # One chunk from here on, so later reads do not concatenate again.
+            self._chunks = [self._columns] if self._chunks else []
+        return self._columns[name]
+
+    def __len__(self) -> int:
+        return sum(len(chunk["shipment_id"]) for chunk in self._chunks)
+
+
+async def load_fulfillments(
+    fulfillments: AsyncIterable[FulfillmentRecord], page_size: int = 5000
+) -> FulfillmentColumns:
+    """
+    Collects streamed fulfillments into columns, `page_size` records at a time,
+    e.g. from scan_fulfillments or a ListStream.
+    Returns:
+        FulfillmentColumns: The columns.
+    """
+    columns = FulfillmentColumns()
+    page: list[FulfillmentRecord] = []
+    async for fulfillment in fulfillments:
+        page.append(fulfillment)
+        if len(page) >= page_size:
+            columns.extend(page)
+            page = []
+    columns.extend(page)
+    return columns
+
+
+def _latest(codes: Any, voided: Any, ship_date: Any) -> tuple[Any, Any]:
+    # Per shipment, the fulfillment that counts: the latest one not voided if there is one.
+    order = np.lexsort((ship_date.astype(np.int64), ~voided, codes))
+    ordered = codes[order]
+    last = np.ones(len(order), dtype=np.bool_)
+    last[:-1] = ordered[1:] != ordered[:-1]
+    return (ordered[last], order[last])
+
+
+def _take(column: Any, rows: Any, default: Any) -> Any:
+    # Values at `rows`, where -1 (no fulfillment) reads a value masked out afterwards.
+    if not len(column):
+        return np.full(len(rows), default, dtype=column.dtype)
+    return column[rows]
+
+
+def reconcile(
+    orders: OrderColumns,
+    fulfillments: FulfillmentColumns,
+    fee_tolerance: float = 0.005,
+    limit: int | None = 1000,
+) -> ReconciliationReport:
+    """
+    Compares our orders with ShipStation's fulfillments by shipment_id, with array
+    operations over both sides instead of a dict lookup per order.
+
+    Where a shipment has several fulfillments, the latest one not voided is used.
+    An order is reported as:
+        missing: no fulfillment at all.
+        voided: only voided fulfillments.
+        fee_mismatch: the fee differs from the expected one by more than `fee_tolerance`.
+        tracking_mismatch: the tracking number is not the expected one.
+        not_notified: the order source was not notified.
+    A fulfillment whose shipment has no order is reported as unexpected.
+
+    Args:
+        orders (OrderColumns): Our orders.
+        fulfillments (FulfillmentColumns): The fulfillments, e.g. from load_fulfillments.
+        fee_tolerance (float): Largest fee difference still matching. Defaults to 0.005.
+        limit (int | None): Most shipment IDs listed per issue. None lists all. Defaults to 1000.
+
+    Returns:
+        ReconciliationReport: The count of each issue, and the shipment IDs and fee
+            differences behind them up to `limit`.
+    """
+    voided = fulfillments.column("voided")
+    count = len(orders)
+    keys, inverse = np.unique(
+        np.concatenate((orders.shipment_id, fulfillments.column("shipment_id"))),
+        return_inverse=True,
+    )
+    order_codes = inverse[:count]
+    codes, rows = _latest(inverse[count:], voided, fulfillments.column("ship_date"))
+
+    by_code = np.full(len(keys), -1, dtype=np.int64)
+    by_code[codes] = rows
+    matched = by_code[order_codes]
+    found = matched >= 0
+    active = found & ~_take(voided, matched, True)
+
+    fee = np.where(found, _take(fulfillments.column("fee"), matched, np.nan), np.nan)
+    tracking = _take(fulfillments.column("tracking_number"), matched, "")
+    notified = _take(fulfillments.column("order_source_notified"), matched, True)
+    currency = _take(fulfillments.column("currency"), matched, "")
+
+    ordered = np.zeros(len(keys), dtype=np.bool_)
+    ordered[order_codes] = True
+    unexpected = rows[~ordered[codes] & ~voided[rows]]
+
+    # NaN fees compare unequal, so a fulfillment without a fee mismatches too.
+    fee_mismatch = (
+        active & ~np.isnan(orders.fee) & ~(np.abs(fee - orders.fee) <= fee_tolerance)
+    )
+    masks: dict[Issue, Any] = {
+        "missing": ~found,
+        "voided": found & ~active,
+        "fee_mismatch": fee_mismatch,
+        "tracking_mismatch": active
+        & (orders.tracking_number != "")
+        & (tracking != orders.tracking_number),
+        "not_notified": active & ~notified,
+    }
+    shipments = {issue: orders.shipment_id[mask] for issue, mask in masks.items()}
+    shipments["unexpected"] = fulfillments.column("shipment_id")[unexpected]
+
+    fee_rows = np.flatnonzero(fee_mismatch)
+    return {
+        "orders": count,
+        "fulfillments": len(fulfillments),
+        "counts": {issue: len(shipments[issue]) for issue in ISSUES},
+        "issues": {issue: shipments[issue][:limit].tolist() for issue in ISSUES},
+        "fee_mismatches": [
+            {
+                "shipment_id": str(orders.shipment_id[row]),
+                "expected": float(orders.fee[row]),
+                "actual": None if np.isnan(fee[row]) else float(fee[row]),
+                "currency": str(currency[row]),
+            }
+            for row in fee_rows[:limit]
+        ],
+        "fee_difference": round(
+            float(np.nansum(fee[fee_rows] - orders.fee[fee_rows])), 2
+        ),
+    }
+
+
+async def reconcile_range(
+    orders: OrderColumns,
+    start: datetime | str,
+    end: datetime | str,
+    field: RangeField = "create_date",
+    fee_tolerance: float = 0.005,
+    limit: int | None = 1000,
+    max_window: int = 1000,
+    min_window: timedelta = timedelta(seconds=1),
+    concurrency: int = 10,
+) -> ReconciliationReport:
+    """
+    Reconciles orders with every fulfillment in a date range, read with scan_fulfillments
+    straight into columns.
+
+        orders = OrderColumns.from_records(nightly_orders)
+        report = await reconcile_range(orders, "2025-06-01", "2025-06-02")
+        print(report["counts"])
+
+    Requires the optional `numpy` package.
+
+    Returns:
+        ReconciliationReport: See `reconcile`.
+    Raises:
+        APIError: If a list call failed.
+    """
+    fulfillments = await load_fulfillments(
+        scan_fulfillments(
+            start,
+            end,
+            field=field,
+            max_window=max_window,
+            min_window=min_window,
+            concurrency=concurrency,
+        )
+    )
+    return reconcile(orders, fulfillments, fee_tolerance=fee_tolerance, limit=limit)
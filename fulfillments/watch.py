@@ -0,0 +1,80 @@
+from asyncio import sleep
+from time import monotonic, time
+from typing import cast
+
+from ..common._types import Error  # type: ignore[import-not-found]
+from ..common.base import unknown_error  # type: ignore[import-not-found]
+from ..common.events import event_bus  # type: ignore[import-not-found]
+from ._types import Fulfillment as FulfillmentRecord
+from ._types import FulfillmentListResponse
+from .fulfillments import Fulfillment
+
+
+async def wait_for_fulfillment(
+    shipment_id: str,
+    poll_interval: float = 5.0,
+    timeout: float = 600.0,
+    late_after: float = 60.0,
+) -> tuple[int, FulfillmentRecord | Error]:
+    """
+    Waits until a fulfillment exists for a shipment.
+
+    If an EventBus is set with `set_event_bus`, fulfillments are listed again as soon
+    as a fulfillment webhook for the shipment arrives, and only polled every
+    `late_after` seconds in case an event is late or lost. Otherwise they are polled
+    every `poll_interval` seconds.
+
+    Args:
+        shipment_id (str): The shipment whose fulfillment to wait for.
+        poll_interval (float): Seconds between two polls without webhooks. Defaults to 5.
+        timeout (float): Seconds to wait before giving up. Defaults to 600.
+        late_after (float): Seconds between two polls with webhooks. Defaults to 60.
+
+    Returns:
+        tuple[int, Fulfillment | Error]: A tuple containing the status code and either the
+            Fulfillment or an Error. The status is 408 if none appeared in time.
+    """
+    deadline = monotonic() + timeout
+    while True:
+        polled_at = time()
+        status, body = await Fulfillment.list(
+            ship_to_name=None,
+            ship_to_country_code=None,
+            shipment_number=None,
+            shipment_id=shipment_id,
+            fulfillment_id=None,
+            batch_id=None,
+            order_source_id=None,
+            fulfillment_provider_code=None,
+            tracking_number=None,
+            ship_date_start=None,
+            ship_date_end=None,
+            create_date_start=None,
+            create_date_end=None,
+            page_size=1,
+        )
+        if status != 200:
+            return (status, cast(Error, body))
+        fulfillments = cast(FulfillmentListResponse, body)["fulfillments"]
+        if fulfillments:
+            return (200, fulfillments[0])
+
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            return (
+                408,
+                unknown_error(
+                    f"No fulfillment for shipment {shipment_id} after {timeout} seconds"
+                ),
+            )
+
+        bus = event_bus()
+        if bus is None:
+            await sleep(min(poll_interval, remaining))
+        else:
+            await bus.wait_for(
+                "fulfillment",
+                shipment_id,
+                timeout=min(late_after, remaining),
+                since=polled_at,
+            )
@@ -5,12 +5,15 @@ from ..common._types import (  # type: ignore[import-not-found, misc]
     Error,
     Fee,
 )
-from ..common.base import (  # type: ignore[import-not-found, misc]
-    API_ENDPOINT,
-    ShipStationClient,
-)
+from ..common.base import ShipStationClient  # type: ignore[import-not-found, misc]
+from ..common.endpoints import EndpointSpec  # type: ignore[import-not-found, misc]
 from ._types import Inventory  # type: ignore[import-not-found, misc]
 
+LIST_INVENTORY = EndpointSpec("inventory.list", "GET", Endpoints.INVENTORY)
+UPDATE_INVENTORY = EndpointSpec(
+    "inventory.update", "POST", Endpoints.INVENTORY, expected=(204,), body="none"
+)
+
 
 class InventoryPortal(ShipStationClient):
     @classmethod
@@ -30,34 +33,10 @@ class InventoryPortal(ShipStationClient):
             "page_size": page_size,
         }
 
-        endpoint = f"{API_ENDPOINT}/{Endpoints.INVENTORY.value}"
-
-        try:
-            response = await cls.request("GET", endpoint, params=params)
-
-            if response.status_code != 200:
-                if "error_code" in response.json():
-                    return response.status_code, cast(Error, response.json())
-
-                raise Exception(
-                    f"Unexpected response: {response.status_code} - {response.json()}"
-                )
-
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return response.status_code, cast(Inventory, response.json())
+        return cast(
+            tuple[int, Error | Inventory],
+            await cls.call(LIST_INVENTORY, params=params),
+        )
 
     @classmethod
     async def update(
@@ -104,31 +83,7 @@ class InventoryPortal(ShipStationClient):
             filtered = {k: v for k, v in optionals.items() if v is not None}
             payload.update(filtered)
 
-        endpoint = f"{API_ENDPOINT}/{Endpoints.INVENTORY.value}"
-
-        try:
-            response = await cls.request("POST", endpoint, json=payload)
-
-            if response.status_code != 204:
-                if "error_code" in response.json():
-                    return response.status_code, cast(Error, response.json())
-
-                raise Exception(
-                    f"Unexpected response: {response.status_code} - {response.json()}"
-                )
-
-        except Exception as e:
-            return (
-                500,
-                cast(
-                    Error,
-                    {
-                        "error_source": "ShipStation",
-                        "error_type": "integrations",
-                        "error_code": "unknown",
-                        "message": str(e),
-                    },
-                ),
-            )
-
-        return response.status_code, None
+        return cast(
+            tuple[int, Error | None],
+            await cls.call(UPDATE_INVENTORY, json=payload),
+        )